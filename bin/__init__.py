@@ -0,0 +1 @@
+# console scripts of an installed GCTS (gctsbin.evalCampaign:main, ...)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import argparse, os, sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
+    sys.path.append(pyGCTSpath)
+
+import gcts
+import glob
+
+__prog__ = 'buildPriors.py'
+
+__description__ = '''
+buildPriors -> Builds the meta data of the search space from a reference network.
+
+The search space of evalCampaign.py is bounded by quantile regressions of the white
+and flicker noise amplitudes against the WRMS of the sites in the metaData directory.
+The script computes the WRMS of the ordinary least-squares solution and the variance
+component estimates of the white and flicker noise amplitudes of all [?].tse files
+of a directory (e.g. of a regional network) over a pool of processes, and writes them
+into results_[comp].txt files in the format of metaData, together with priors.npz
+holding the tables and the regressions of the -alpha values, which are then loaded
+without fitting. The new meta data are used by setting $GCTS_METADATA to -out.
+'''
+
+__epilog__ = '''
+*** EXAMPLES ***
+
+---------
+:: Ex1 ::
+    Let the series of a regional network be in the network directory.
+
+
+    buildPriors.py -dir network -out networkPriors -periods T2 -workers 4
+
+        ========================================================================
+        buildPriors.py is running and using the parameters:
+        ========================================================================
+           directory : network (36 files)
+                 out : networkPriors
+             periods : T2
+               kappa : -1.0
+                  Fs : 365.25
+               alpha : 0.05
+             workers : 4
+        ========================================================================
+
+         networkPriors/results_east.txt file has been created...
+         networkPriors/results_north.txt file has been created...
+         networkPriors/results_up.txt file has been created...
+         networkPriors/priors.npz file has been created...
+
+
+    export GCTS_METADATA=networkPriors
+    evalCampaign.py -fname TESTeast.tse -nRND 30 -repeat 100
+
+
+    NOTE: The rows of the results_[comp].txt files could be edited as in metaData, in
+          which case priors.npz is older than them and the regressions are fitted again.
+
+
+
+    This file is part of GCTS v1.0.
+
+    GCTS v1.0 is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    GCTS v1.0 is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with GCTS v1.0.  If not, see <https://www.gnu.org/licenses/>.
+'''
+
+__author__ = 'Huseyin Duman'
+
+
+def _getparser():
+    parser = argparse.ArgumentParser(description=__description__,
+                                     epilog=__epilog__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("-dir", type=str, required=True, nargs='?',
+                        help = """Directory of the [?].tse files of the reference network, which
+                        could contain either only one GPS component or all GPS component.""")
+
+    parser.add_argument("-out", type=str, required=True, nargs='?',
+                        help="""Directory of the meta data to be written.""")
+
+    parser.add_argument("-periods", type=str, nargs='+', default=[],
+                        help="""Seasonal periodicities in the model, as in evalCampaign.py (e.g.
+                        T2, C1 or 14.66 days).""")
+
+    parser.add_argument("-kappa", type=float, nargs='?', default=-1,
+                        help="""Spectral index for colored noise, which is set to -1 (flicker
+                        noise) as default.""")
+
+    parser.add_argument("-fs", type=float, nargs='?', default=365.25,
+                        help="""Observation frequency, which is set to 365.25 as default.""")
+
+    parser.add_argument("-alpha", type=float, nargs='+', default=[0.05],
+                        help="""Significance level(s) whose search space regressions are
+                        stored in priors.npz.""")
+
+    parser.add_argument("-workers", type=str, nargs='?', default='1',
+                        help="""Number of processes, or auto for the cores available.""")
+
+    return parser
+
+def _dispParser(args, fnames):
+    print(" ========================================================================\n",
+          os.path.basename(__file__) + " is running and using the parameters:\n",
+        "========================================================================")
+    print("   directory : " + args.dir + " (" + str(len(fnames)) + " files)\n",
+          "       out : " + args.out)
+    for j in args.periods:
+        print("     periods : " + j)
+    print("       kappa : " + str(args.kappa) + "\n",
+          "        Fs : " + str(args.fs))
+    for a in args.alpha:
+        print("       alpha : " + str(a))
+    print("     workers : " + args.workers)
+    print(" ========================================================================\n")
+
+
+def main():
+    args = _getparser().parse_args()
+    fnames = sorted(glob.glob(os.path.join(args.dir, '*.tse')))
+    _dispParser(args, fnames)
+    try:
+        workers = args.workers if args.workers == 'auto' else int(args.workers)
+        gcts.buildPriors(fnames, args.out, args.periods, args.kappa, args.fs, args.alpha, workers,
+                         verbose=True)
+    except ValueError as err:
+        print(err)
+        sys.exit()
+    print("\n\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 
-import argparse, os, sys, math
-pyGCTSpath="{}/lib".format(os.environ['pyGCTS'])
-if pyGCTSpath not in sys.path:
+import argparse, os, sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
     sys.path.append(pyGCTSpath)
 
-import numpy as np
-from dateUtilities import date as du
+import gcts
 
 __prog__ = 'conv2tse.py'
 
@@ -146,6 +147,20 @@ def _getparser():
                         argument could not be specified, that's why site ID is extracted from filename.
                         """)
 
+    parser.add_argument("-index", type=str, nargs='?',
+                        help="""SQLite index of the gamit files (see indexOrg.py). The new and
+                        changed files are indexed first, then the records of the sites are read by
+                        seeking to them instead of reading all files.""")
+
+    parser.add_argument("-incremental", action='store_true',
+                        help="""Only the source files which are new or changed since the last
+                        conversion are read. The ingested files, their checksums and epochs are
+                        kept in [?]_manifest.json next to the [?].tse file, and the epochs of the
+                        new files are merged into the existing [?].tse file in sorted order,
+                        replacing those with the same dates. The series is converted from the
+                        given files if the manifest does not exist or the conversion parameters
+                        (-comp, -offset, -unit, -dateFormat) have changed.""")
+
     return parser
 
 def _dispParser(args):
@@ -161,6 +176,10 @@ def _dispParser(args):
            print("      offset : " + (" ".join(args.offset[i])))
     print("        unit : " + (" ".join(args.unit)))
     print("  dateFormat : " + args.dateFormat)
+    if args.index is not None:
+        print("       index : " + args.index)
+    if args.incremental:
+        print(" incremental : on")
     print(" ========================================================================\n")
 
 
@@ -168,451 +187,18 @@ def main():
     args = _getparser().parse_args()
     _dispParser(args)
 
-    # computing scale factor for the data conversion
-    units = ['mm', 'cm', 'dm', 'm', 'km']
-    transScale = np.array([[1.0e+0, 1.0e-1, 1.0e-2, 1.0e-3, 1.0e-6],
-                           [1.0e+1, 1.0e+0, 1.0e-1, 1.0e-2, 1.0e-5],
-                           [1.0e+2, 1.0e+1, 1.0e+0, 1.0e-1, 1.0e-4],
-                           [1.0e+3, 1.0e+2, 1.0e+1, 1.0e+0, 1.0e-3],
-                           [1.0e+6, 1.0e+5, 1.0e+4, 1.0e+3, 1.0e+0]])
-    unitScale = transScale[units.index(args.unit[0]), units.index(args.unit[1])]
-    
-    if args.fromWhich == 'gipsy':
-        for ss in range(len(args.fname)):
-            siteID    = args.fname[ss].name.split("/")[-1][0:4]
-
-            if args.comp == 'all':
-                newFilename = siteID + ".tse"
-            else:
-                newFilename = siteID + args.comp + ".tse"
-
-            wrFile = open(newFilename, "w")
-            wrFile.write("* SITE         : " + siteID + "\n")
-            wrFile.write("* COMPONENT    : " + args.comp + "\n")
-            wrFile.write("* UNIT         : " + args.unit[1] + "\n")
-            wrFile.write("* DATE FORMAT  : " + args.dateFormat + "\n")
-
-
-            if args.offset is not None:
-                for i in range(len(args.offset)):
-                    wrFile.write("* OFFSET       : " + (" ".join(args.offset[i])) + "\n")
-
-            data  = np.loadtxt(args.fname[ss], usecols=(1,2,3,4,5,6, 11, 12, 13))
-            dates = data[:,6:]
-            datesNew_temp  = []
-
-            if args.dateFormat == 'yyyymmdd':
-                for i in range(len(dates[:,0])):
-                    datesNew_temp.append((dates[i,0],dates[i,1],dates[i,2]))
-                del i
-            else:
-                for i in range(len(dates[:,0])):
-                    dd = du([],[],int(dates[i,0]),int(dates[i,1]),int(dates[i,2]),[],[],[],"yyyymmdd",args.dateFormat)
-                    datesNew_temp.append(dd._getdate())
-                del i
-            datesNew = np.asarray(datesNew_temp)
-            if args.comp == 'all':
-                wrFile.write("* DATA ORDER   : E N U sE sN sU date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                obs   = data[:,0:6]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obs[:,0])):
-                        for j in range(len(obs[0,:])):
-                            wrFile.write("%14.6f" % (obs[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obs[:,0])):
-                        for j in range(len(obs[0,:])):
-                            wrFile.write("%14.6f" % (obs[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'east':
-                wrFile.write("* DATA ORDER   : E sE date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obs   = data[:,[0,3]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obs[:,0])):
-                        for j in range(len(obs[0,:])):
-                            wrFile.write("%14.6f" % (obs[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obs[:,0])):
-                        for j in range(len(obs[0,:])):
-                            wrFile.write("%14.6f" % (obs[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'north':
-                wrFile.write("* DATA ORDER   : N sN date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obs   = data[:,[1,4]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obs[:,0])):
-                        for j in range(len(obs[0,:])):
-                            wrFile.write("%14.6f" % (obs[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obs[:,0])):
-                        for j in range(len(obs[0,:])):
-                            wrFile.write("%14.6f" % (obs[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'up':
-                wrFile.write("* DATA ORDER   : U sU date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obs   = data[:,[2,5]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obs[:,0])):
-                        for j in range(len(obs[0,:])):
-                            wrFile.write("%14.6f" % (obs[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obs[:,0])):
-                        for j in range(len(obs[0,:])):
-                            wrFile.write("%14.6f" % (obs[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            wrFile.close()
-            if os.path.isfile(newFilename):
-                print(" " + newFilename + " file has been created...")
-            else:
-                print("Something went wrong!")
-        print("\n\n")
-
-    elif args.fromWhich == 'gamit':
-        for ss in range(len(args.siteID[0])):
-            siteID = args.siteID[0][ss]
-
-
-            obs_temp   = []
-            s_obs_temp = []
-            dates_temp = []
-            for i in range(len(args.fname)):
-                with open(args.fname[i].name, 'r') as f:
-                        for line in f.readlines():
-                            if 'pbo. ' + siteID + '_GPS' in line:
-                                dates_temp.append((line.split("|")[0].split()[3:6]))
-                                obs_temp.append((line.split("|")[2].split("\n")[0].split()[0:3]))
-                                s_obs_temp.append((line.split("|")[2].split("\n")[0].split()[3:6]))
-            datesNew_temp = []
-            if args.dateFormat == 'yyyymmdd':
-                for i in range(len(dates_temp)):
-                    datesNew_temp.append((int(dates_temp[i][0]),int(dates_temp[i][1]),int(dates_temp[i][2])))
-                del i
-            else:          
-                for i in range(len(dates_temp)):
-                    dd = du([],[],int(dates_temp[i][0]),int(dates_temp[i][1]),int(dates_temp[i][2]),[],[],[],"yyyymmdd", args.dateFormat)
-                    datesNew_temp.append(dd._getdate())
-                del i
-
-            datesNew = np.asarray(datesNew_temp)
-            obs   = np.asarray(obs_temp,   dtype=float)
-            s_obs = np.asarray(s_obs_temp, dtype=float)
-            data  = np.concatenate((obs - obs[0,:], s_obs), axis=1)
-
-
-            if args.comp == 'all':
-                newFilename = siteID + ".tse"
-            else:
-                newFilename = siteID + args.comp + ".tse"
-
-            wrFile = open(newFilename, "w")
-            wrFile.write("* SITE         : " + siteID + "\n")
-            wrFile.write("* COMPONENT    : " + args.comp + "\n")
-            wrFile.write("* UNIT         : " + args.unit[1] + "\n")
-            wrFile.write("* DATE FORMAT  : " + args.dateFormat + "\n")
-
-            if args.offset is not None:
-                for i in range(len(args.offset)):
-                    wrFile.write("* OFFSET       : " + (" ".join(args.offset[i])) + "\n") 
-
-
-            if args.comp == 'all':
-                wrFile.write("* DATA ORDER   : E N U sE sN sU date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obsNew = data[:,[1,0,2,4,3,5]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'east':
-                wrFile.write("* DATA ORDER   : E sE date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obsNew = data[:,[1,4]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'north':
-                wrFile.write("* DATA ORDER   : N sN date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obsNew = data[:,[0,3]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'up':
-                wrFile.write("* DATA ORDER   : U sU date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obsNew = data[:,[2,5]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            wrFile.close()
-            if os.path.isfile(newFilename):
-                print(" " + newFilename + " file has been created...")
-            else:
-                print("Something went wrong!")
-        print("\n\n")  
-
-
-    elif args.fromWhich == 'bernese':
-        for ss in range(len(args.siteID[0])):
-            siteID = args.siteID[0][ss]
-
-            obs_temp   = []
-            s_obs_temp = []
-            dates_temp = [] 
-            for i in range(len(args.fname)):
-                idx = 0
-                lineIDX = 0
-                groupoflines = None
-                #print(args.fname[i].name)
-                with open(args.fname[i].name, 'r') as f:
-                    for line in f:
-                        if 'Reference epoch:' in line:
-                            dates_temp.append(line.split()[2].split("-"))
-                        if groupoflines is None:
-                            if siteID + '                  X' in line:   
-                                groupoflines = []
-                                groupoflines.append(line)
-                                lineIDX = idx
-                        elif line == '\n':
-                            if lineIDX + 7 == idx:
-                                break
-                        else:
-                            groupoflines.append(line)
-                        idx += 1
-
-                obs_temp.append([groupoflines[0].split()[3], groupoflines[1].split()[2], groupoflines[2].split()[2]])
-                s_obs_temp.append([groupoflines[5].split()[4], groupoflines[4].split()[4], groupoflines[3].split()[4]])
-            lat = float(groupoflines[4].split()[2]) * (math.pi / 180)
-            lon = float(groupoflines[5].split()[2]) * (math.pi / 180)
-            obsXYZ = np.asarray(obs_temp, dtype=float) - np.asarray(obs_temp[0], dtype=float)
-            s_obs = np.asarray(s_obs_temp, dtype=float)
-
-            transMat = np.array([[             -math.sin(lon),               -math.cos(lon), 0],
-                                [-math.sin(lat)*math.cos(lon), -math.sin(lat)*math.sin(lon), math.cos(lat)],
-                                [ math.cos(lat)*math.cos(lon),  math.cos(lat)*math.sin(lon), math.sin(lat)]])
-            obsENU = ((transMat @ obsXYZ.T).T)
-
-            datesNew_temp = []
-            if args.dateFormat == 'yyyymmdd':
-                for i in range(len(dates_temp)):
-                    datesNew_temp.append((int(dates_temp[i][0]),int(dates_temp[i][1]),int(dates_temp[i][2])))
-                del i
-            else:          
-                for i in range(len(dates_temp)):
-                    dd = du([],[],int(dates_temp[i][0]),int(dates_temp[i][1]),int(dates_temp[i][2]),[],[],[],"yyyymmdd", args.dateFormat)
-                    datesNew_temp.append(dd._getdate())
-                del i
-            datesNew = np.asarray(datesNew_temp)
-            data     = np.concatenate((obsENU, s_obs), axis=1)
-
-            if args.comp == 'all':
-                newFilename = siteID + ".tse"
-            else:
-                newFilename = siteID + args.comp + ".tse"
-
-            wrFile = open(newFilename, "w")
-            wrFile.write("* SITE         : " + siteID + "\n")
-            wrFile.write("* COMPONENT    : " + args.comp + "\n")
-            wrFile.write("* UNIT         : " + args.unit[1] + "\n")
-            wrFile.write("* DATE FORMAT  : " + args.dateFormat + "\n")
-
-            if args.offset is not None:
-                for i in range(len(args.offset)):
-                    wrFile.write("* OFFSET       : " + (" ".join(args.offset[i])) + "\n") 
-
-
-            if args.comp == 'all':
-                wrFile.write("* DATA ORDER   : E N U sE sN sU date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obsNew = data
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'east':
-                wrFile.write("* DATA ORDER   : E sE date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obsNew = data[:,[0,3]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'north':
-                wrFile.write("* DATA ORDER   : N sN date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obsNew = data[:,[1,4]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            if args.comp == 'up':
-                wrFile.write("* DATA ORDER   : U sU date\n")
-                wrFile.write("* COMMENT      : any comment could be added under this label.\n")
-                wrFile.write("* ENDOFHEADER\n")
-                
-                obsNew = data[:,[2,5]]
-                if (args.dateFormat == 'mjd') or (args.dateFormat == 'decimalYear'):
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        wrFile.write("%14.6f" % datesNew[i])
-                        wrFile.write("\n")
-                    del i,j
-                else:
-                    for i in range(len(obsNew[:,0])):
-                        for j in range(len(obsNew[0,:])):
-                            wrFile.write("%14.6f" % (obsNew[i,j]*unitScale))
-                        for k in range(len(datesNew[0,:])):
-                            wrFile.write("%8g" % datesNew[i,k])
-                        wrFile.write("\n")
-                    del i,j,k
-
-            wrFile.close()
-            if os.path.isfile(newFilename):
-                print(" " + newFilename + " file has been created...")
-            else:
-                print("Something went wrong!")
-        print("\n\n")
-    
+    offsets = None
+    if args.offset is not None:
+        offsets = [" ".join(off) for off in args.offset]
+    siteIDs = args.siteID[0] if args.siteID is not None else None
+    try:
+        gcts.convert([f.name for f in args.fname], args.fromWhich, args.comp, offsets,
+                     args.unit, args.dateFormat, siteIDs, args.index, args.incremental, write=True,
+                     verbose=True)
+    except ValueError as err:
+        print(err)
+        sys.exit()
+    print("\n\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import argparse, os, sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
+    sys.path.append(pyGCTSpath)
+
+from gcts.profiler import profiler
+
+__prog__ = 'detectOffsets.py'
+
+__description__ = '''
+detectOffsets -> Detects unknown offsets in the series file.
+
+The script scans every epoch of the converted time series file for an offset (a step
+in the series) and inserts the best one into the model while it improves the chosen
+information criterion (BIC or AIC), up to -maxOffsets offsets. Each candidate is
+scored by bordering the normal equations of the current model rather than a new
+least-squares solution, so the scan of n epochs costs O(n*m^2) for m unknowns. The
+components of a series file of all components share the offsets. The detected
+offsets are added to the header as * OFFSET lines, which are then used by
+removeOutliers.py and evalCampaign.py, by specifiying -write argument.
+'''
+
+__epilog__ = '''
+*** EXAMPLES ***
+
+---------
+:: Ex1 ::
+    Let the time series file includes all components for the TEST station. To detect
+    the offsets according to the BIC and write them into the file.
+
+
+    detectOffsets.py -fname TEST.tse -write
+
+        ===================================================================
+        detectOffsets.py is running and using the parameters:
+        ===================================================================
+            filename : TEST.tse
+           criterion : BIC
+          maxOffsets : 5
+              minGap : 2
+        ===================================================================
+
+         # 	 Offset 		 Epoch 	 dBIC
+        ---	--------		-------	--------
+         1	         55450	    151	   -547.17
+         2	         55900	    301	   -352.81
+
+
+         TEST.tse file has been created...
+
+
+    NOTE: dBIC is the change of the criterion by each offset, in the order of the
+          insertion. The offsets already in the header are kept in the model.
+
+
+
+    This file is part of GCTS v1.0.
+
+    GCTS v1.0 is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    GCTS v1.0 is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with GCTS v1.0.  If not, see <https://www.gnu.org/licenses/>.
+'''
+
+__author__ = 'Huseyin Duman'
+
+
+def _getparser():
+    parser = argparse.ArgumentParser(description=__description__,
+                                     epilog=__epilog__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("-fname", type=argparse.FileType('r') , 
+                        required=True, nargs='?',
+                        help = """[?](comp).tse file name whose offsets are detected, which
+                        could contain either only one GPS component or all GPS component.
+                        """)
+
+    parser.add_argument("-criterion", type=str,
+                        default='BIC', nargs='?',
+                        choices=['BIC','AIC'],
+                        help="""Information criterion deciding whether an offset is inserted,
+                        which is set to BIC as default.""")
+
+    parser.add_argument("-maxOffsets", nargs="?", default=5, type=int,
+                        help="""Maximum number of the offsets to be detected.""")
+
+    parser.add_argument("-minGap", nargs="?", default=2, type=int,
+                        help="""Minimum number of epochs before and after an offset.""")
+
+    parser.add_argument("-periods", type=str, nargs='+',
+                        default=[],
+                        help="""Seasonal periodicities to detrend the data, as in
+                        removeOutliers.py (e.g. T2, C1 or 14.66 days).""")
+
+    parser.add_argument("-write", action='store_true',
+                        help="""A choice to be write down the detected offsets into the file
+                        or not""")
+
+    parser.add_argument("-profile", action='store_true',
+                        help="""Records wall time, call counts and peak memory of each named
+                        stage (e.g. designMat, scan, write), and writes them into
+                        [?]_profile.json file next to the results.""")
+
+    return parser
+
+def _dispParser(args):
+    print(" ===================================================================\n",
+          os.path.basename(__file__) + " is running and using the parameters:\n",
+        "===================================================================")
+    print("    filename : " + args.fname.name + "\n",
+          "  criterion : " + args.criterion + "\n",
+          " maxOffsets : " + str(args.maxOffsets) + "\n",
+          "     minGap : " + str(args.minGap))
+    for j in args.periods:
+        print("     periods : " + j)
+    if args.profile:
+        print("     profile : on")
+    print(" ===================================================================\n")
+
+
+
+def main():
+    args = _getparser().parse_args()
+    import gcts
+    _dispParser(args)
+
+    prof = profiler(args.profile)
+    try:
+        gcts.detectOffsets(args.fname.name, args.periods, args.criterion, args.maxOffsets,
+                           args.minGap, write=args.write, prof=prof, verbose=True)
+    except ValueError as err:
+        print(err)
+        sys.exit()
+
+    prof._write(args.fname.name.split(".")[0] + "_profile.json", vars(args))
+
+
+if __name__ == "__main__":
+    main()
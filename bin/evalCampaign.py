@@ -1,21 +1,17 @@
 #!/usr/bin/env python3
 
-import argparse, statistics, time, os,sys
-pyGCTSpath="{}/lib".format(os.environ['pyGCTS'])
-if pyGCTSpath not in sys.path:
+import argparse, time, os,sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
     sys.path.append(pyGCTSpath)
 
 
-import leastSquares as ls
-import tseFile as tf
-import numpy as np
-import scipy.linalg as la
-import matplotlib.pylab as plt
-from scipy.interpolate import griddata
-from designMat import designMat as dm
-from searchSpace import searchSpace as ss
-from noise import noise
-from dateUtilities import date as du
+from gcts import tseFile as tf
+from gcts.profiler import profiler
+# scipy, matplotlib and the noise modules are imported by gcts.evaluate on the
+# code paths that need them, so that -h and -ols runs start quickly
 
 
 
@@ -162,10 +158,11 @@ def _getparser():
                                      formatter_class=argparse.RawDescriptionHelpFormatter)
 
     parser.add_argument("-fname", type=argparse.FileType('r') , 
-                        required=True, nargs='?',
+                        required=True, nargs='+',
                         help = """[?](comp).tse file name to be analyzed, which
                         could contain only one GPS component or only one column
-                        with its standard deviation.""")
+                        with its standard deviation. A [?].tse file of all components,
+                        or several files, are evaluated jointly (see -workers).""")
 
     parser.add_argument("-periods", type=str, nargs='+', default=[],
                         help="""Seasonal periodicities to detrend the data. Frequently used
@@ -215,6 +212,121 @@ def _getparser():
                         the solution closest to 1 is selected. For a robust analysis, this process
                         is repeated N times which is specified under -repeat argument.""")
     
+    parser.add_argument("-sampler", type=str, nargs='?',
+                        default='grid', choices=['grid','adaptive'],
+                        help="""How the s0 = 1 curve is located in each repeat. The grid solves
+                        all nRND x nRND combinations of the random points and contours the
+                        interpolated surface. The adaptive takes the random points as a coarse
+                        seed grid (e.g. -nRND 6) and only refines the cells whose corners
+                        straddle s0 = 1, until the bilinear interpolation of s0 in the cells is
+                        within -tol, which needs far fewer weighted solutions.""")
+
+    parser.add_argument("-tol", type=float, nargs='?',
+                        default=1e-3,
+                        help="""Tolerance on s0 for the adaptive sampler, which is set to 0.001
+                        as default.""")
+
+    parser.add_argument("-method", type=str, nargs='?',
+                        default='search', choices=['search','mle'],
+                        help="""Estimation method of the noise amplitudes. The search is the
+                        approach of Duman and Sanli (2020) explained under -nRND, -incr and
+                        -repeat. The mle maximizes the Gaussian log-likelihood of the series
+                        over the white and flicker noise amplitudes with a gradient-based
+                        optimizer (L-BFGS-B), using one eigendecomposition of the flicker noise
+                        covariance, so that -nRND, -incr and -repeat are not needed.""")
+
+    parser.add_argument("-estKappa", action='store_true',
+                        help="""Estimates the spectral index together with the noise amplitudes
+                        when -method mle is chosen. The -kappa is then not used.""")
+
+    parser.add_argument("-kappaSweep", type=float, nargs=3,
+                        help="""Evaluates the spectral indices from the first to the second value
+                        by the step of the third (e.g. -2 -0.2 0.1) in one run and reports the
+                        kappa of the largest log-likelihood with its maximum likelihood noise
+                        amplitudes (as -method mle). The kernels of all kappas come from one
+                        recurrence, the covariance of each kappa and its eigendecomposition are
+                        built once, and the kappas are evaluated by -workers processes. -kappa
+                        is then not used.""")
+
+    parser.add_argument("-converge", type=float, nargs='?',
+                        help="""Stops the repeats before -repeat when the running medians of the
+                        noise amplitudes and their bootstrap spreads have all changed by less than
+                        this tolerance (relative to the medians, e.g. 0.01) over the last -window
+                        repeats. -repeat is then the maximum number of repeats, and the number
+                        used is reported.""")
+
+    parser.add_argument("-window", type=int, nargs='?',
+                        default=5,
+                        help="""Number of repeats over which the convergence is checked, which is
+                        set to 5 as default. At least twice as many repeats are made.""")
+
+    parser.add_argument("-update", action='store_true',
+                        help="""Incremental re-estimation for series with new epochs appended. The
+                        state of the weighted solution (flicker noise covariance, Cholesky factor
+                        of the covariance matrix, whitened normal equations and noise amplitudes)
+                        is saved into [?]_state.npz file. If the file exists and the series only
+                        has new epochs at its end, the appended rows and the new rows and columns
+                        of the covariance are folded into the saved solution. The previous
+                        amplitudes scaled onto s0 = 1 of the longer series are then the centre of
+                        a narrowed search space (within -+50 %%), and -method mle starts from the
+                        previous amplitudes. Otherwise the noise is estimated from scratch.""")
+
+    parser.add_argument("-checkpoint", type=int, nargs='?',
+                        help="""Saves the state of the repeats every N repeats into
+                        [?]_checkpoint.npz file (the noise amplitudes of the completed repeats,
+                        the states of the random generators and the number of solutions), and the
+                        flicker noise covariance with its decomposition once into
+                        [?]_checkpointJ.npz file, so that a stopped run can be continued by
+                        -resume. The files are removed when the run is completed.""")
+
+    parser.add_argument("-resume", action='store_true',
+                        help="""Continues the repeats from [?]_checkpoint.npz file if it belongs to
+                        the same series, parameters and -seed, which gives the same results as an
+                        uninterrupted run. Otherwise the repeats start from scratch. With -workers
+                        each series is resumed from its own file.""")
+
+    parser.add_argument("-seed", type=int, nargs='?',
+                        help="""Seed of the random points in the search space, so that the
+                        results can be reproduced.""")
+
+    parser.add_argument("-cache", type=str, nargs='?',
+                        help="""Directory of the result cache. The results are stored under a hash
+                        of the series (observations, dates, offsets, site, component, unit and
+                        date format) and all estimation parameters (periods, alpha, nRND, fs,
+                        kappa, incr, repeat, method, seed, etc.), and an identical run is answered
+                        from the cache. Unreadable entries are dropped. It is not used with
+                        -update.""")
+
+    parser.add_argument("-cacheSize", type=float, nargs='?',
+                        default=100,
+                        help="""Size limit of the cache directory in MB, which is set to 100 as
+                        default. The least recently used results are removed beyond it.""")
+
+    parser.add_argument("-invalidate", action='store_true',
+                        help="""Removes the cached result of this run, which is then recomputed.""")
+
+    parser.add_argument("-clearCache", action='store_true',
+                        help="""Removes all results in the cache directory before the run.""")
+
+    parser.add_argument("-workers", type=_workers, nargs='?',
+                        default=1,
+                        help="""Number of processes for the joint evaluation of the east, north
+                        and up components of a [?].tse file of all components, or of several
+                        files. The series are grouped by their epochs (e.g. the sites of a
+                        campaign occupied on the same days), the flicker noise covariance and its
+                        eigendecomposition are built once per group, and the weighted solutions
+                        are made in its eigenbasis. With -seed the i-th series is
+                        seeded by seed + i. It is set to 1 as default. With auto, the number
+                        of processes and of their BLAS threads are chosen from the length of
+                        the series and the cores and memory available, i.e. many single
+                        threaded processes for short campaign series and a few processes with
+                        many threads for long series.""")
+
+    parser.add_argument("-blasThreads", type=int, nargs='?',
+                        help="""Number of BLAS threads of each process of -workers. The cores are
+                        shared by the processes as default. It needs the threadpoolctl package,
+                        without it the BLAS library keeps its own setting.""")
+
     parser.add_argument("-ols", action='store_true',
                         help = """Ordinary least-squares estimation. If this argument is specified,
                         time series data are analyzed without any weight matrix.""")
@@ -222,13 +334,61 @@ def _getparser():
     parser.add_argument("-writeModel", action='store_true',
                         help="A choice to be write down the model values or not")
 
+    parser.add_argument("-memLimit", type=float, nargs='?',
+                        help="""Memory budget in MB for the noise matrices. If it is specified,
+                        the flicker noise covariance is built blockwise, and the covariance
+                        matrices of all weighted solutions are formed and factorized in place in
+                        one preallocated workspace, so that the peak memory stays below the
+                        limit (about two n x n matrices for n epochs). It can not be used with
+                        -method mle, -kappaSweep or -update, which decompose or keep the whole
+                        noise matrices.""")
+
+    parser.add_argument("-approx", type=str, nargs='?',
+                        choices=['lowrank','truncated'],
+                        help="""Approximate flicker noise covariance for very long series. The
+                        lowrank is a randomized low-rank plus diagonal representation of J and
+                        the weighted solutions use the Woodbury identity, whereas the truncated
+                        cuts the Toeplitz kernel of J after a number of lags and uses a banded
+                        Cholesky factorization. The rank (or the bandwidth) is doubled until
+                        s0 and the sigma of the trend agree with the exact solution within
+                        -approxTol at the corners of the search space. The exact solution is
+                        the default.""")
+
+    parser.add_argument("-approxTol", type=float, nargs='?',
+                        default=1e-3,
+                        help="""Relative tolerance on s0 and the sigma of the trend for the
+                        approximate noise model, which is set to 0.001 as default.""")
+
+    parser.add_argument("-profile", action='store_true',
+                        help="""Records wall time, call counts and peak memory of each named
+                        stage (e.g. noise.mat, gridSolves, griddata, contour, searchSpace) and of
+                        each repeat, and writes them into [?]_profile.json file next to the
+                        results. With -workers the stages of the processes are included, their
+                        wall times summed over the processes.""")
+
+    parser.add_argument("-profileHook", type=str, nargs='?',
+                        choices=['cProfile','tracemalloc'],
+                        help="""Runs the repeat loop under cProfile or tracemalloc. The
+                        statistics are written into [?]_profile.prof and [?]_profile.txt, or
+                        [?]_tracemalloc.txt files, respectively. With tracemalloc the peak
+                        memory of the stages of -profile is traced too (which slows the run
+                        down), otherwise it is the peak resident set size.""")
+
     return parser
 
+def _workers(value):
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid number of workers: " + value)
+
 def _dispParser(args):
     print(" ======================================================================================\n",
           os.path.basename(__file__) + " is running and using the parameters:\n",
         "======================================================================================")
-    print("    filename : " + args.fname.name)
+    for f in args.fname: print("    filename : " + f.name)
     for i in args.periods: print("     periods : " + i)
     print("       alpha : " + str(args.alpha) + "\n",
           "       nRND : " + str(args.nRND) + "\n",
@@ -236,159 +396,150 @@ def _dispParser(args):
           "      kappa : " + str(args.kappa) + "\n",
           "       incr : " + str(args.incr) + "\n",
           "     repeat : " + str(args.repeat))
+    if args.update:
+        print("      update : on")
+    if args.seed is not None:
+        print("        seed : " + str(args.seed))
+    if args.checkpoint is not None or args.resume:
+        print("  checkpoint : " + str(args.checkpoint) + (" (resume)" if args.resume else ""))
+    if args.workers != 1:
+        print("     workers : " + str(args.workers))
+    if args.blasThreads is not None:
+        print(" blasThreads : " + str(args.blasThreads))
+    if args.cache is not None:
+        print("       cache : " + args.cache + " (" + str(args.cacheSize) + " MB)")
+    if args.converge is not None:
+        print("    converge : " + str(args.converge) + " (window " + str(args.window) + ")")
+    if args.sampler != 'grid':
+        print("     sampler : " + args.sampler + " (tol " + str(args.tol) + ")")
+    if args.method != 'search':
+        print("      method : " + args.method + (" (kappa estimated)" if args.estKappa else ""))
+    if args.kappaSweep is not None:
+        print("  kappaSweep : " + " ".join(str(k) for k in args.kappaSweep))
+    if args.memLimit is not None:
+        print("    memLimit : " + str(args.memLimit) + " MB")
+    if args.approx is not None:
+        print("      approx : " + args.approx + " (tol " + str(args.approxTol) + ")")
     if args.writeModel:
         print("  writeModel : on")
     else:
         print("  writeModel : off")
+    if args.profile:
+        print("     profile : on")
+    if args.profileHook is not None:
+        print(" profileHook : " + args.profileHook)
     print(" ======================================================================================\n")
 
 
-def main():
-    startTime = time.time()
-    args = _getparser().parse_args()
-    _dispParser(args)
-    tf._stats(args.fname.name)
-
-    header, _, offset, obs, dates = tf._read(args.fname.name)
-    A, cycle = dm(args.fname.name, args.periods, args.fs)._coefficients()
-    L   = obs[:,0].reshape(len(obs[:,0]),1)
-    dof = len(A[:,0]) - len(A[0,:])
-    unkOLS, sUnkOLS, s0OLS, resid = ls._lse(A, L)
-    WRMS = np.sqrt((resid.T @ resid) / len(A[:,0]))[0][0]
-    #print("WRMS: " + str(WRMS))
-    
-    for line in header:
-        if 'UNIT' in line:
-            unit = line.split(": ")[1].split("\n")[0]
-            break
-    
-    unitLabel = [unit] * len(unkOLS)    
-    unitLabel[1] = unitLabel[1] + "/year"
-    unkLabel = ['intercept', 'trend']
-    offsetLabel = ["{}{}".format(a, b) for a, b in zip(["offset at "]*len(offset), offset)]
-    unkLabel = np.append(unkLabel, offsetLabel)
-    seasLabel = []
-    for s1 in range(len(cycle)):
-        seasLabel = np.append(seasLabel, ['sin ' + "{:10.4f}".format(cycle[s1]), 'cos ' + "{:10.4f}".format(cycle[s1])])
-    unkLabel = np.append(unkLabel, seasLabel)
- 
+def _printResult(res, args):
     if args.ols:
         print("\n Ordinary Least-squares estimation\n")
-        for o in range(len(unkOLS)):
+        for o in range(len(res.unkOLS)):
             print("%20s: %10.4f  +- %9.4f %s" % \
-                (unkLabel[o], \
-                 unkOLS[o], \
-                 sUnkOLS[o], \
-                 unitLabel[o]))
+                (res.labels[o], \
+                 res.unkOLS[o], \
+                 res.sUnkOLS[o], \
+                 res.units[o]))
         print("\n")
-        print("%20s: %14.8f %8s\n" % ('s0', s0OLS, unit))
-        print("\nElapsed time : %.1f sec\n" % (time.time() - startTime))
-        return 
+        print("%20s: %14.8f %8s\n" % ('s0', res.s0OLS, res.unit))
+        return
 
-    for line in header:
-        if 'DATE FORMAT' in line:
-            dateFormat = line.split(": ")[1].split("\n")[0]
-            break
-
-    
-
-    _, J = noise(dates, dateFormat, args.kappa, args.fs).mat()
-
-    resultTemp = np.zeros((args.nRND**2,3))
-    wnaLast = np.zeros((args.repeat,1),dtype=float)
-    fnaLast = np.zeros((args.repeat,1),dtype=float)
-    for i in range(args.repeat):
-        printProgressBar(i+1, args.repeat, prefix=' Progress', suffix='Complete')
-        _, yWNA, _, yFNA = ss(args.alpha, WRMS, dof, args.nRND)._randomPoints()
-
-        idx = 0
-        for j in range(args.nRND):
-            cWN = (yWNA[j]**2 * np.eye(len(A[:,0]), dtype=float))
-            for k in range(args.nRND):
-                C = cWN + (yFNA[k]**2 * J)
-                _, _, s0, _ = ls._lse(A, L, la.cholesky(la.inv(C)).T)
-                resultTemp[idx,:] = [yWNA[j][0], yFNA[k][0], s0]
-                idx += 1
-        #np.savetxt('15-s0s.dat', resultTemp, fmt="%10.10f")
-        xx     = np.arange(min(resultTemp[:,0]), max(resultTemp[:,0]), args.incr)
-        yy     = np.arange(min(resultTemp[:,1]), max(resultTemp[:,1]), args.incr)
-        XX, YY = np.meshgrid(xx, yy)
-        ZZ     = griddata((resultTemp[:,0],resultTemp[:,1]), resultTemp[:,2], (XX, YY), method='cubic')
-        #np.savetxt('1-XX.dat', XX, fmt="%10.4f")
-        #np.savetxt('2-YY.dat', YY, fmt="%10.4f")
-        #np.savetxt('3-ZZ.dat', ZZ, fmt="%10.4f")
-        if (np.min(np.ma.masked_invalid(ZZ)) < 1) and (np.max(np.ma.masked_invalid(ZZ)) > 1):
-            cs     = plt.contour(xx, yy, np.ma.masked_invalid(ZZ), [1])
-            L1     = cs.collections[0].get_paths()[0]
-            coorL1 = L1.vertices
-        else:
-            index  = np.where(abs(np.ma.masked_invalid(ZZ) - 1) == np.amin(abs(np.ma.masked_invalid(ZZ) - 1)))
-            coorL1 = np.array([[XX[index[0][0],index[1][0]], \
-                                YY[index[0][0],index[1][0]]]])
-        #np.savetxt('4-coorL1.dat', coorL1, fmt="%10.4f")
-        s0 = np.zeros((len(coorL1[:,0]),1),dtype=float)
-        for d in range(len(coorL1[:,0])):
-            C2 = (coorL1[d,0]**2 * np.eye(len(A[:,0]), dtype=float)) + \
-                 (coorL1[d,1]**2 * J)
-            _, _, s0[d], _ = ls._lse(A, L, la.cholesky(la.inv(C2)).T)
-            
-        diffIDX = np.where(abs(s0 - 1) == np.amin(abs(s0 - 1)))[0][0]
-        wnaLast[i] = coorL1[diffIDX,0]
-        fnaLast[i] = coorL1[diffIDX,1]
-
-    #np.savetxt('5-noiseAmp.dat', np.concatenate((wnaLast, fnaLast), axis=1), fmt="%10.4f")
-    Cfin = (statistics.median(wnaLast)**2 * np.eye(len(A[:,0]), dtype=float)) + \
-           (statistics.median(fnaLast)**2 * J)
-
-    unk_fin, sUnk_fin, s0_fin, _ = ls._lse(A, L, la.cholesky(la.inv(Cfin)).T)
     print("\n")
-    for o in range(len(unk_fin)):
+    for o in range(len(res.unk)):
         print("%20s: %10.4f +- %9.4f %s" % \
-            (unkLabel[o], \
-            unk_fin[o], \
-            sUnk_fin[o], \
-            unitLabel[o]))
+            (res.labels[o], \
+            res.unk[o], \
+            res.sUnk[o], \
+            res.units[o]))
     print("\n")
-    print("%20s: %10.4f %s" % ('wna', statistics.median(wnaLast), unit))
-    print("%20s: %10.4f %s" % ('fna', statistics.median(fnaLast), unit+"/year^0.25"))
-    print("%20s: %14.8f %s\n" % ('s0', s0_fin, unit))
+    print("%20s: %10.4f %s" % ('wna', res.wna, res.unit))
+    print("%20s: %10.4f %s" % ('fna', res.fna, res.unit+"/year^0.25"))
+    if args.estKappa:
+        print("%20s: %10.4f" % ('kappa', res.kappa))
+    print("%20s: %14.8f %s\n" % ('s0', res.s0, res.unit))
     
 
     if args.writeModel:
-        for ii in range(len(header)):
-            if 'COMMENT' and 'outliers' in header[ii]:
-                header[ii] = "* COMMENT      : Model values" + "\n"
-                break
-        modelFilename = (args.fname.name.split(".")[0] + "_model.tse")
-        tf._write(modelFilename, \
-                 header, \
-                 np.concatenate(((A @ unk_fin), np.zeros((len(A[:,0]),1), dtype=float)), axis=1), \
-                 dates)
+        import gcts
+        gcts._writeModel(res, verbose=True)
+
+
+def _kappaSweep(fnames, args, cache, prof):
+    import gcts, numpy as np
+    if len(fnames) > 1:
+        raise ValueError("The kappa sweep needs a series of one component!")
+    first, last, step = args.kappaSweep
+    if step <= 0 or last < first:
+        raise ValueError("Please check your kappa sweep range!")
+    kappas = np.round(np.arange(first, last + step / 2, step), 10)
+    sweep  = gcts.kappaSweep(fnames[0], kappas, args.workers, args.blasThreads, prof=prof,
+                             verbose=True, periods=args.periods, fs=args.fs,
+                             memLimit=args.memLimit, approx=args.approx, cache=cache,
+                             invalidate=args.invalidate)
+    print("\n%20s %10s %10s %14s" % ('kappa', 'wna', 'fna', 'logL'))
+    for kappa, wna, fna, score in sweep.table:
+        print("%20.4f %10.4f %10.4f %14.6f%s" % (kappa, wna, fna, score,
+              "  <" if kappa == sweep.kappas[sweep.best] else ""))
+    print("\n%20s: %10.4f" % ('best kappa', sweep.kappas[sweep.best]))
+    _printResult(sweep.results[sweep.best], args)
 
-    print("\nElapsed time : %.1f sec\n" % (time.time() - startTime))  
 
-
-def printProgressBar(iteration, total, prefix = '', suffix = '', decimals = 1, length = 50, fill = '█', printEnd = "\r"):
-    #https://stackoverflow.com/questions/3173320/text-progress-bar-in-the-console
-    """
-    Call in a loop to create terminal progress bar
-    @params:
-        iteration   - Required  : current iteration (Int)
-        total       - Required  : total iterations (Int)
-        prefix      - Optional  : prefix string (Str)
-        suffix      - Optional  : suffix string (Str)
-        decimals    - Optional  : positive number of decimals in percent complete (Int)
-        length      - Optional  : character length of bar (Int)
-        fill        - Optional  : bar fill character (Str)
-        printEnd    - Optional  : end character (e.g. "\r", "\r\n") (Str)
-    """
-    percent = ("{0:." + str(decimals) + "f}").format(100 * (iteration / float(total)))
-    filledLength = int(length * iteration // total)
-    bar = fill * filledLength + '-' * (length - filledLength)
-    print('\r%s |%s| %s%% %s' % (prefix, bar, percent, suffix), end = printEnd)
-    # Print New Line on Complete
-    if iteration == total: 
-        print()
+def main():
+    startTime = time.time()
+    args = _getparser().parse_args()
+    import gcts
+    _dispParser(args)
+    fnames = [f.name for f in args.fname]
+    for fname in fnames:
+        tf._stats(fname)
+    prof = profiler(args.profile, args.profileHook)
+    profFilename = fnames[0].split(".")[0] + "_profile.json"
+
+    cache = None
+    if args.cache is not None:
+        from gcts.resultCache import resultCache
+        cache = resultCache(args.cache, args.cacheSize * 2**20)
+        if args.clearCache:
+            cache._clear()
+
+    try:
+        if args.kappaSweep is not None:
+            _kappaSweep(fnames, args, cache, prof)
+            prof._write(profFilename, vars(args))
+            print("\nElapsed time : %.1f sec\n" % (time.time() - startTime))
+            return
+        joint = len(fnames) > 1 or gcts._series(fnames[0])._label('COMPONENT') == 'all'
+        if joint:
+            results = gcts.evaluateAll(fnames, args.workers, args.seed, args.blasThreads, prof=prof,
+                                       verbose=True, periods=args.periods, alpha=args.alpha,
+                                       nRND=args.nRND, fs=args.fs, kappa=args.kappa, incr=args.incr,
+                                       repeat=args.repeat, ols=args.ols, memLimit=args.memLimit,
+                                       approx=args.approx, approxTol=args.approxTol,
+                                       method=args.method, estKappa=args.estKappa,
+                                       sampler=args.sampler, tol=args.tol, converge=args.converge,
+                                       window=args.window, update=args.update, cache=cache,
+                                       invalidate=args.invalidate, checkpoint=args.checkpoint,
+                                       resume=args.resume)
+        else:
+            results = [gcts.evaluate(fnames[0], args.periods, args.alpha, args.nRND, args.fs, args.kappa,
+                                     args.incr, args.repeat, args.ols, args.memLimit, args.approx,
+                                     args.approxTol, writeModel=False, method=args.method,
+                                     estKappa=args.estKappa, sampler=args.sampler, tol=args.tol,
+                                     converge=args.converge, window=args.window, update=args.update,
+                                     seed=args.seed, cache=cache, invalidate=args.invalidate,
+                                     checkpoint=args.checkpoint, resume=args.resume, prof=prof,
+                                     verbose=True)]
+    except ValueError as err:
+        print(err)
+        sys.exit()
+
+    for res in results:
+        if joint:
+            print("\n         ******* %s *******" % res.filename)
+        _printResult(res, args)
+
+    prof._write(profFilename, vars(args))
+    print("\nElapsed time : %.1f sec\n" % (time.time() - startTime))  
 
 
 if __name__ == "__main__":
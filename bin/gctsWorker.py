@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+import argparse, os, sys, json
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
+    sys.path.append(pyGCTSpath)
+
+import gcts
+
+__prog__ = 'gctsWorker.py'
+
+__description__ = '''
+gctsWorker -> Runs GCTS jobs in a long-lived process.
+
+The script keeps the imports, the prior fits of the search space and the noise
+matrices of the recently used epoch sets in memory, and runs the convert, clean and
+evaluate jobs sent to it one JSON object per line, either over the standard input or
+over a local (Unix domain) socket. Each job is answered by one JSON line holding its
+id and either its result or an error message. Large campaigns evaluated by many
+short calls thus pay the start-up costs only once.
+'''
+
+__epilog__ = '''
+*** EXAMPLES ***
+
+---------
+:: Ex1 ::
+    Jobs over the standard input, e.g. from a file including one job per line.
+
+
+    gctsWorker.py < jobs.txt
+
+        {"id": 1, "job": "convert", "args": {"fnames": ["TEST.series"], "unit": ["m", "mm"], "dateFormat": "mjd"}}
+        {"id": 2, "job": "clean", "args": {"tse": "TEST.tse", "comps": ["east", "north", "up"]}}
+        {"id": 3, "job": "evaluate", "args": {"tse": "TESTeast.tse", "nRND": 30, "repeat": 100}}
+        {"id": 4, "job": "shutdown"}
+
+
+---------
+:: Ex2 ::
+    Jobs over a local socket. The worker runs until a shutdown job is received.
+
+
+    gctsWorker.py -socket /tmp/gcts.sock &
+    echo '{"id": 1, "job": "ping"}' | nc -U /tmp/gcts.sock
+
+        {"id": 1, "ok": true, "result": "pong"}
+
+
+    NOTE: The arguments of the jobs are those of gcts.convert, gcts.clean,
+          gcts.evaluate and gcts.evaluateAll. The latter evaluates a batch of series,
+          e.g. {"job": "evaluateAll", "args": {"tses": ["S001.tse", "S002.tse"], ...}},
+          sharing the noise matrices of the series with the same epochs. The files
+          are written wrt. the working directory of the worker.
+
+
+
+    This file is part of GCTS v1.0.
+
+    GCTS v1.0 is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    GCTS v1.0 is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with GCTS v1.0.  If not, see <https://www.gnu.org/licenses/>.
+'''
+
+__author__ = 'Huseyin Duman'
+
+
+def _getparser():
+    parser = argparse.ArgumentParser(description=__description__,
+                                     epilog=__epilog__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("-socket", type=str, nargs='?',
+                        help="""Path of the local socket to listen on. Without it the jobs
+                        are read from the standard input and answered on the standard
+                        output.""")
+
+    parser.add_argument("-cacheSize", type=int, nargs='?', default=8,
+                        help="""Number of noise matrices (one per set of epochs, kappa and
+                        fs) kept in memory between the evaluate jobs.""")
+
+    parser.add_argument("-resultCache", type=str, nargs='?',
+                        help="""Directory of the result cache (see evalCampaign.py -cache), whose
+                        results are returned for identical evaluate jobs.""")
+
+    parser.add_argument("-resultCacheSize", type=float, nargs='?', default=100,
+                        help="""Size limit of the result cache directory in MB.""")
+
+    parser.add_argument("-alpha", type=float, nargs='+', default=[0.05],
+                        help="""Significance level(s) whose search space prior fits are
+                        computed at start-up.""")
+
+    return parser
+
+
+def _warmUp(alphas):
+    # imports and prior fits which the evaluate jobs would otherwise pay for
+    import scipy.linalg, scipy.interpolate, matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pylab
+    from gcts import noise, searchSpace
+    for alpha in alphas:
+        searchSpace._priorFits(alpha)
+
+
+def _answer(line, Jcache, cache):
+    # the response line of a job line, None for the shutdown job
+    try:
+        job = json.loads(line)
+    except ValueError as err:
+        return json.dumps({'id': None, 'ok': False, 'error': "Invalid job: " + str(err)})
+    if not isinstance(job, dict):
+        return json.dumps({'id': None, 'ok': False, 'error': "Invalid job: not a JSON object"})
+    if job.get('job') == 'shutdown':
+        return None
+    return json.dumps(gcts._runJob(job, Jcache, cache))
+
+
+def _serveStdin(Jcache, cache):
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response = _answer(line, Jcache, cache)
+        if response is None:
+            break
+        sys.stdout.write(response + "\n")
+        sys.stdout.flush()
+
+
+def _serveSocket(path, Jcache, cache):
+    import socketserver
+
+    class handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                line = line.decode()
+                if not line.strip():
+                    continue
+                response = _answer(line, Jcache, cache)
+                if response is None:
+                    self.server.running = False
+                    break
+                self.wfile.write((response + "\n").encode())
+                self.wfile.flush()
+
+    if os.path.exists(path):
+        os.remove(path)
+    # one connection at a time, the jobs share the caches
+    with socketserver.UnixStreamServer(path, handler) as server:
+        server.running = True
+        while server.running:
+            server.handle_request()
+    os.remove(path)
+
+
+def main():
+    args = _getparser().parse_args()
+    _warmUp(args.alpha)
+    Jcache = gcts.matCache(args.cacheSize)
+    cache  = None
+    if args.resultCache is not None:
+        from gcts.resultCache import resultCache
+        cache = resultCache(args.resultCache, args.resultCacheSize * 2**20)
+    if args.socket is None:
+        _serveStdin(Jcache, cache)
+    else:
+        _serveSocket(args.socket, Jcache, cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import argparse, os, sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
+    sys.path.append(pyGCTSpath)
+
+from gcts.orgIndex import orgIndex
+
+__prog__ = 'indexOrg.py'
+
+__description__ = '''
+indexOrg -> Indexes the pbo. records of the Gamit/Globk .org files.
+
+The script scans the .org files once, through a memory map with a compiled pattern,
+and stores the site, file, byte offset and epoch of each pbo. record in a local SQLite
+database. The files already indexed are only scanned again when their size or their
+modification time changes, so that newly added daily files are indexed incrementally.
+conv2tse.py -index then reads the records of a site by seeking to them instead of
+reading the whole archive.
+'''
+
+__epilog__ = '''
+*** EXAMPLES ***
+
+---------
+:: Ex1 ::
+    Let the .org files of the archive be in the glorgs directory.
+
+
+    indexOrg.py -fname glorgs/*.org -index glorgs.sqlite
+
+        ========================================================================
+        indexOrg.py is running and using the parameters:
+        ========================================================================
+            filename : glorgs/globk_thss_00023.org
+            ...
+               index : glorgs.sqlite
+        ========================================================================
+
+         12 file(s) have been indexed into glorgs.sqlite
+
+         Site 	 nRecords 	 First 	 	 Last
+        ------	----------	----------	----------
+         ZIMM	        12	  20000123	  20150821
+        ...
+
+
+    conv2tse.py -fname glorgs/*.org -unit m mm -fromWhich gamit -dateFormat mjd -siteID ZIMM -index glorgs.sqlite
+
+    NOTE: The files are stored with their absolute paths.
+
+
+
+    This file is part of GCTS v1.0.
+
+    GCTS v1.0 is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    GCTS v1.0 is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with GCTS v1.0.  If not, see <https://www.gnu.org/licenses/>.
+'''
+
+__author__ = 'Huseyin Duman'
+
+
+def _getparser():
+    parser = argparse.ArgumentParser(description=__description__,
+                                     epilog=__epilog__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("-fname", type=str, required=True, nargs='+',
+                        help = """Gamit/Globk .org files to be indexed.""")
+
+    parser.add_argument("-index", type=str, required=True, nargs='?',
+                        help="""SQLite database of the index, which is created if it does not
+                        exist.""")
+
+    parser.add_argument("-listSites", action='store_true',
+                        help="""Lists the indexed sites with their number of records and their
+                        first and last epochs.""")
+
+    return parser
+
+def _dispParser(args):
+    print(" ========================================================================\n",
+          os.path.basename(__file__) + " is running and using the parameters:\n",
+        "========================================================================")
+    for fname in args.fname:
+        print("    filename : " + fname)
+    print("       index : " + args.index)
+    print(" ========================================================================\n")
+
+
+def main():
+    args = _getparser().parse_args()
+    _dispParser(args)
+
+    try:
+        idx  = orgIndex(args.index)
+        nNew = idx._update(args.fname)
+    except (OSError, ValueError) as err:
+        print(err)
+        sys.exit()
+    print(" " + str(nNew) + " file(s) have been indexed into " + args.index + "\n")
+    if args.listSites:
+        print(" Site \t nRecords \t First \t \t Last")
+        print("------\t----------\t----------\t----------")
+        for site, n, first, last in idx._sites():
+            print("%5s\t%10d\t%10d\t%10d" % (site, n, first, last))
+    idx._close()
+    print("\n\n")
+
+
+if __name__ == "__main__":
+    main()
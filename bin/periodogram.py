@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+import argparse, os, sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
+    sys.path.append(pyGCTSpath)
+
+from gcts.profiler import profiler
+
+__prog__ = 'periodogram.py'
+
+__description__ = '''
+periodogram -> Finds the seasonal periods in the series file.
+
+The script computes the generalized Lomb-Scargle periodogram of the residuals of the
+model (trend, offsets and the -periods already introduced) for the unevenly sampled
+epochs of the converted time series file, weighted by the standard deviations of the
+observations. The trigonometric sums of thousands of trial frequencies are computed
+at once by extirpolating the epochs onto a regular grid and one FFT (or directly by
+-method exact). The significant peaks are listed with their false alarm probability
+and as a -periods argument to be used in removeOutliers.py and evalCampaign.py.
+'''
+
+__epilog__ = '''
+*** EXAMPLES ***
+
+---------
+:: Ex1 ::
+    Let the time series file includes the up component of the TEST station. To find the
+    periods between 2 days and the time span of the series.
+
+
+    periodogram.py -fname TESTup.tse -comp up -minPeriod 2
+
+        ===================================================================
+        periodogram.py is running and using the parameters:
+        ===================================================================
+            filename : TESTup.tse
+           component : up
+           minPeriod : 2.0
+           maxPeriod : None
+          oversample : 5
+               alpha : 0.01
+              method : fast
+        ===================================================================
+
+
+                 ******* up *******
+         # 	 Period [days] 	 Power 		 FAP
+        ---	---------------	-------		---------
+         1	       365.4878	 0.7095		 0.00e+00
+         2	        14.2038	 0.1935		 0.00e+00
+
+          -periods 365.4878 14.2038
+
+
+---------
+:: Ex2 ::
+    The same with the annual period in the model, so that the weaker periods are not
+    hidden behind the annual one and its side lobes.
+
+
+    periodogram.py -fname TESTup.tse -comp up -minPeriod 2 -periods T1
+
+                 ******* up *******
+         # 	 Period [days] 	 Power 		 FAP
+        ---	---------------	-------		---------
+         1	        14.2038	 0.5123		 0.00e+00
+
+          -periods T1 14.2038
+
+
+    NOTE: The power is normalized between 0 and 1 (the reduction of the weighted sum
+          of squared residuals by the sinusoid at the period). Uneven sampling, e.g.
+          campaigns at the same time of the years, causes side lobes around the peaks,
+          which are better checked by introducing the strongest period via -periods.
+
+
+
+    This file is part of GCTS v1.0.
+
+    GCTS v1.0 is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    GCTS v1.0 is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with GCTS v1.0.  If not, see <https://www.gnu.org/licenses/>.
+'''
+
+__author__ = 'Huseyin Duman'
+
+
+def _getparser():
+    parser = argparse.ArgumentParser(description=__description__,
+                                     epilog=__epilog__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("-fname", type=argparse.FileType('r') , 
+                        required=True, nargs='?',
+                        help = """[?](comp).tse file name to be analyzed, which could
+                        contain either only one GPS component or all GPS component.
+                        """)
+
+    parser.add_argument("-comp", nargs="+", type=str, required=True,
+                        help="""Components whose periodograms are computed. The argument
+                        is required and suitable for multiple entries.""")
+
+    parser.add_argument("-periods", type=str, nargs='+',
+                        default=[],
+                        help="""Seasonal periodicities already in the model, as in
+                        removeOutliers.py (e.g. T2, C1 or 14.66 days).""")
+
+    parser.add_argument("-minPeriod", type=float, nargs='?', default=10,
+                        help="""Shortest trial period in days, which is set to 10 as
+                        default.""")
+
+    parser.add_argument("-maxPeriod", type=float, nargs='?',
+                        help="""Longest trial period in days, which is the time span of the
+                        series as default.""")
+
+    parser.add_argument("-oversample", type=float, nargs='?', default=5,
+                        help="""Number of trial frequencies per 1/(time span), which is set to
+                        5 as default.""")
+
+    parser.add_argument("-alpha", type=float, nargs='?', default=0.01,
+                        help="""False alarm probability below which a peak is significant,
+                        which is set to 0.01 as default.""")
+
+    parser.add_argument("-nPeaks", type=int, nargs='?', default=5,
+                        help="""Maximum number of the listed peaks.""")
+
+    parser.add_argument("-method", type=str, nargs='?',
+                        default='fast', choices=['fast','exact'],
+                        help="""The fast computes the trigonometric sums by extirpolation and
+                        FFT, the exact sums over the epochs for each trial frequency.""")
+
+    parser.add_argument("-write", action='store_true',
+                        help="""Writes the periodograms into [?](comp)_periodogram.txt
+                        files.""")
+
+    parser.add_argument("-profile", action='store_true',
+                        help="""Records wall time, call counts and peak memory of each named
+                        stage (e.g. designMat, fit, periodogram), and writes them into
+                        [?]_profile.json file next to the results.""")
+
+    return parser
+
+def _dispParser(args):
+    print(" ===================================================================\n",
+          os.path.basename(__file__) + " is running and using the parameters:\n",
+        "===================================================================")
+    print("    filename : " + args.fname.name)
+    for i in args.comp:
+        print("   component : " + i)
+    for j in args.periods:
+        print("     periods : " + j)
+    print("   minPeriod : " + str(args.minPeriod) + "\n",
+          "  maxPeriod : " + str(args.maxPeriod) + "\n",
+          " oversample : " + str(args.oversample) + "\n",
+          "      alpha : " + str(args.alpha) + "\n",
+          "     method : " + args.method)
+    if args.profile:
+        print("     profile : on")
+    print(" ===================================================================\n")
+
+
+
+def main():
+    args = _getparser().parse_args()
+    import gcts
+    _dispParser(args)
+
+    prof = profiler(args.profile)
+    try:
+        gcts.periodogram(args.fname.name, args.comp, args.periods, args.minPeriod, args.maxPeriod,
+                         args.oversample, args.alpha, args.nPeaks, args.method, write=args.write,
+                         prof=prof, verbose=True)
+    except ValueError as err:
+        print(err)
+        sys.exit()
+
+    prof._write(args.fname.name.split(".")[0] + "_profile.json", vars(args))
+
+
+if __name__ == "__main__":
+    main()
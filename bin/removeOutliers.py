@@ -1,15 +1,13 @@
 #!/usr/bin/env python3
 
-import argparse, os, sys, statistics
-pyGCTSpath="{}/lib".format(os.environ['pyGCTS'])
-if pyGCTSpath not in sys.path:
+import argparse, os, sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
     sys.path.append(pyGCTSpath)
 
-import numpy as np
-import tseFile as tf
-import scipy.linalg as la
-import leastSquares as ls
-from designMat import designMat as dm
+from gcts.profiler import profiler
 
 __prog__ = 'removeOutliers.py'
 
@@ -17,10 +15,11 @@ __description__ = '''
 removeOutliers -> Removes outliers in the series file.
 
 The scripts removes the outliers in the converted time series file using one of the
-Interquartile range, median and Nsigma methods. If one or more outliers are detected
-by the outlier detection method, they are removed from the series file, and outliers
-are written into a seperate time series file named [?]_outliers.tse by specifiying
--writeOutliers argument.
+Interquartile range, median and Nsigma methods, the robust huber and tukey methods, or the
+sliding-window hampel filter. If one or more outliers are detected by the outlier
+detection method, they are removed from the series file, and outliers are written
+into a seperate time series file named [?]_outliers.tse by specifiying -writeOutliers
+argument.
 '''
 
 __epilog__ = '''
@@ -139,6 +138,32 @@ __epilog__ = '''
         TESTup.tse file has been created...
 
 
+---------
+:: Ex4 ::
+    Screening only the epochs appended to TEST.tse since the last run, e.g. in a daily
+    processing.
+
+
+    removeOutliers.py -fname TEST.tse -comp up -append
+
+        ...
+                ******* up *******
+        # 	 Method 	 Scale 		 nOutliers
+        ---	--------	-------		-----------
+         1	IQrange	           3		     0
+
+
+         Screened 1 new epochs against the state of 1826 epochs
+
+
+         TESTup.tse file has been created...
+         TESTup_screen.npz file has been created...
+
+
+    NOTE: The first run with -append cleans the whole series and creates the
+          TESTup_screen.npz file.
+
+
 
 
     This file is part of GCTS v1.0.
@@ -173,10 +198,22 @@ def _getparser():
 
     parser.add_argument("-method", type=str, 
                         default='IQrange', nargs='?',
-                        choices=['IQrange','median','Nsigma'],
+                        choices=['IQrange','median','Nsigma','huber','tukey','hampel'],
                         help="""To choose which method will be used to detect and remove
                         outliers from the time series. The methods are IQrange, median, and
-                        Nsigma.""")
+                        Nsigma, which refit and remove the outliers until none is left, or
+                        huber and tukey (biweight), which solve an iteratively reweighted
+                        least-squares (IRLS) estimation down-weighting the outliers and flag
+                        the residuals beyond -scale times the robust scale (normalized median
+                        absolute deviation) at once, or hampel, which flags the residuals
+                        beyond -scale times the normalized median absolute deviation around
+                        their rolling median over -window epochs at once, so that local bursts
+                        are caught without a complete -periods model.""")
+
+    parser.add_argument("-window", nargs="?", default=31, type=int,
+                        help="""Number of epochs of the sliding window of the hampel method
+                        (e.g. 31 epochs of a daily series), which is cut at the ends of the
+                        series. It is set to 31 as default.""")
 
     parser.add_argument("-scale", nargs="?", default=3, type=float,
                         help="""Scale factor used to determine the upper and lower limits 
@@ -204,6 +241,33 @@ def _getparser():
     parser.add_argument("-writeOutliers", action='store_true',
                         help="A choice to be write down the outliers or not")
 
+    parser.add_argument("-append", action='store_true',
+                        help="""Screens only the epochs appended to the series since the last run.
+                        The accepted epochs, their normal equations and the bounds of the
+                        residuals are saved into [?](comp)_screen.npz file, and the new epochs
+                        are judged against them without refitting the series. The series is
+                        cleaned again if the file does not match it, or if the robust scale of
+                        the accepted residuals (the IQ range, MAD or WRMS of the method) drifts
+                        by more than -drift.""")
+
+    parser.add_argument("-drift", nargs="?", default=0.25, type=float,
+                        help="""Relative change of the robust scale of the accepted residuals
+                        since the last full cleaning which triggers a new cleaning in -append
+                        mode. It is set to 0.25 as default.""")
+
+    parser.add_argument("-profile", action='store_true',
+                        help="""Records wall time, call counts and peak memory of each named
+                        stage (e.g. designMat, fit, write) and of each component, and writes
+                        them into [?]_profile.json file next to the results.""")
+
+    parser.add_argument("-profileHook", type=str, nargs='?',
+                        choices=['cProfile','tracemalloc'],
+                        help="""Runs the outlier removal loop under cProfile or tracemalloc.
+                        The statistics are written into [?]_profile.prof and [?]_profile.txt,
+                        or [?]_tracemalloc.txt files, respectively. With tracemalloc the peak
+                        memory of the stages of -profile is traced too (which slows the run
+                        down), otherwise it is the peak resident set size.""")
+
     return parser
 
 def _dispParser(args):
@@ -213,158 +277,39 @@ def _dispParser(args):
     print("    filename : " + args.fname.name + "\n",
           "     method : " + args.method + "\n",
           "      scale : " + str(args.scale))
+    if args.method == 'hampel':
+        print("      window : " + str(args.window))
     for i in args.comp:
         print("   component : " + i)
     if args.periods is not None:
         for j in args.periods:
             print("     periods : " + j)
+    if args.append:
+        print("      append : on (drift " + str(args.drift) + ")")
+    if args.profile:
+        print("     profile : on")
+    if args.profileHook is not None:
+        print(" profileHook : " + args.profileHook)
     print(" ===================================================================\n")
     
 
 
 def main():
     args = _getparser().parse_args()
+    import gcts
     _dispParser(args)    
     
-    for i in args.comp:
-        A,_ = dm(args.fname.name, args.periods, 365.25)._coefficients()
-        header, _, _, obs, dates = tf._read(args.fname.name)
-        for line in header:
-            if 'COMPONENT' in line:
-                component = line.split(": ")[1].split("\n")[0]
-                break
-        if component == 'all':
-            if i == 'east':
-                col = [0,3]
-            elif i == 'north':
-                col = [1,4]
-            elif i == 'up':
-                col = [2,5]
-        elif component == 'east' or component == 'north' or component == 'up':
-            col = [0,1]
-        else:
-            print("Please check your component flag!")
-            sys.exit()
-
-
-
-        print("\n         ******* %s *******" % i)
-        print(" # \t Method \t Scale \t\t nOutliers")
-        print("---\t--------\t-------\t\t-----------")
-        iteration   = 0
-        outlierOBS  = np.empty([0,2])
-        outlierDATE = np.empty([0,len(dates[0,:])])
-        cond = True
-        L = obs[:,col]
-        if args.method == 'IQrange':            
-            while cond:
-                iteration += 1
-                _, _, _, resid = ls._lse(A, L[:,0])
-                sorted_resid = np.sort(resid, axis=0, kind='quicksort', order=None)
-
-                IQ = (sorted_resid[int(np.floor(0.75 * len(resid)))] - 
-                      sorted_resid[int(np.floor(0.25 * len(resid)))])
-                MED = sorted_resid[int(np.floor(0.50 * len(resid)))]
-                del sorted_resid
-
-                lowerBoundary = MED - (args.scale * IQ)
-                upperBoundary = MED + (args.scale * IQ)
-
-                lowerBool     = lowerBoundary < resid
-                upperBool     = upperBoundary > resid
-                nonOutlBool   = lowerBool * upperBool
-                nOutlires     = len(resid) - sum(nonOutlBool)
-                nonOutlBool_idx = [i for i, val in enumerate(nonOutlBool == False) if val]
-                del resid, lowerBoundary, upperBoundary, lowerBool, upperBool, MED, IQ
-
-                if nOutlires == 0:
-                    cond = False
-                else:
-                    outlierOBS  = np.append(outlierOBS, L[nonOutlBool_idx,:], axis=0)
-                    outlierDATE = np.append(outlierDATE, dates[nonOutlBool_idx,:], axis=0)
-                    A     = np.delete(A, nonOutlBool_idx, axis=0)
-                    L     = np.delete(L, nonOutlBool_idx, axis=0)
-                    dates = np.delete(dates, nonOutlBool_idx, axis=0)
-                    
-
-                print("%2d\t%7s\t%12d\t\t%6d" % (iteration, args.method,args.scale,nOutlires))
-                del nOutlires, nonOutlBool_idx, nonOutlBool     
-
-        elif args.method == 'median':
-            while cond:
-                iteration += 1
-                _, _, _, resid = ls._lse(A, L[:,0])
-                median_ith = np.abs(resid - statistics.median(resid))
-                if statistics.median(median_ith) == 0:
-                    MAD = (1.2533 / len(resid)) * sum(median_ith)
-                else:
-                    MAD = 1.4826 * statistics.median(median_ith)
-
-                nonOutlBool   = (median_ith < args.scale*MAD)
-                nOutlires     = len(resid) - sum(nonOutlBool)
-                nonOutlBool_idx = [i for i, val in enumerate(nonOutlBool == False) if val]
-                del resid, MAD
-
-                if nOutlires == 0:
-                    cond = False
-                else:
-                    outlierOBS  = np.append(outlierOBS, L[nonOutlBool_idx,:], axis=0)
-                    outlierDATE = np.append(outlierDATE, dates[nonOutlBool_idx,:], axis=0)
-                    A     = np.delete(A, nonOutlBool_idx, axis=0)
-                    L     = np.delete(L, nonOutlBool_idx, axis=0)
-                    dates = np.delete(dates, nonOutlBool_idx, axis=0)
-
-                print("%2d\t%7s\t%12d\t\t%6d" % (iteration, args.method,args.scale,nOutlires))
-                del nOutlires, nonOutlBool_idx, nonOutlBool
-
-        elif args.method == 'Nsigma':
-            while cond:
-                iteration += 1
-                _, _, _, resid = ls._lse(A, L[:,0])
-                WRMS = np.sqrt((resid.T @ resid) / len(A[:,0]))[0][0]
-                nonOutlBool = (np.abs(resid) < args.scale*WRMS)
-                nOutlires = len(resid) - sum(nonOutlBool)
-                nonOutlBool_idx = [i for i, val in enumerate(nonOutlBool == False) if val]
-                del resid, WRMS
-
-                if nOutlires == 0:
-                    cond = False
-                else:
-                    outlierOBS  = np.append(outlierOBS, L[nonOutlBool_idx,:], axis=0)
-                    outlierDATE = np.append(outlierDATE, dates[nonOutlBool_idx,:], axis=0)
-                    A     = np.delete(A, nonOutlBool_idx, axis=0)
-                    L     = np.delete(L, nonOutlBool_idx, axis=0)
-                    dates = np.delete(dates, nonOutlBool_idx, axis=0)
-
-                print("%2d\t%7s\t%12d\t\t%6d" % (iteration, args.method,args.scale,nOutlires))
-                del nOutlires, nonOutlBool_idx, nonOutlBool
-
-
-        print("\n")
-
-
-        for k in range(len(header)):
-            if 'COMPONENT' in header[k]:
-                header[k] = "* COMPONENT    : " + i + "\n"
-            if 'DATA ORDER' in header[k]:
-                header[k] = "* DATA ORDER   : " + i + " s_" + i + " dates" + "\n"
-            if 'ENDOFHEADER' in header[k]:
-                header.insert(k, "* COMMENT      : All outliers have been removed wrt. " + args.method + "\n")
-        
-
-        newFilename = (args.fname.name[0:4] + i + ".tse")
-        tf._write(newFilename, header, L, dates)
-        del k
-
-        if args.writeOutliers and (len(outlierOBS) != 0):
-            for k in range(len(header)):
-                if 'COMMENT' and 'outliers' in header[k]:
-                    header[k] = "* COMMENT      : All outliers have been detected wrt. " + args.method + "\n"
-                    break
-
-            outliersFilename = (args.fname.name[0:4] + i + "_outliers.tse")
-            tf._write(outliersFilename, header, outlierOBS, outlierDATE)
-            del k 
+    prof = profiler(args.profile, args.profileHook)
+    try:
+        with prof.hot(args.fname.name.split(".")[0]):
+            gcts.clean(args.fname.name, args.comp, args.method, args.scale, args.periods,
+                       write=True, writeOutliers=args.writeOutliers, append=args.append,
+                       drift=args.drift, window=args.window, prof=prof, verbose=True)
+    except ValueError as err:
+        print(err)
+        sys.exit()
+
+    prof._write(args.fname.name.split(".")[0] + "_profile.json", vars(args))
 
 
 if __name__ == "__main__":
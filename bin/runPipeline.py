@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+
+import argparse, time, os, sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
+    sys.path.append(pyGCTSpath)
+
+import gcts
+from gcts.profiler import profiler
+
+__prog__ = 'runPipeline.py'
+
+__description__ = '''
+runPipeline -> Converts, cleans and evaluates the series in one run.
+
+The script does what conv2tse.py, removeOutliers.py and evalCampaign.py do one after
+the other, but in one process: the series converted from the source files are passed
+in memory to the outlier detection, and the outlier free components to the noise
+estimation, instead of writing and reading the [?].tse, [?](comp).tse and
+[?](comp)_outliers.tse files in between. The intermediate files are only written
+when -writeTse, -writeClean or -writeOutliers is specified.
+'''
+
+__epilog__ = '''
+*** EXAMPLES ***
+
+---------
+:: Ex1 ::
+    The steps of Ex1 of conv2tse.py, removeOutliers.py and evalCampaign.py for the
+    station TEST in one run, writing only the outliers and the model values.
+
+
+    runPipeline.py -fname TEST.series -unit m mm -dateFormat mjd -nRND 30 -repeat 100 \\
+                   -periods T2 -writeOutliers -writeModel
+
+        ======================================================================================
+        runPipeline.py is running and using the parameters:
+        ======================================================================================
+            filename : TEST.series
+           fromWhich : gipsy
+                unit : m mm
+          dateFormat : mjd
+           component : east
+           component : north
+           component : up
+             outlier : IQrange
+               scale : 3
+             periods : T2
+               alpha : 0.05
+                nRND : 30
+                  Fs : 365.25
+               kappa : -1
+                incr : 0.025
+              repeat : 100
+               write : Outliers Model
+        ======================================================================================
+
+        ...
+
+                 ******* TESTup.tse *******
+        ...
+
+
+
+    This file is part of GCTS v1.0.
+
+    GCTS v1.0 is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    GCTS v1.0 is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with GCTS v1.0.  If not, see <https://www.gnu.org/licenses/>.
+'''
+
+__author__ = 'Huseyin Duman'
+
+
+def _getparser():
+    parser = argparse.ArgumentParser(description=__description__,
+                                     epilog=__epilog__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("-fname", type=argparse.FileType('r') , 
+                        required=True, nargs='+',
+                        help = """Original time series files supplied by a user, as in
+                        conv2tse.py.""")
+
+    parser.add_argument("-fromWhich", type=str, 
+                        default='gipsy', nargs='?',
+                        choices=['gipsy','gamit','bernese'],
+                        help="""From which source, a GPS/GNSS data processing software, an
+                        original time series has been created. For instance, Gipsy-Oasis, GipsyX,
+                        Bernese, Gamit/Globk etc.""")
+
+    parser.add_argument("-offset", nargs="+", type=str, action='append',
+                        help="""Offset(s) date. The date format has to be same with specified
+                        format by -dateFormat argument. For multiple offset entries, -offset
+                        argument has to be defined just before offset date.""")
+
+    parser.add_argument("-unit", type=str, nargs=2,
+                        help="""The argument has two variable. The first one is the unit of the
+                        original time series file, and the other is that of output file. The
+                        unit variables must be two of mm, cm, dm, m, km.""")
+
+    parser.add_argument("-dateFormat", type=str, nargs="?",
+                        help="""Date format is specified the time label in the output time series
+                        file. It could be any of the format listed in discription above.""")
+
+    parser.add_argument("-siteID", type=str, nargs='+', action='append',
+                        help=""" 4-digit site IDs to be extracted. If source file from gipsy, this
+                        argument could not be specified, that's why site ID is extracted from filename.
+                        """)
+
+    parser.add_argument("-index", type=str, nargs='?',
+                        help="""SQLite index of the gamit files (see indexOrg.py). The new and
+                        changed files are indexed first, then the records of the sites are read by
+                        seeking to them instead of reading all files.""")
+
+    parser.add_argument("-comp", nargs="+", type=str, default=['east','north','up'],
+                        choices=['east','north','up'],
+                        help="""GPS components to be cleaned and evaluated, which are all
+                        components as default.""")
+
+    parser.add_argument("-outlierMethod", type=str, 
+                        default='IQrange', nargs='?',
+                        choices=['IQrange','median','Nsigma','huber','tukey','hampel'],
+                        help="""Outlier detection method of removeOutliers.py (-method).""")
+
+    parser.add_argument("-scale", nargs="?", default=3, type=float,
+                        help="""Scale factor of the outlier detection, as in removeOutliers.py.""")
+
+    parser.add_argument("-hampelWindow", nargs="?", default=31, type=int,
+                        help="""Number of epochs of the sliding window of the hampel method
+                        (-window of removeOutliers.py).""")
+
+    parser.add_argument("-periods", type=str, nargs='+', default=[],
+                        help="""Seasonal periodicities to detrend the data. Frequently used
+                        cycles is tropical, chandler, draconitic years, and its/theirs
+                        harmonics. These have some label to make the usage easier. The label
+                        has two digit. The first digit is the first letter of corresponding
+                        cycle (i.e. one of T, C, and D), and the second digit is for the number
+                        of harmonics. For example, T2 stands for from a tropical year through
+                        its second harmonic (e.g. 365.2500 and 183.6250 days). Another example
+                        is C1 which is for a chandler year (e.g. 433 days). Beyond these label
+                        one may introduce one or more cycle as float number in days
+                        (e.g. 14.66 days). The same model is used in the outlier detection and
+                        in the evaluation.""")
+
+    parser.add_argument("-alpha", type=float, nargs='?',
+                        default = 0.05, 
+                        help="""Significance level to determine the search space limits. Search
+                        space is a set containing a noise amplitude with 1 - alpha confidence
+                        level.""")
+
+    parser.add_argument("-nRND", type=int, nargs='?',
+                        help="""number of randomly generated values for noise amplitude within 
+                        the search area.""")
+
+    parser.add_argument("-fs", type=float, nargs='?',
+                        default=365.25,
+                        help="""Observation frequency, which is set to 365.25 as default.""")
+
+    parser.add_argument("-kappa", type=float, nargs='?',
+                        default=-1,
+                        help="""Spectral index for colored noise. Kappa is set to -1 which is
+                        for flicker noise.""")
+
+    parser.add_argument("-incr",type=float, nargs='?',
+                        default = 0.025,
+                        help="""Weighted least-squares solution is made from all mutual
+                        combinations of random points produced in the search area for both
+                        white and flicker noise. The posterior variances calculated from all
+                        solutions create a smooth and clear surface with their corresponding
+                        noise amplitudes. The -incr argument is the amount of INCREMENT used
+                        in order to create mesh surface.""")
+
+    parser.add_argument("-repeat", type=int, nargs='?',
+                        help = """Theoretically, the most appropriate solution is the solution
+                        where the posterior variance is equal to 1. On the created posterior
+                        variance surface, the noise amplitudes corresponding to a value of 1 are
+                        estimated, then the weighted least-squares estimation are made again and
+                        the solution closest to 1 is selected. For a robust analysis, this process
+                        is repeated N times which is specified under -repeat argument.""")
+
+    parser.add_argument("-sampler", type=str, nargs='?',
+                        default='grid', choices=['grid','adaptive'],
+                        help="""How the s0 = 1 curve is located in each repeat. The grid solves
+                        all nRND x nRND combinations of the random points and contours the
+                        interpolated surface. The adaptive takes the random points as a coarse
+                        seed grid (e.g. -nRND 6) and only refines the cells whose corners
+                        straddle s0 = 1, until the bilinear interpolation of s0 in the cells is
+                        within -tol, which needs far fewer weighted solutions.""")
+
+    parser.add_argument("-tol", type=float, nargs='?',
+                        default=1e-3,
+                        help="""Tolerance on s0 for the adaptive sampler, which is set to 0.001
+                        as default.""")
+
+    parser.add_argument("-method", type=str, nargs='?',
+                        default='search', choices=['search','mle'],
+                        help="""Estimation method of the noise amplitudes. The search is the
+                        approach of Duman and Sanli (2020) explained under -nRND, -incr and
+                        -repeat. The mle maximizes the Gaussian log-likelihood of the series
+                        over the white and flicker noise amplitudes with a gradient-based
+                        optimizer (L-BFGS-B), using one eigendecomposition of the flicker noise
+                        covariance, so that -nRND, -incr and -repeat are not needed.""")
+
+    parser.add_argument("-converge", type=float, nargs='?',
+                        help="""Stops the repeats before -repeat when the running medians of the
+                        noise amplitudes and their bootstrap spreads have all changed by less than
+                        this tolerance (relative to the medians, e.g. 0.01) over the last -window
+                        repeats. -repeat is then the maximum number of repeats, and the number
+                        used is reported.""")
+
+    parser.add_argument("-window", type=int, nargs='?',
+                        default=5,
+                        help="""Number of repeats over which the convergence is checked, which is
+                        set to 5 as default. At least twice as many repeats are made.""")
+
+    parser.add_argument("-seed", type=int, nargs='?',
+                        help="""Seed of the random points in the search space, so that the
+                        results can be reproduced.""")
+
+    parser.add_argument("-workers", type=_workers, nargs='?',
+                        default=1,
+                        help="""Number of processes for the joint evaluation of the cleaned
+                        components of all sites, as in evalCampaign.py. The series are grouped by their epochs (e.g. the sites of a
+                        campaign occupied on the same days), the flicker noise covariance and its
+                        eigendecomposition are built once per group, and the weighted solutions
+                        are made in its eigenbasis. With -seed the i-th series is
+                        seeded by seed + i. It is set to 1 as default. With auto, the number
+                        of processes and of their BLAS threads are chosen from the length of
+                        the series and the cores and memory available, i.e. many single
+                        threaded processes for short campaign series and a few processes with
+                        many threads for long series.""")
+
+    parser.add_argument("-blasThreads", type=int, nargs='?',
+                        help="""Number of BLAS threads of each process of -workers. The cores are
+                        shared by the processes as default. It needs the threadpoolctl package,
+                        without it the BLAS library keeps its own setting.""")
+
+    parser.add_argument("-ols", action='store_true',
+                        help = """Ordinary least-squares estimation. If this argument is specified,
+                        time series data are analyzed without any weight matrix.""")
+
+    parser.add_argument("-writeTse", action='store_true',
+                        help="""Writes the converted [?].tse files.""")
+
+    parser.add_argument("-writeClean", action='store_true',
+                        help="""Writes the outlier free [?](comp).tse files.""")
+
+    parser.add_argument("-writeOutliers", action='store_true',
+                        help="""Writes the outliers into [?](comp)_outliers.tse files.""")
+
+    parser.add_argument("-writeModel", action='store_true',
+                        help="A choice to be write down the model values or not")
+
+    parser.add_argument("-profile", action='store_true',
+                        help="""Records wall time, call counts and peak memory of each named
+                        stage (e.g. convert, clean, noise.mat, gridSolves) and writes them into
+                        [?]_profile.json file of the first source file.""")
+
+    return parser
+
+def _workers(value):
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid number of workers: " + value)
+
+def _dispParser(args):
+    print(" ======================================================================================\n",
+          os.path.basename(__file__) + " is running and using the parameters:\n",
+        "======================================================================================")
+    for f in args.fname: print("    filename : " + f.name)
+    print("   fromWhich : " + args.fromWhich)
+    if args.offset is not None:
+        for i in range(len(args.offset)):
+           print("      offset : " + (" ".join(args.offset[i])))
+    print("        unit : " + (" ".join(args.unit)) + "\n",
+          " dateFormat : " + args.dateFormat)
+    for i in args.comp: print("   component : " + i)
+    print("     outlier : " + args.outlierMethod + "\n",
+          "      scale : " + str(args.scale))
+    if args.outlierMethod == 'hampel':
+        print("      window : " + str(args.hampelWindow) + " (hampel)")
+    for i in args.periods: print("     periods : " + i)
+    print("       alpha : " + str(args.alpha) + "\n",
+          "       nRND : " + str(args.nRND) + "\n",
+          "         Fs : " + str(args.fs) + "\n",
+          "      kappa : " + str(args.kappa) + "\n",
+          "       incr : " + str(args.incr) + "\n",
+          "     repeat : " + str(args.repeat))
+    if args.seed is not None:
+        print("        seed : " + str(args.seed))
+    if args.workers != 1:
+        print("     workers : " + str(args.workers))
+    if args.converge is not None:
+        print("    converge : " + str(args.converge) + " (window " + str(args.window) + ")")
+    if args.sampler != 'grid':
+        print("     sampler : " + args.sampler + " (tol " + str(args.tol) + ")")
+    if args.method != 'search':
+        print("      method : " + args.method)
+    written = [f for f in ['Tse', 'Clean', 'Outliers', 'Model'] if getattr(args, 'write' + f)]
+    print("       write : " + (" ".join(written) if written else "none"))
+    print(" ======================================================================================\n")
+
+
+def _printResult(res, args):
+    if args.ols:
+        print("\n Ordinary Least-squares estimation\n")
+        for o in range(len(res.unkOLS)):
+            print("%20s: %10.4f  +- %9.4f %s" % \
+                (res.labels[o], res.unkOLS[o], res.sUnkOLS[o], res.units[o]))
+        print("\n")
+        print("%20s: %14.8f %8s\n" % ('s0', res.s0OLS, res.unit))
+        return
+
+    print("\n")
+    for o in range(len(res.unk)):
+        print("%20s: %10.4f +- %9.4f %s" % \
+            (res.labels[o], res.unk[o], res.sUnk[o], res.units[o]))
+    print("\n")
+    print("%20s: %10.4f %s" % ('wna', res.wna, res.unit))
+    print("%20s: %10.4f %s" % ('fna', res.fna, res.unit+"/year^0.25"))
+    print("%20s: %14.8f %s\n" % ('s0', res.s0, res.unit))
+
+
+def main():
+    startTime = time.time()
+    args = _getparser().parse_args()
+    _dispParser(args)
+    fnames = [f.name for f in args.fname]
+    offsets = None
+    if args.offset is not None:
+        offsets = [" ".join(off) for off in args.offset]
+    siteIDs = args.siteID[0] if args.siteID is not None else None
+    prof = profiler(args.profile)
+    try:
+        sites = gcts.pipeline(fnames, args.fromWhich, args.comp, offsets, args.unit, args.dateFormat,
+                              siteIDs, args.index, args.outlierMethod, args.scale,
+                              args.hampelWindow, args.periods, writeTse=args.writeTse,
+                              writeClean=args.writeClean, writeOutliers=args.writeOutliers,
+                              writeModel=args.writeModel, workers=args.workers, seed=args.seed,
+                              threads=args.blasThreads, prof=prof, verbose=True, alpha=args.alpha,
+                              nRND=args.nRND, fs=args.fs, kappa=args.kappa, incr=args.incr,
+                              repeat=args.repeat, ols=args.ols, method=args.method,
+                              sampler=args.sampler, tol=args.tol, converge=args.converge,
+                              window=args.window)
+    except ValueError as err:
+        print(err)
+        sys.exit()
+
+    for site in sites:
+        for comp in args.comp:
+            print("\n         ******* %s *******" % site.cleaned[comp].series.filename)
+            print(" outliers : %d" % sum(n for _, n in site.cleaned[comp].table))
+            _printResult(site.evaluated[comp], args)
+
+    prof._write(fnames[0].split(".")[0] + "_profile.json", vars(args))
+    print("\nElapsed time : %.1f sec\n" % (time.time() - startTime))
+
+
+if __name__ == "__main__":
+    main()
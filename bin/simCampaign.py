@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+import argparse, time, os, sys
+# $pyGCTS/lib (see GCTS_1.0.sh), or the lib next to bin when it is not exported.
+# In an installed GCTS the modules are importable without it.
+pyGCTSpath=os.path.join(os.environ.get('pyGCTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')), 'lib')
+if os.path.isdir(pyGCTSpath) and pyGCTSpath not in sys.path:
+    sys.path.append(pyGCTSpath)
+
+import gcts
+from gcts.profiler import profiler
+
+__prog__ = 'simCampaign.py'
+
+__description__ = '''
+simCampaign -> Simulates series with known noise and evaluates them (Monte Carlo).
+
+The script simulates series on the epochs (and offsets) of a [?].tse file with white
+noise of -wna and power-law noise of -fna and -kappa added to the model of the design
+matrix (intercept, trend, offsets and the -periods) with the true values of -unk. The
+power-law noise is the fractional differencing filter of the estimation model applied
+to white noise by FFT, so that thousands of realizations of long series are generated
+without the dense covariance. The realizations are evaluated as in evalCampaign.py
+over -workers processes, and the mean, bias, standard deviation and RMSE of the
+estimates, and the mean of their estimated sigmas, are reported against the true values.
+'''
+
+__epilog__ = '''
+*** EXAMPLES ***
+
+---------
+:: Ex1 ::
+    20 realizations on the epochs of TESTeast.tse with wna = 1 mm and fna = 3 mm/year^0.25,
+    an intercept of 5 mm and a trend of 2 mm/year, evaluated by the maximum likelihood.
+
+
+    simCampaign.py -fname TESTeast.tse -wna 1 -fna 3 -unk 5 2 -nReal 20 -method mle -seed 1
+
+        ...
+
+         Monte Carlo summary of 20 realizations
+         ------------------------------------------------------------------------------------------
+                   parameter       true       mean       bias        std       RMSE  mean sigma
+         ------------------------------------------------------------------------------------------
+                   intercept     5.0000     4.9883    -0.0117     0.5426     0.5290      0.5898
+                       trend     2.0000     2.1056     0.1056     0.6107     0.6045      0.5003
+                         wna     1.0000     1.0191     0.0191     0.1132     0.1120
+                         fna     3.0000     2.8012    -0.1988     0.4738     0.5028
+         ------------------------------------------------------------------------------------------
+
+
+    NOTE: -simulateOnly writes the realizations into TESTeast_0001.tse etc. without
+          evaluating them.
+
+
+
+    This file is part of GCTS v1.0.
+
+    GCTS v1.0 is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    GCTS v1.0 is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with GCTS v1.0.  If not, see <https://www.gnu.org/licenses/>.
+'''
+
+__author__ = 'Huseyin Duman'
+
+
+def _getparser():
+    parser = argparse.ArgumentParser(description=__description__,
+                                     epilog=__epilog__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("-fname", type=argparse.FileType('r') , 
+                        required=True, nargs='?',
+                        help = """[?](comp).tse file whose epochs, offsets, date format and unit
+                        are used for the realizations.""")
+
+    parser.add_argument("-wna", type=float, required=True, nargs='?',
+                        help="""True white noise amplitude.""")
+
+    parser.add_argument("-fna", type=float, required=True, nargs='?',
+                        help="""True power-law (e.g. flicker) noise amplitude.""")
+
+    parser.add_argument("-unk", type=float, nargs='+',
+                        help="""True values of the unknowns in the order of the results of
+                        evalCampaign.py (intercept, trend, offsets, sin and cos of each period),
+                        which are zero as default.""")
+
+    parser.add_argument("-periods", type=str, nargs='+', default=[],
+                        help="""Seasonal periodicities of the simulation and of the evaluation
+                        (e.g. T2, C1 or 14.66 days), as in evalCampaign.py.""")
+
+    parser.add_argument("-kappa", type=float, nargs='?', default=-1,
+                        help="""Spectral index of the power-law noise of the simulation and of
+                        the evaluation, which is set to -1 (flicker noise) as default.""")
+
+    parser.add_argument("-fs", type=float, nargs='?', default=365.25,
+                        help="""Observation frequency, which is set to 365.25 as default.""")
+
+    parser.add_argument("-nReal", type=int, nargs='?', default=100,
+                        help="""Number of realizations, which is set to 100 as default.""")
+
+    parser.add_argument("-seed", type=int, nargs='?',
+                        help="""Seed of the realizations and of the random points of the
+                        search space, so that the study can be reproduced.""")
+
+    parser.add_argument("-simulateOnly", action='store_true',
+                        help="""Writes the realizations into [?](comp)_[k].tse files without
+                        evaluating them.""")
+
+    parser.add_argument("-write", action='store_true',
+                        help="""Writes the realizations into [?](comp)_[k].tse files.""")
+
+    parser.add_argument("-alpha", type=float, nargs='?',
+                        default = 0.05, 
+                        help="""Significance level to determine the search space limits. Search
+                        space is a set containing a noise amplitude with 1 - alpha confidence
+                        level.""")
+
+    parser.add_argument("-nRND", type=int, nargs='?',
+                        help="""number of randomly generated values for noise amplitude within 
+                        the search area.""")
+
+    parser.add_argument("-incr",type=float, nargs='?',
+                        default = 0.025,
+                        help="""Weighted least-squares solution is made from all mutual
+                        combinations of random points produced in the search area for both
+                        white and flicker noise. The posterior variances calculated from all
+                        solutions create a smooth and clear surface with their corresponding
+                        noise amplitudes. The -incr argument is the amount of INCREMENT used
+                        in order to create mesh surface.""")
+
+    parser.add_argument("-repeat", type=int, nargs='?',
+                        help = """Theoretically, the most appropriate solution is the solution
+                        where the posterior variance is equal to 1. On the created posterior
+                        variance surface, the noise amplitudes corresponding to a value of 1 are
+                        estimated, then the weighted least-squares estimation are made again and
+                        the solution closest to 1 is selected. For a robust analysis, this process
+                        is repeated N times which is specified under -repeat argument.""")
+
+    parser.add_argument("-sampler", type=str, nargs='?',
+                        default='grid', choices=['grid','adaptive'],
+                        help="""How the s0 = 1 curve is located in each repeat. The grid solves
+                        all nRND x nRND combinations of the random points and contours the
+                        interpolated surface. The adaptive takes the random points as a coarse
+                        seed grid (e.g. -nRND 6) and only refines the cells whose corners
+                        straddle s0 = 1, until the bilinear interpolation of s0 in the cells is
+                        within -tol, which needs far fewer weighted solutions.""")
+
+    parser.add_argument("-tol", type=float, nargs='?',
+                        default=1e-3,
+                        help="""Tolerance on s0 for the adaptive sampler, which is set to 0.001
+                        as default.""")
+
+    parser.add_argument("-method", type=str, nargs='?',
+                        default='search', choices=['search','mle'],
+                        help="""Estimation method of the noise amplitudes. The search is the
+                        approach of Duman and Sanli (2020) explained under -nRND, -incr and
+                        -repeat. The mle maximizes the Gaussian log-likelihood of the series
+                        over the white and flicker noise amplitudes with a gradient-based
+                        optimizer (L-BFGS-B), using one eigendecomposition of the flicker noise
+                        covariance, so that -nRND, -incr and -repeat are not needed.""")
+
+    parser.add_argument("-blasThreads", type=int, nargs='?',
+                        help="""Number of BLAS threads of each process of -workers. The cores are
+                        shared by the processes as default. It needs the threadpoolctl package,
+                        without it the BLAS library keeps its own setting.""")
+
+    parser.add_argument("-ols", action='store_true',
+                        help = """Ordinary least-squares estimation. If this argument is specified,
+                        time series data are analyzed without any weight matrix.""")
+
+    parser.add_argument("-workers", type=_workers, nargs='?',
+                        default=1,
+                        help="""Number of processes evaluating the realizations, as in
+                        evalCampaign.py. The realizations share their epochs, so the flicker noise covariance and its
+                        eigendecomposition are built once per group, and the weighted solutions
+                        are made in its eigenbasis. With -seed the i-th series is
+                        seeded by seed + i. It is set to 1 as default. With auto, the number
+                        of processes and of their BLAS threads are chosen from the length of
+                        the series and the cores and memory available, i.e. many single
+                        threaded processes for short campaign series and a few processes with
+                        many threads for long series.""")
+
+    return parser
+
+def _workers(value):
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid number of workers: " + value)
+
+def _dispParser(args):
+    print(" ======================================================================================\n",
+          os.path.basename(__file__) + " is running and using the parameters:\n",
+        "======================================================================================")
+    print("    filename : " + args.fname.name + "\n",
+          "        wna : " + str(args.wna) + "\n",
+          "        fna : " + str(args.fna) + "\n",
+          "      kappa : " + str(args.kappa) + "\n",
+          "         Fs : " + str(args.fs))
+    if args.unk is not None:
+        print("         unk : " + " ".join(str(u) for u in args.unk))
+    for i in args.periods: print("     periods : " + i)
+    print("       nReal : " + str(args.nReal))
+    if args.seed is not None:
+        print("        seed : " + str(args.seed))
+    if not args.simulateOnly:
+        if args.ols:
+            print("         ols : on")
+        elif args.method == 'mle':
+            print("      method : mle")
+        else:
+            print("        nRND : " + str(args.nRND) + "\n",
+                  "    repeat : " + str(args.repeat))
+        if args.workers != 1:
+            print("     workers : " + str(args.workers))
+    print(" ======================================================================================\n")
+
+
+def _printSummary(mc, nReal):
+    line = " " + "-" * 90
+    print("\n Monte Carlo summary of %d realizations" % nReal)
+    print(line)
+    print("%20s %10s %10s %10s %10s %10s %11s" % ('parameter', 'true', 'mean', 'bias', 'std', 'RMSE',
+                                                'mean sigma'))
+    print(line)
+    for label, truth, mean, bias, std, rmse, sigma in mc.table:
+        row = "%20s %10.4f %10.4f %10.4f %10.4f %10.4f" % (label, truth, mean, bias, std, rmse)
+        print(row + (" %11.4f" % sigma if sigma == sigma else ""))
+    print(line + "\n")
+
+
+def main():
+    startTime = time.time()
+    args = _getparser().parse_args()
+    _dispParser(args)
+    try:
+        if args.simulateOnly:
+            gcts.simulate(args.fname.name, args.wna, args.fna, args.unk, args.periods, args.kappa,
+                          args.fs, args.nReal, seed=args.seed, write=True, verbose=True)
+        else:
+            mc = gcts.monteCarlo(args.fname.name, args.wna, args.fna, args.nReal, args.unk,
+                                 args.periods, args.kappa, args.fs, args.seed, args.workers,
+                                 args.blasThreads, write=args.write, verbose=True, alpha=args.alpha,
+                                 nRND=args.nRND, incr=args.incr, repeat=args.repeat, ols=args.ols,
+                                 method=args.method, sampler=args.sampler, tol=args.tol)
+            _printSummary(mc, args.nReal)
+    except ValueError as err:
+        print(err)
+        sys.exit()
+    print("\nElapsed time : %.1f sec\n" % (time.time() - startTime))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from . import tseFile as tf
+from . import designMat as dm
+from .profiler import profiler
+from .common import units, transScale, dateFormats, compColumns, result, matCache, _series
+from .conversion import convert
+from .outliers import clean
+from .analysis import detectOffsets, periodogram
+from .evaluation import evaluate, evaluateAll, kappaSweep, _writeModel
+from .campaign import pipeline, simulate, monteCarlo, buildPriors
+from .jobs import _runJob
+
+# The programmatic interface of GCTS. convert, clean and evaluate do what the
+# conv2tse.py, removeOutliers.py and evalCampaign.py scripts do, but they return
+# their results and raise ValueError on bad input instead of printing and
+# exiting. Nothing is printed unless verbose is set, and the [?].tse files are
+# only written when asked for. scipy and matplotlib are imported by the jobs
+# needing them. The jobs are kept in
+#
+#   conversion.py  - convert
+#   outliers.py    - clean and the screening of the appended epochs
+#   analysis.py    - detectOffsets and periodogram
+#   evaluation.py  - evaluate, evaluateAll and kappaSweep
+#   checkpoint.py  - the checkpoint and the update state of evaluate
+#   campaign.py    - pipeline, simulate, monteCarlo and buildPriors
+#   jobs.py        - the jobs of gctsWorker.py
+#
+# and the helpers they share in common.py.
@@ -0,0 +1,124 @@
+import numpy as np
+from . import tseFile as tf
+from . import designMat as dm
+from .profiler import profiler
+from .common import compColumns, result, _series, _prefix, _writeTse
+
+# Offset detection (detectOffsets.py) and the periodogram of the residuals
+# (periodogram.py), which are looked at before the series are evaluated.
+
+
+def detectOffsets(tse, periods=[], criterion='BIC', maxOffsets=5, minGap=2, write=False,
+                  prof=None, verbose=False):
+    # tse        - [?].tse file name or tseFile.series, the components of a
+    #              series of all components share the offsets
+    # criterion  - 'BIC' or 'AIC' deciding whether a step is inserted
+    # maxOffsets - maximum number of the inserted steps
+    # minGap     - minimum number of epochs before and after a step
+    # returns the series with the detected offsets added to its header (and
+    # written into the same file if write is set) and the (offset, epoch index,
+    # change of the criterion) table in the order of insertion
+    from . import offsetDetection as od
+    prof = prof if prof is not None else profiler()
+    with prof.stage('read'):
+        ts = _series(tse)
+    with prof.stage('designMat'):
+        A, _ = dm._matrix(ts.header, ts.offset, ts.dates, periods, 365.25)
+    cols = [0,1,2] if ts._label('COMPONENT') == 'all' else [0]
+    with prof.stage('scan'):
+        found = od._greedy(A, ts.obs[:,cols], criterion, maxOffsets, minGap)
+
+    dateFormat = ts._label('DATE FORMAT')
+    header = list(ts.header)
+    offset = list(ts.offset)
+    table  = []
+    for k, change in found:
+        off = _dateString(ts.dates[k], dateFormat)
+        idx = [i for i, line in enumerate(header) if 'DATA ORDER' in line or 'ENDOFHEADER' in line][0]
+        header.insert(idx, "* OFFSET       : " + off + "\n")
+        offset.append(off)
+        table.append((off, k, change))
+    if verbose:
+        print(" # \t Offset \t\t Epoch \t d" + criterion)
+        print("---\t--------\t\t-------\t--------")
+        for i, (off, k, change) in enumerate(table):
+            print("%2d\t%14s\t%7d\t%10.2f" % (i+1, off, k+1, change))
+        print("\n")
+    out = tf.series(ts.filename, header, ts.component, offset, ts.obs, ts.dates)
+    if write and table:
+        with prof.stage('write'):
+            _writeTse(out, verbose)
+    return result(series=out, table=table)
+
+
+def _dateString(date, dateFormat):
+    # an epoch as it is given in the * OFFSET lines of the dateFormat
+    if dateFormat in ['mjd', 'decimalYear']:
+        return ("%.6f" % date[0]).rstrip('0').rstrip('.')
+    return " ".join("%d" % d for d in date)
+
+
+def periodogram(tse, comps, periods=[], minPeriod=10, maxPeriod=None, oversample=5, alpha=0.01,
+                nPeaks=5, method='fast', write=False, prof=None, verbose=False):
+    # tse        - [?].tse file name or tseFile.series
+    # comps      - components whose periodograms are computed
+    # periods    - periods already in the model, the periodogram is computed
+    #              from the residuals of the model
+    # minPeriod  - shortest trial period in days
+    # maxPeriod  - longest trial period in days, the time span if None
+    # oversample - number of trial frequencies per 1/(time span)
+    # alpha      - false alarm probability of the significant peaks
+    # method     - 'fast' or 'exact' trigonometric sums, see lombScargle.py
+    # returns a dictionary of results, one per component, holding the trial
+    # frequencies (1/day), the power and the significant peaks as (period,
+    # power, FAP), and writes [?](comp)_periodogram.txt files if write is set
+    from . import leastSquares as ls
+    from . import lombScargle as gls
+    prof = prof if prof is not None else profiler()
+    with prof.stage('read'):
+        ts = _series(tse)
+    with prof.stage('designMat'):
+        A, _ = dm._matrix(ts.header, ts.offset, ts.dates, periods, 365.25)
+    component = ts._label('COMPONENT')
+    t = A[:,1] * 365.25                     # days since the first epoch
+    T = np.max(t) - np.min(t)
+    if T <= 0 or minPeriod <= 0:
+        raise ValueError("Please check your epochs and periods!")
+    maxPeriod = T if maxPeriod is None else maxPeriod
+    df    = 1 / (oversample * T)
+    nFreq = int((1 / minPeriod - 1 / maxPeriod) / df) + 1
+    if nFreq < 2:
+        raise ValueError("Please check your minimum and maximum periods!")
+    f = 1 / maxPeriod + df * np.arange(nFreq)
+
+    results = {}
+    for i in comps:
+        if component == 'all' and i in compColumns:
+            col = compColumns[i]
+        elif component in compColumns and i in compColumns:
+            col = [0,1]
+        else:
+            raise ValueError("Please check your component flag!")
+        with prof.stage('fit'):
+            _, _, _, resid = ls._lse(A, ts.obs[:,col[0]])
+        sigma = ts.obs[:,col[1]]
+        if np.any(sigma <= 0):
+            sigma = np.ones(len(sigma))
+        with prof.stage('periodogram'):
+            power = gls._gls(t, np.asarray(resid).reshape(-1), sigma, f[0], df, nFreq, method)
+        peaks = gls._peaks(f, power, len(t), T, alpha, nPeaks)
+        if verbose:
+            print("\n         ******* %s *******" % i)
+            print(" # \t Period [days] \t Power \t\t FAP")
+            print("---\t---------------\t-------\t\t---------")
+            for k, (period, pw, fap) in enumerate(peaks):
+                print("%2d\t%15.4f\t%7.4f\t\t%9.2e" % (k+1, period, pw, fap))
+            print("\n  -periods " + " ".join(list(periods) + ["%.4f" % p[0] for p in peaks]) + "\n")
+        if write:
+            fname = _prefix(ts) + i + "_periodogram.txt"
+            np.savetxt(fname, np.column_stack((f, 1 / f, power)), fmt="%14.8f %14.4f %10.6f",
+                       header="frequency [1/day]   period [day]   power")
+            if verbose:
+                print(" " + fname + " file has been created...")
+        results[i] = result(frequency=f, power=power, peaks=peaks)
+    return results
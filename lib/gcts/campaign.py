@@ -0,0 +1,215 @@
+import os
+from collections import OrderedDict
+import numpy as np
+from . import tseFile as tf
+from . import designMat as dm
+from .profiler import profiler
+from .common import dateFormats, compColumns, result, _series, _components, _writeTse
+from .conversion import convert
+from .outliers import clean
+from .evaluation import evaluateAll
+
+# The jobs of many series: the pipeline of the conversion, the cleaning and the
+# evaluation (runPipeline.py), the simulated series and their Monte Carlo
+# study (simCampaign.py), and the priors of a reference network (buildPriors.py).
+
+
+def pipeline(fnames, fromWhich='gipsy', comps=('east', 'north', 'up'), offsets=None, unit=('m','mm'),
+             dateFormat='mjd', siteIDs=None, index=None, outlierMethod='IQrange', scale=3,
+             hampelWindow=31, periods=[], writeTse=False, writeClean=False, writeOutliers=False,
+             writeModel=False, workers=1, seed=None, threads=None, prof=None, verbose=False,
+             **kwargs):
+    # convert, clean and evaluate in one process, passing the series in memory
+    # from one stage to the next, as conv2tse.py, removeOutliers.py and
+    # evalCampaign.py do through the [?].tse files
+    # comps         - components of the sites which are cleaned and evaluated
+    # outlierMethod - method of clean with scale and hampelWindow (its window)
+    # writeTse      - the [?].tse files of the conversion are written
+    # writeClean    - the outlier free [?](comp).tse files are written
+    # writeOutliers - the [?](comp)_outliers.tse files are written
+    # writeModel    - the [?](comp)_model.tse files are written
+    # workers, seed and threads are those of evaluateAll, and kwargs are the
+    # estimation parameters of evaluate
+    # returns a list of results, one per site, holding the converted series
+    # and dictionaries of the results of clean and of evaluate per component
+    prof = prof if prof is not None else profiler()
+    with prof.stage('convert'):
+        tses = convert(fnames, fromWhich, 'all', offsets, unit, dateFormat, siteIDs, index,
+                       write=writeTse, verbose=verbose)
+    sites  = []
+    series = []
+    for ts in tses:
+        with prof.stage('clean'):
+            cleaned = clean(ts, comps, outlierMethod, scale, periods, write=writeClean,
+                            writeOutliers=writeOutliers, window=hampelWindow, prof=prof,
+                            verbose=verbose)
+        sites.append(result(site=ts._label('SITE'), series=ts, cleaned=cleaned, evaluated={}))
+        series += [(len(sites) - 1, comp, cleaned[comp].series) for comp in comps]
+
+    evaluated = evaluateAll([ts for _, _, ts in series], workers, seed, threads, prof=prof,
+                            verbose=verbose, periods=periods, writeModel=writeModel, **kwargs)
+    for (k, comp, _), res in zip(series, evaluated):
+        sites[k].evaluated[comp] = res
+    return sites
+
+
+def simulate(template, wna, fna, unk=None, periods=[], kappa=-1, fs=365.25, nReal=1,
+             dateFormat='mjd', comp='east', unit='mm', seed=None, write=False, verbose=False):
+    # template - [?].tse file name or tseFile.series whose epochs, offsets,
+    #            date format and unit are taken, or the dates (one row per
+    #            epoch) in dateFormat
+    # unk      - true values of the unknowns of the design matrix (intercept,
+    #            trend, offsets, sin and cos of the periods), zeros if None
+    # returns nReal series of comp with white noise of wna and power-law noise
+    # (spectral index kappa) of fna, named [site](comp)_[k].tse, which are
+    # written if write is set
+    from . import simulation as sim
+    from .noise import noise
+    if isinstance(template, (str, tf.series)):
+        ts = _series(template)
+        dates, offsets = ts.dates, list(ts.offset)
+        dateFormat, unit = ts._label('DATE FORMAT'), ts._label('UNIT')
+        site = ts._label('SITE') or 'SIMU'
+    else:
+        dates   = np.asarray(template, dtype=float)
+        dates   = dates.reshape(len(dates), -1)
+        offsets = []
+        site    = 'SIMU'
+    if dateFormat not in dateFormats:
+        raise ValueError("Please check your output date flag!")
+    header = ["* SITE         : " + site + "\n",
+              "* COMPONENT    : " + comp + "\n",
+              "* UNIT         : " + unit + "\n",
+              "* DATE FORMAT  : " + dateFormat + "\n"]
+    header += ["* OFFSET       : " + off + "\n" for off in offsets]
+    header += ["* DATA ORDER   : " + comp[0].upper() + " s" + comp[0].upper() + " date\n",
+               "* COMMENT      : Simulated with wna %g, fna %g and kappa %g\n" % (wna, fna, kappa),
+               "* ENDOFHEADER\n"]
+    A, _ = dm._matrix(header, offsets, dates, periods, fs)
+    if unk is None:
+        unk = np.zeros(len(A[0,:]))
+    if len(unk) != len(A[0,:]):
+        raise ValueError("%d unknowns are expected for the design matrix!" % len(A[0,:]))
+    Jvec, dt = noise(dates, dateFormat, kappa, fs)._kernel()
+    Y = sim._realizations(A, unk, Jvec, dt, wna, fna, nReal, np.random.RandomState(seed))
+
+    series = []
+    for k in range(nReal):
+        obs = np.column_stack((Y[:,k], np.zeros(len(Y[:,k]))))
+        series.append(tf.series("%s%s_%04d.tse" % (site, comp, k+1), list(header), comp, list(offsets),
+                                obs, dates))
+        if write:
+            _writeTse(series[-1], verbose)
+    return series
+
+
+def monteCarlo(template, wna, fna, nReal, unk=None, periods=[], kappa=-1, fs=365.25, seed=None,
+               workers=1, threads=None, write=False, prof=None, verbose=False, **kwargs):
+    # evaluates nReal series of simulate by evaluateAll (the series share
+    # their epochs, so J and its decomposition are built once) and summarizes
+    # the estimates against the true values
+    # kwargs - the estimation parameters of evaluate, with the same periods,
+    #          kappa and fs as the simulation
+    # returns the results of evaluate and the (label, true value, mean, bias,
+    # standard deviation, RMSE, mean of the estimated sigmas) table
+    prof = prof if prof is not None else profiler()
+    with prof.stage('simulate'):
+        series = simulate(template, wna, fna, unk, periods, kappa, fs, nReal, seed=seed,
+                          write=write, verbose=verbose)
+    results = evaluateAll(series, workers, seed, threads, prof=prof, verbose=verbose,
+                          periods=periods, kappa=kappa, fs=fs, **kwargs)
+
+    ols   = kwargs.get('ols', False)
+    truth = np.zeros(len(results[0].labels)) if unk is None else np.asarray(unk, dtype=float)
+    est   = np.array([np.ravel(r.unkOLS if ols else r.unk) for r in results])
+    sig   = np.array([np.ravel(r.sUnkOLS if ols else r.sUnk) for r in results])
+    table = []
+    for k, label in enumerate(results[0].labels):
+        table.append(_biasRow(label, truth[k], est[:,k], sig[:,k]))
+    if not ols:
+        table.append(_biasRow('wna', wna, np.array([r.wna for r in results]), None))
+        table.append(_biasRow('fna', fna, np.array([r.fna for r in results]), None))
+    return result(results=results, table=table)
+
+
+def _biasRow(label, truth, est, sig):
+    err = est - truth
+    return (label, float(truth), float(np.mean(est)), float(np.mean(err)), float(np.std(est, ddof=1))
+            if len(est) > 1 else 0.0, float(np.sqrt(np.mean(err**2))),
+            float(np.mean(sig)) if sig is not None else float('nan'))
+
+
+def buildPriors(tses, outDir, periods=[], kappa=-1, fs=365.25, alphas=(0.05,), workers=1, prof=None,
+                verbose=False):
+    # tses    - [?].tse file names of a reference network, of one component or
+    #           of all components
+    # outDir  - directory of the results_[comp].txt tables (SITE WRMS WNA FNA,
+    #           as in metaData) and of priors.npz holding the tables and the
+    #           search space fits of the alphas, see searchSpace._priorFits
+    # workers - number of processes (or 'auto' for the cores available)
+    # The WRMS is that of the ordinary solution and the noise amplitudes are
+    # variance component estimates (noise.mleNoise._vce).
+    # returns the rows as {comp: [(site, WRMS, WNA, FNA), ...]}
+    import multiprocessing
+    from . import scheduler as sch
+    from . import searchSpace
+    prof = prof if prof is not None else profiler()
+    workers = sch._cores() if workers == 'auto' else max(1, min(workers, len(tses)))
+    jobs = [(tse, periods, kappa, fs, max(1, sch._cores() // workers)) for tse in tses]
+    with prof.stage('vce'):
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                outs = pool.starmap(_priorRows, jobs)
+        else:
+            outs = [_priorRows(*job) for job in jobs]
+
+    rows = OrderedDict((comp, []) for comp in compColumns)
+    for tse, (out, err) in zip(tses, outs):
+        if err is not None:
+            if verbose:
+                print(" " + str(tse) + " is skipped: " + err)
+            continue
+        for comp, row in out:
+            rows.setdefault(comp, []).append(row)
+    os.makedirs(outDir, exist_ok=True)
+    with prof.stage('write'):
+        for comp in list(rows):
+            if not rows[comp]:
+                del rows[comp]
+                continue
+            fname = os.path.join(outDir, "results_" + comp + ".txt")
+            with open(fname, 'w') as f:
+                for site, WRMS, WNA, FNA in sorted(rows[comp]):
+                    f.write("%4s%11.4f%11.4f%11.4f\n" % (site, WRMS, WNA, FNA))
+            if verbose:
+                print(" " + fname + " file has been created...")
+        if not rows:
+            raise ValueError("No prior could be estimated from the series!")
+        fname = searchSpace._writePriors(outDir, list(alphas))
+    if verbose:
+        print(" " + fname + " file has been created...")
+    return rows
+
+
+def _priorRows(tse, periods, kappa, fs, threads):
+    # (comp, (site, WRMS, WNA, FNA)) of the components of a series, and the
+    # error message if it could not be estimated
+    from . import leastSquares as ls
+    from . import scheduler as sch
+    from .noise import noise, mleNoise
+    try:
+        with sch._limitThreads(threads):
+            ts   = _series(tse)
+            A, _ = dm._matrix(ts.header, ts.offset, ts.dates, periods, fs)
+            J    = noise(ts.dates, ts._label('DATE FORMAT'), kappa, fs).mat()[1]
+            site = ts._label('SITE')
+            out  = []
+            for comp in _components(ts):
+                L = comp.obs[:,0]
+                _, _, _, resid = ls._lse(A, L)
+                WRMS = np.sqrt((resid.T @ resid) / len(A[:,0]))[0][0]
+                wna, fna, _ = mleNoise(A, L, J, WRMS)._vce()
+                out.append((comp.component, (site, float(WRMS), float(wna), float(fna))))
+        return out, None
+    except (ValueError, ArithmeticError, np.linalg.LinAlgError) as err:
+        return None, str(err)
@@ -0,0 +1,155 @@
+import os, hashlib, json
+import numpy as np
+from . import tseFile as tf
+
+# The files evaluate keeps between the runs: the checkpoint of the repeats of
+# the search ([?]_checkpoint.npz and [?]_checkpointJ.npz), and the state of the
+# factorization which the epochs appended by the next run are folded into
+# ([?]_state.npz).
+
+
+def _statePath(ts):
+    return ts.filename.split(".")[0] + "_state.npz"
+
+
+def _checkpointPath(ts):
+    name = ts.filename.split(".")[0] if ts.filename else tf._headerValue(ts.header, 'SITE')
+    return name + "_checkpoint.npz"
+
+
+def _checkpointKey(dates, L, params):
+    # the repeats are only resumed for the same epochs, observations and parameters
+    digest = hashlib.sha1(np.ascontiguousarray(dates, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(L, dtype=float).tobytes())
+    digest.update(json.dumps(params, default=str).encode())
+    return digest.hexdigest()
+
+
+def _randomState(state, prefix):
+    # the state of a numpy RandomState as arrays of an npz file
+    name, keys, pos, hasGauss, cached = state
+    return {prefix + 'Keys': keys, prefix + 'Pos': pos, prefix + 'Gauss': hasGauss,
+            prefix + 'Cached': cached}
+
+
+def _getRandomState(ck, prefix):
+    return ('MT19937', ck[prefix + 'Keys'], int(ck[prefix + 'Pos']), int(ck[prefix + 'Gauss']),
+            float(ck[prefix + 'Cached']))
+
+
+def _saveCheckpoint(path, key, cache, fingerprint, factor, state):
+    # the state of the repeats is rewritten at each checkpoint, J and its
+    # decomposition (already in the cache) only once per key, i.e. again if
+    # the file belongs to another series or parameters. The files are written
+    # under a temporary name and renamed, so that a job stopped while writing
+    # keeps the previous checkpoint.
+    pathJ = path[:-len(".npz")] + "J.npz"
+    if _checkpointJKey(pathJ) != key:
+        arrays = {'key': key, 'J': cache.items.get(fingerprint)}
+        if factor == 'eig':
+            arrays['lam'], arrays['U'] = cache.items.get(fingerprint + ('eig',), (None, None))
+        _atomicSave(pathJ, {k: v for k, v in arrays.items() if v is not None})
+    _atomicSave(path, dict(state, key=key))
+
+
+def _checkpointJKey(pathJ):
+    # the key of [?]_checkpointJ.npz (without loading J), None if there is not
+    try:
+        with np.load(pathJ) as f:
+            return str(f['key'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _atomicSave(path, arrays):
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def _loadCheckpoint(path, key, cache, fingerprint):
+    # the state of the repeats if it belongs to the key, None otherwise. J and
+    # its decomposition of the checkpoint are put into the cache.
+    if not os.path.isfile(path):
+        return None
+    with np.load(path) as f:
+        ck = dict(f)
+    if str(ck['key']) != key:
+        return None
+    pathJ = path[:-len(".npz")] + "J.npz"
+    if _checkpointJKey(pathJ) == key:
+        with np.load(pathJ) as f:
+            if 'J' in f:
+                J = f['J']
+                cache._get(fingerprint, lambda: J)
+                if 'lam' in f:
+                    eig = (f['lam'], f['U'])
+                    cache._get(fingerprint + ('eig',), lambda: eig)
+    return ck
+
+
+def _removeCheckpoint(path):
+    for p in [path, path[:-len(".npz")] + "J.npz"]:
+        if os.path.isfile(p):
+            os.remove(p)
+
+
+def _newState(A, L, dates, J, wna, fna, kappa, fs):
+    # factorization of C at the final amplitudes and the whitened normal
+    # equations, which the appended epochs of the next run are folded into.
+    # J and Lc are the only n x n arrays, J for its new rows and columns and
+    # Lc for the factorization of the appended epochs.
+    import scipy.linalg as la
+    from .noise import _cov
+    Lc = la.cholesky(_cov(J, wna, fna), lower=True)
+    W  = la.solve_triangular(Lc, A, lower=True)
+    l  = la.solve_triangular(Lc, L, lower=True)
+    return {'dates': dates, 'A': A, 'L': L, 'J': J, 'Lc': Lc, 'W': W, 'l': l,
+            'nEq': W.T @ W, 'rhs': W.T @ l, 'll': np.sum(l**2),
+            'wna': wna, 'fna': fna, 'kappa': kappa, 'fs': fs}
+
+
+def _loadState(path, A, L, dates, kappa, fs):
+    # the state of the previous run if the series only has epochs appended
+    # since then, None otherwise
+    if not os.path.isfile(path):
+        return None
+    with np.load(path) as f:
+        state = dict(f)
+    n0 = len(state['L'])
+    if (n0 > len(L) or np.shape(state['A'])[1] != np.shape(A)[1] or
+        np.shape(state['dates'])[1] != np.shape(dates)[1] or
+        float(state['kappa']) != float(kappa) or float(state['fs']) != float(fs)):
+        return None
+    if not (np.allclose(state['dates'], dates[:n0]) and np.allclose(state['A'], A[:n0]) and
+            np.allclose(state['L'], L[:n0])):
+        return None
+    return state
+
+
+def _saveState(path, state, verbose=False):
+    np.savez(path, **state)
+    if verbose:
+        print(" " + path + " file has been created...")
+
+
+def _appendState(state, A, L, J, dof):
+    # folds the appended epochs into the factorization and the normal
+    # equations of the previous amplitudes. Returns s0 of the longer series at
+    # the previous amplitudes and the amplitudes scaled by it, which give
+    # s0 = 1 since s0(c*wna, c*fna) = s0(wna, fna) / c.
+    from . import leastSquares as ls
+    from .noise import _cov
+    n0, n = len(state['L']), len(L)
+    wna, fna = float(state['wna']), float(state['fna'])
+    Lc, W, l = state['Lc'], state['W'], state['l']
+    nEq, rhs, ll = state['nEq'], state['rhs'], float(state['ll'])
+    if n > n0:
+        Lc  = ls._cholAppend(Lc, fna**2 * J[n0:,:n0], _cov(J[n0:,n0:], wna, fna))
+        W2  = ls._whitenAppend(Lc, A, W)
+        l2  = ls._whitenAppend(Lc, L, l)
+        W, l = np.concatenate((W, W2)), np.concatenate((l, l2))
+        nEq, rhs, ll = nEq + W2.T @ W2, rhs + W2.T @ l2, ll + np.sum(l2**2)
+    _, _, s0 = ls._lseNormal(nEq, rhs, ll, dof)
+    return s0, (wna * s0, fna * s0)
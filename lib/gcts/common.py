@@ -0,0 +1,89 @@
+import os, hashlib
+from collections import OrderedDict
+import numpy as np
+from . import tseFile as tf
+
+# The units, date formats and components of the series, the result of the jobs,
+# the cache of the J matrices and the helpers of the series in memory, which
+# the jobs of the other modules share.
+
+units      = ['mm', 'cm', 'dm', 'm', 'km']
+transScale = np.array([[1.0e+0, 1.0e-1, 1.0e-2, 1.0e-3, 1.0e-6],
+                       [1.0e+1, 1.0e+0, 1.0e-1, 1.0e-2, 1.0e-5],
+                       [1.0e+2, 1.0e+1, 1.0e+0, 1.0e-1, 1.0e-4],
+                       [1.0e+3, 1.0e+2, 1.0e+1, 1.0e+0, 1.0e-3],
+                       [1.0e+6, 1.0e+5, 1.0e+4, 1.0e+3, 1.0e+0]])
+dateFormats = ['yyyymmdd', 'mjd', 'yearANDdoy', 'gweekANDdow', 'decimalYear']
+compColumns = {'east': [0,3], 'north': [1,4], 'up': [2,5]}
+
+
+class result:
+    # outputs of convert, clean and evaluate, the attributes depend on the job
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+    def _asdict(self):
+        return dict(self.__dict__)
+
+
+class matCache:
+    # J matrices of the recently used epoch sets, least recently used dropped first
+    def __init__(self, maxItems=8):
+        self.maxItems = maxItems
+        self.items    = OrderedDict()
+
+    def _get(self, key, build):
+        if key in self.items:
+            self.items.move_to_end(key)
+            return self.items[key]
+        value = build()
+        self.items[key] = value
+        while len(self.items) > self.maxItems:
+            self.items.popitem(last=False)
+        return value
+
+
+def _series(tse):
+    # a series in memory from either a file name or a series
+    if isinstance(tse, tf.series):
+        return tse
+    if not os.path.isfile(tse):
+        raise ValueError("can't open '" + str(tse) + "'")
+    return tf._load(tse)
+
+
+def _prefix(ts):
+    # the output files of removeOutliers begin with the first 4 letters of the input
+    if ts.filename is None:
+        return tf._headerValue(ts.header, 'SITE')
+    return ts.filename[0:4]
+
+
+def _components(ts):
+    # the east, north and up series of a series of all components
+    if ts._label('COMPONENT') != 'all':
+        return [ts]
+    series = []
+    for comp, col in compColumns.items():
+        header = list(ts.header)
+        for k in range(len(header)):
+            if 'COMPONENT' in header[k]:
+                header[k] = "* COMPONENT    : " + comp + "\n"
+            if 'DATA ORDER' in header[k]:
+                header[k] = "* DATA ORDER   : " + comp + " s_" + comp + " dates" + "\n"
+        series.append(tf.series(_prefix(ts) + comp + ".tse", header, comp, ts.offset, ts.obs[:,col], ts.dates))
+    return series
+
+
+def _fingerprint(dates, dateFormat, kappa, fs):
+    # J only depends on the epochs, the spectral index and the frequency
+    digest = hashlib.sha1(np.ascontiguousarray(dates, dtype=float).tobytes()).hexdigest()
+    return (digest, np.shape(dates), dateFormat, float(kappa), float(fs))
+
+
+def _writeTse(ts, verbose=False):
+    # dates of the converted files are written as %14.6f for mjd and decimalYear
+    if tf._headerValue(ts.header, 'DATE FORMAT') in ['mjd', 'decimalYear']:
+        tf._write(ts.filename, ts.header, ts.obs, ts.dates, "%14.6f", verbose)
+    else:
+        tf._write(ts.filename, ts.header, ts.obs, ts.dates, "%8g", verbose)
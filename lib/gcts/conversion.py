@@ -0,0 +1,231 @@
+import os, hashlib, json
+from collections import OrderedDict
+import numpy as np
+from . import tseFile as tf
+from . import sourceFile as sf
+from .common import units, transScale, dateFormats, compColumns, _writeTse
+
+# Conversion of the gipsy, gamit and bernese solutions into [?].tse series
+# (conv2tse.py), in full or incrementally by the manifest of the sources.
+
+
+def convert(fnames, fromWhich='gipsy', comp='all', offsets=None, unit=('m','mm'),
+            dateFormat='mjd', siteIDs=None, index=None, incremental=False, write=True,
+            verbose=False):
+    # fnames      - source file names
+    # offsets     - offset dates as strings in dateFormat, e.g. "2014 1 1"
+    # index       - path of the orgIndex database of the gamit files, which is
+    #               updated by the new and changed files before the conversion
+    # incremental - only the sources which are new or changed since the last
+    #               conversion (see [?]_manifest.json) are read and merged into
+    #               the existing [?].tse files, see _convertIncremental
+    # returns a list of tseFile.series, one per site
+    if (unit[0] not in units) or (unit[1] not in units):
+        raise ValueError("The unit variables must be two of mm, cm, dm, m, km!")
+    if dateFormat not in dateFormats:
+        raise ValueError("Please check your output date flag!")
+    if comp not in ['all'] + list(compColumns):
+        raise ValueError("Please check your component flag!")
+    unitScale = transScale[units.index(unit[0]), units.index(unit[1])]
+    if incremental:
+        return _convertIncremental(fnames, fromWhich, comp, offsets, unit, dateFormat, siteIDs, index,
+                                   unitScale, write, verbose)
+
+    sources = []
+    if fromWhich == 'gipsy':
+        for fname in fnames:
+            sources.append((os.path.basename(fname)[0:4],) + sf._gipsy(fname))
+    elif fromWhich in ['gamit', 'bernese']:
+        if not siteIDs:
+            raise ValueError("-siteID has to be specified for the " + fromWhich + " files!")
+        reader = sf._gamit if fromWhich == 'gamit' else sf._bernese
+        if fromWhich == 'gamit' and index is not None:
+            from .orgIndex import orgIndex
+            idx = orgIndex(index)
+            nNew = idx._update(fnames)
+            if verbose:
+                print(" " + str(nNew) + " file(s) have been indexed into " + index + "\n")
+            reader = lambda fnames, siteID: sf._gamit(fnames, siteID, idx)
+        for siteID in siteIDs:
+            sources.append((siteID,) + reader(fnames, siteID))
+    else:
+        raise ValueError("Please check your source software flag!")
+
+    tses = []
+    for siteID, data, ymd in sources:
+        tses.append(_toTse(siteID, data * unitScale, ymd, comp, offsets, unit[1], dateFormat))
+        if write:
+            _writeTse(tses[-1], verbose)
+    return tses
+
+
+def _convertIncremental(fnames, fromWhich, comp, offsets, unit, dateFormat, siteIDs, index,
+                        unitScale, write, verbose):
+    # The manifest of each output keeps the conversion parameters, the sources
+    # ingested so far with their checksums and epochs, and the reference
+    # coordinates of the gamit and bernese observations. Only the sources not
+    # in the manifest, or with another checksum, are read. Their epochs are
+    # merged into the existing series in sorted order, replacing the epochs
+    # with the same dates. Without a matching manifest or output the series is
+    # converted from the given sources and the manifest is created.
+    params = {'fromWhich': fromWhich, 'comp': comp, 'offsets': offsets, 'unit': list(unit),
+              'dateFormat': dateFormat}
+    if fromWhich == 'gipsy':
+        sites = OrderedDict()
+        for fname in fnames:
+            sites.setdefault(os.path.basename(fname)[0:4], []).append(fname)
+    elif fromWhich in ['gamit', 'bernese']:
+        if not siteIDs:
+            raise ValueError("-siteID has to be specified for the " + fromWhich + " files!")
+        sites = OrderedDict((siteID, list(fnames)) for siteID in siteIDs)
+    else:
+        raise ValueError("Please check your source software flag!")
+    idx = None
+    if fromWhich == 'gamit' and index is not None:
+        from .orgIndex import orgIndex
+        idx = orgIndex(index)
+        idx._update(fnames)
+
+    tses = []
+    for siteID, files in sites.items():
+        outFilename  = siteID + (".tse" if comp == 'all' else comp + ".tse")
+        manifestPath = _manifestPath(outFilename)
+        manifest = _loadManifest(manifestPath)
+        if manifest is None or manifest['params'] != params or not os.path.isfile(outFilename):
+            manifest = {'params': params, 'ref': None, 'sources': {}}
+            old = None
+        else:
+            old = tf._load(outFilename)
+        new = [f for f in files if _sourceChanged(f, manifest['sources'].get(os.path.abspath(f)))]
+        if not new:
+            if verbose:
+                print(" " + outFilename + " is up to date...")
+            tses.append(old)
+            continue
+
+        data, ymd, epochs, manifest['ref'] = _readSources(fromWhich, new, siteID, idx, manifest['ref'])
+        ts = _toTse(siteID, data * unitScale, ymd, comp, offsets, unit[1], dateFormat)
+        if old is not None:
+            ts = _mergeSeries(old, ts)
+        if write:
+            _writeTse(ts, verbose)
+            for fname in new:
+                manifest['sources'][os.path.abspath(fname)] = dict(_fileStamp(fname), **epochs[fname])
+            with open(manifestPath, 'w') as f:
+                json.dump(manifest, f, indent=1)
+            if verbose:
+                print(" " + manifestPath + " file has been created...")
+        if verbose:
+            print(" %d new or changed source(s), %d epochs in total" % (len(new), len(ts.obs)))
+        tses.append(ts)
+    return tses
+
+
+def _readSources(fromWhich, fnames, siteID, index, ref):
+    # the observations (wrt. ref, which is set by the first conversion) and
+    # the dates of the sources, and the epochs of each source for the manifest
+    if fromWhich == 'gipsy':
+        parts = [sf._gipsy(fname) for fname in fnames]
+        data  = np.concatenate([p[0] for p in parts])
+        ymd   = np.concatenate([p[1] for p in parts])
+        epochs = {fname: _epochs(p[1]) for fname, p in zip(fnames, parts)}
+        return data, ymd, epochs, ref
+    epochs = {}
+    if fromWhich == 'gamit':
+        parts = []
+        for fname in fnames:
+            try:
+                parts.append(sf._gamitRecords([fname], siteID, index))
+                epochs[fname] = _epochs(parts[-1][2])
+            except ValueError:
+                epochs[fname] = _epochs(np.empty((0,3), dtype=int))
+        if not parts:
+            raise ValueError("Site " + siteID + " could not be found in the gamit files!")
+        obs, s_obs, ymd = [np.concatenate([p[i] for p in parts]) for i in range(3)]
+        ref  = ref if ref is not None else {'coordinates': obs[0,:].tolist()}
+        data = sf._gamitENU(obs, s_obs, ref['coordinates'])
+    else:
+        obsXYZ, s_obs, ymd, latlon = sf._berneseRecords(fnames, siteID)
+        epochs = {fname: _epochs(ymd[[i],:]) for i, fname in enumerate(fnames)}
+        ref  = ref if ref is not None else {'coordinates': obsXYZ[0,:].tolist(), 'latlon': list(latlon)}
+        data = sf._berneseENU(obsXYZ, s_obs, ref['coordinates'], *ref['latlon'])
+    return data, ymd, epochs, ref
+
+
+def _mergeSeries(old, new):
+    # epochs of both series in sorted order, those of the new series replacing
+    # the old ones with the same dates
+    obs   = np.concatenate((new.obs, old.obs))
+    dates = np.concatenate((new.dates, old.dates))
+    _, first = np.unique(dates, axis=0, return_index=True)     # first occurrence, sorted by date
+    return tf.series(old.filename, old.header, old.component, old.offset, obs[first], dates[first])
+
+
+def _epochs(ymd):
+    if len(ymd) == 0:
+        return {'nEpochs': 0, 'first': None, 'last': None}
+    ymd = ymd[np.lexsort(ymd.T[::-1])]
+    return {'nEpochs': len(ymd), 'first': "%d %d %d" % tuple(ymd[0]), 'last': "%d %d %d" % tuple(ymd[-1])}
+
+
+def _manifestPath(tseFilename):
+    return tseFilename.split(".")[0] + "_manifest.json"
+
+
+def _loadManifest(path):
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+
+def _fileStamp(fname):
+    st = os.stat(fname)
+    return {'size': st.st_size, 'mtime': st.st_mtime_ns, 'sha256': _checksum(fname)}
+
+
+def _checksum(fname):
+    h = hashlib.sha256()
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(2**20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _sourceChanged(fname, stamp):
+    # the checksum is only computed when the size or the modification time differs
+    if stamp is None:
+        return True
+    st = os.stat(fname)
+    if st.st_size == stamp['size'] and st.st_mtime_ns == stamp['mtime']:
+        return False
+    return _checksum(fname) != stamp['sha256']
+
+
+def _toTse(siteID, data, ymd, comp, offsets, unit, dateFormat):
+    header = ["* SITE         : " + siteID + "\n",
+              "* COMPONENT    : " + comp + "\n",
+              "* UNIT         : " + unit + "\n",
+              "* DATE FORMAT  : " + dateFormat + "\n"]
+    offset = []
+    if offsets is not None:
+        for off in offsets:
+            header.append("* OFFSET       : " + off + "\n")
+            offset.append(off)
+    if comp == 'all':
+        header.append("* DATA ORDER   : E N U sE sN sU date\n")
+        obs = data
+    else:
+        header.append("* DATA ORDER   : " + comp[0].upper() + " s" + comp[0].upper() + " date\n")
+        obs = data[:,compColumns[comp]]
+    header.append("* COMMENT      : any comment could be added under this label.\n")
+    header.append("* ENDOFHEADER\n")
+
+    if comp == 'all':
+        newFilename = siteID + ".tse"
+    else:
+        newFilename = siteID + comp + ".tse"
+    return tf.series(newFilename, header, comp, offset, obs, sf._convDates(ymd, dateFormat))
@@ -1,4 +1,4 @@
-import math, sys
+import math
 import numpy as np
 
 class date:
@@ -46,8 +46,7 @@ class date:
                 self.doy                        = _ymd2doy(self.year, self.month, self.day)
                 self.decimalYear                = self.year + self.doy/365.25
             else:
-                print("Please check your input date flag!")
-                sys.exit()
+                raise ValueError("Please check your input date flag!")
                 
             if self.outf == 'mjd':
                 return self.mjd
@@ -60,8 +59,7 @@ class date:
             elif self.outf == 'yyyymmdd':
                 return self.year, self.month, self.day
             else:
-                print("Please check your output date flag!")
-                sys.exit()
+                raise ValueError("Please check your output date flag!")
             
 
         
@@ -131,4 +129,4 @@ def _ymd2doy(year, month, day):
     else:
         doy = month_day[0, month-1] + day
 
-    return doy
\ No newline at end of file
+    return doy
\ No newline at end of file
@@ -0,0 +1,566 @@
+import os, statistics
+from collections import OrderedDict
+import numpy as np
+from . import designMat as dm
+from . import tseFile as tf
+from .profiler import profiler
+from .progressBar import printProgressBar
+from .common import result, matCache, _series, _components, _fingerprint
+from .checkpoint import (_statePath, _checkpointPath, _checkpointKey, _randomState, _getRandomState,
+                         _saveCheckpoint, _loadCheckpoint, _removeCheckpoint, _newState, _loadState,
+                         _saveState, _appendState)
+
+# Estimation of the noise amplitudes and the weighted solutions of the series
+# (evalCampaign.py), of many series sharing J (evaluateAll) and of a range of
+# spectral indices (kappaSweep).
+
+_shared = None    # the series of evaluateAll inherited by the forked processes
+
+
+def evaluate(tse, periods=[], alpha=0.05, nRND=None, fs=365.25, kappa=-1, incr=0.025, repeat=None,
+             ols=False, memLimit=None, approx=None, approxTol=1e-3, writeModel=False,
+             method='search', estKappa=False, sampler='grid', tol=1e-3, converge=None, window=5,
+             update=False, seed=None, cache=None, invalidate=False, factor='chol', checkpoint=None,
+             resume=False, prof=None, Jcache=None, verbose=False):
+    # tse        - [?](comp).tse file name or tseFile.series of one component
+    # method     - 'search' for the amplitudes giving s0 = 1 (Duman and Sanli, 2020)
+    #              or 'mle' for the maximum likelihood amplitudes
+    # estKappa   - kappa is estimated too by the 'mle' method
+    # sampler    - 'grid' for the nRND x nRND random design and the cubic surface,
+    #              or 'adaptive' for refining the seed grid near s0 = 1 to tol
+    # converge   - relative tolerance for stopping the repeats early, see _converged
+    # update     - the [?]_state.npz file of the previous run is extended by the
+    #              appended epochs instead of a new estimation, and is rewritten
+    # seed       - seed of the random points of the search space
+    # cache      - resultCache returning the results of identical jobs
+    # invalidate - the cached result of this job is dropped and recomputed
+    # memLimit   - memory budget in MB for the noise matrices
+    # factor     - 'chol' for the Cholesky factorization of C in each weighted
+    #              solution, or 'eig' for solving in the eigenbasis of J whose
+    #              decomposition is kept in Jcache with J, see evaluateAll
+    # Jcache     - matCache keeping J between the calls, e.g. in the worker
+    # checkpoint - the state of the repeats (amplitudes so far, random states)
+    #              is saved every checkpoint repeats into [?]_checkpoint.npz,
+    #              and J (and its decomposition) once into [?]_checkpointJ.npz
+    # resume     - the repeats continue from [?]_checkpoint.npz if it belongs to
+    #              the same series and parameters, see _loadCheckpoint
+    # returns the ordinary least-squares results, and unless ols is set, the
+    # weighted least-squares results with the estimated noise amplitudes
+    prof = prof if prof is not None else profiler()
+    with prof.stage('read'):
+        ts = _series(tse)
+    key = None
+    if cache is not None and not update:
+        # memLimit and factor only change how the same solution is computed
+        params = {'periods': list(periods), 'alpha': alpha, 'nRND': nRND, 'fs': fs, 'kappa': kappa,
+                  'incr': incr, 'repeat': repeat, 'ols': ols, 'approx': approx, 'approxTol': approxTol,
+                  'method': method, 'estKappa': estKappa, 'sampler': sampler, 'tol': tol,
+                  'converge': converge, 'window': window, 'seed': seed}
+        key = cache._key(ts, params)
+        if invalidate:
+            cache._invalidate(key)
+        res = cache._get(key)
+        if res is not None:
+            if verbose:
+                print(" Result is taken from the cache (" + key[:12] + ")\n")
+            res.filename, res.series = ts.filename, ts
+            if writeModel:
+                _writeModel(res, verbose)
+            return res
+
+    if seed is not None:
+        np.random.seed(seed)
+    res = _evaluate(ts, periods, alpha, nRND, fs, kappa, incr, repeat, ols, memLimit, approx, approxTol,
+                    method, estKappa, sampler, tol, converge, window, update, seed, factor, checkpoint,
+                    resume, prof, Jcache, verbose)
+    if key is not None:
+        cache._put(key, res)
+    if writeModel and not ols:
+        _writeModel(res, verbose)
+    return res
+
+
+def _evaluate(ts, periods, alpha, nRND, fs, kappa, incr, repeat, ols, memLimit, approx, approxTol,
+              method, estKappa, sampler, tol, converge, window, update, seed, factor, checkpoint,
+              resume, prof, Jcache, verbose):
+    # the estimation of evaluate for a series in memory
+    from . import leastSquares as ls
+    with prof.stage('designMat'):
+        A, cycle = dm._matrix(ts.header, ts.offset, ts.dates, periods, fs)
+    obs   = ts.obs
+    dates = ts.dates
+    L   = obs[:,0].reshape(len(obs[:,0]),1)
+    dof = len(A[:,0]) - len(A[0,:])
+    with prof.stage('ols'):
+        unkOLS, sUnkOLS, s0OLS, resid = ls._lse(A, L)
+    WRMS = np.sqrt((resid.T @ resid) / len(A[:,0]))[0][0]
+
+    unit = ts._label('UNIT')
+    unitLabel = [unit] * len(unkOLS)
+    unitLabel[1] = unitLabel[1] + "/year"
+    unkLabel = ['intercept', 'trend']
+    offsetLabel = ["{}{}".format(a, b) for a, b in zip(["offset at "]*len(ts.offset), ts.offset)]
+    unkLabel = np.append(unkLabel, offsetLabel)
+    seasLabel = []
+    for s1 in range(len(cycle)):
+        seasLabel = np.append(seasLabel, ['sin ' + "{:10.4f}".format(cycle[s1]), 'cos ' + "{:10.4f}".format(cycle[s1])])
+    unkLabel = np.append(unkLabel, seasLabel)
+
+    res = result(filename=ts.filename, series=ts, A=A, unit=unit, labels=list(unkLabel), units=unitLabel,
+                 WRMS=WRMS, unkOLS=unkOLS, sUnkOLS=sUnkOLS, s0OLS=s0OLS)
+    if ols:
+        return res
+    if method not in ['search', 'mle']:
+        raise ValueError("Please check your estimation method!")
+    if method == 'search' and ((nRND is None) or (repeat is None)):
+        raise ValueError("nRND and repeat have to be specified for the weighted solution!")
+    if sampler not in ['grid', 'adaptive']:
+        raise ValueError("Please check your sampler!")
+    if method == 'mle' and approx is not None:
+        raise ValueError("The approximate noise models are only used with the search method!")
+    if factor not in ['chol', 'eig']:
+        raise ValueError("Please check your factorization!")
+    if factor == 'eig' and memLimit is not None:
+        raise ValueError("The eigendecomposition of J can not be used with a memory limit!")
+    if method == 'mle' and memLimit is not None:
+        # mleNoise decomposes the whole J
+        raise ValueError("The maximum likelihood method can not be used with a memory limit!")
+    if update and memLimit is not None:
+        # the state keeps the whole J and its Cholesky factor
+        raise ValueError("The update state can not be kept within a memory limit!")
+
+    import scipy.linalg as la
+    from .noise import noise, approxNoise, mleNoise, _mleKappa, _cov
+
+    dateFormat = ts._label('DATE FORMAT')
+    nObs = len(A[:,0])
+    if memLimit is not None:
+        # J and one workspace for the covariance and its Cholesky factor
+        memLimit = memLimit * 2**20
+        if memLimit < (2*nObs**2 + 2*nObs + 1) * 8:
+            raise ValueError("Memory limit is too small! At least %.3f MB is needed for %d epochs." % \
+                             ((2*nObs**2 + 2*nObs + 1) * 8 / 2**20, nObs))
+
+    state = None
+    if update:
+        statePath = _statePath(ts)
+        state     = _loadState(statePath, A, L, dates, kappa, fs)
+        if verbose and state is None and os.path.isfile(statePath):
+            print(" " + statePath + " does not match the series, the noise is estimated from scratch.\n")
+
+    cache  = Jcache if Jcache is not None else matCache(2)
+    buildJ = lambda kap: _buildJ(dates, dateFormat, kap, fs, cache, memLimit, state)
+
+    ckPath, ck = None, None
+    if method == 'search' and state is None and (checkpoint or resume):
+        ckPath = _checkpointPath(ts)
+        ckKey  = _checkpointKey(dates, L, [list(periods), alpha, nRND, fs, kappa, incr, repeat,
+                                           sampler, tol, converge, window, approx, approxTol, seed])
+        if resume:
+            ck = _loadCheckpoint(ckPath, ckKey, cache, _fingerprint(dates, dateFormat, kappa, fs))
+            if verbose:
+                if ck is None and os.path.isfile(ckPath):
+                    print(" " + ckPath + " does not match the series or parameters, the repeats start from scratch.\n")
+                elif ck is not None:
+                    print(" Resumed after %d of %d repeats\n" % (int(ck['nUsed']), repeat))
+
+    centre = None
+    if method == 'search' and state is not None:
+        # the previous factorization and normal equations are extended by the
+        # appended epochs, and the previous amplitudes scaled onto s0 = 1 of
+        # the longer series are the centre of the search space of the repeats
+        with prof.stage('update'):
+            s0Prev, centre = _appendState(state, A, L, buildJ(kappa), dof)
+        res.updated = (len(state['L']), nObs - len(state['L']))
+        res.s0Prev  = s0Prev
+        if verbose:
+            print(" Updated from %d epochs with %d new epochs (s0 = %.4f at the previous amplitudes)\n" % \
+                  (res.updated + (s0Prev,)))
+
+    if method == 'mle':
+        # maximum likelihood amplitudes (and kappa) instead of the s0 = 1 search
+        with prof.stage('mle'):
+            if estKappa:
+                kappa, model, nEval = _mleKappa(buildJ, A, L, WRMS)
+            else:
+                eig   = _eigenJ(dates, dateFormat, kappa, fs, cache, state=state) if factor == 'eig' else None
+                model = mleNoise(A, L, buildJ(kappa), WRMS, eig)
+                model._fit(None if state is None else (float(state['wna']), float(state['fna'])))
+                nEval = model.nEval
+        res.kappa, res.logLik, res.nEval = kappa, model.logLik, nEval
+        if verbose:
+            print(" Maximum likelihood : logL = %.4f after %d evaluations\n" % (model.logLik, nEval))
+
+    with prof.stage('noise.mat'):
+        J = buildJ(kappa)
+    if factor == 'eig':
+        with prof.stage('eig'):
+            lam, U = _eigenJ(dates, dateFormat, kappa, fs, cache, state=state)
+            At, Lt = U.T @ A, U.T @ L
+        wlse = lambda wna, fna: ls._lseEig(At, Lt, lam, wna, fna, A, L)
+    elif memLimit is None:
+        wlse = lambda wna, fna: ls._lse(A, L, la.cholesky(la.inv(_cov(J, wna, fna))).T)
+    else:
+        work = np.empty((nObs, nObs), dtype=float)
+        wlse = lambda wna, fna: ls._lseChol(A, L, _cov(J, wna, fna, out=work))
+
+    if method == 'mle':
+        with prof.stage('finalSolve'):
+            unk_fin, sUnk_fin, s0_fin, _ = wlse(model.wna, model.fna)
+        res.unk, res.sUnk, res.s0 = unk_fin, sUnk_fin, s0_fin
+        res.wna, res.fna          = float(model.wna), float(model.fna)
+        if update:
+            _saveState(statePath, _newState(A, L, dates, J, res.wna, res.fna, kappa, fs), verbose)
+        return res
+
+    import matplotlib.pylab as plt
+    from scipy.interpolate import griddata
+    from .searchSpace import searchSpace as ss, _refineContour, _pointsAround
+
+    if approx is not None:
+        # probes at the corners and the centre of the search space
+        extWNAs, extFNAs, _ = ss(alpha, WRMS, dof, nRND)._extremePoints()
+        wnaLim = [min(extWNAs[extWNAs > 0]), max(extWNAs)]
+        fnaLim = [min(extFNAs[extFNAs > 0]), max(extFNAs)]
+        probes = [(w, f) for w in wnaLim for f in fnaLim] + [(np.mean(wnaLim), np.mean(fnaLim))]
+        with prof.stage('approx'):
+            Jvec, dt = noise(dates, dateFormat, kappa, fs)._kernel()
+            model    = approxNoise(approx, Jvec, dt, J)
+            size, error = model._fit(A, L, probes, approxTol)
+        if verbose:
+            print(" Approximate noise model : %s (size %d, relative error %.2e)\n" % (model.method, size, error))
+        wlse = lambda wna, fna: model._lse(A, L, wna, fna)
+        res.approx = (model.method, size, error)
+
+    resultTemp = np.zeros((nRND**2,3))
+    wnaLast = np.zeros((repeat,1),dtype=float)
+    fnaLast = np.zeros((repeat,1),dtype=float)
+    nSolves = 0
+    nUsed   = 0
+    history = []
+    rng     = np.random.RandomState(0)   # bootstrap draws, the search space keeps np.random
+    if ck is not None:
+        nUsed = int(ck['nUsed'])
+        wnaLast[:nUsed,0], fnaLast[:nUsed,0] = ck['wnaLast'], ck['fnaLast']
+        nSolves = int(ck['nSolves'])
+        history = [list(h) for h in ck['history']]
+        np.random.set_state(_getRandomState(ck, 'np'))
+        rng.set_state(_getRandomState(ck, 'rng'))
+    with prof.hot(ts.filename.split(".")[0] if ts.filename else 'gcts'):
+        for i in range(nUsed, repeat):
+            with prof.repeat(i+1):
+                if verbose:
+                    printProgressBar(i+1, repeat, prefix=' Progress', suffix='Complete')
+                with prof.stage('searchSpace'):
+                    if centre is None:
+                        _, yWNA, _, yFNA = ss(alpha, WRMS, dof, nRND)._randomPoints()
+                    else:
+                        yWNA, yFNA = _pointsAround(*centre, nRND)
+
+                if sampler == 'grid':
+                    idx = 0
+                    with prof.stage('gridSolves'):
+                        for j in range(nRND):
+                            for k in range(nRND):
+                                _, _, s0, _ = wlse(yWNA[j], yFNA[k])
+                                resultTemp[idx,:] = [yWNA[j][0], yFNA[k][0], s0]
+                                idx += 1
+                    #np.savetxt('15-s0s.dat', resultTemp, fmt="%10.10f")
+                    with prof.stage('griddata'):
+                        xx     = np.arange(min(resultTemp[:,0]), max(resultTemp[:,0]), incr)
+                        yy     = np.arange(min(resultTemp[:,1]), max(resultTemp[:,1]), incr)
+                        XX, YY = np.meshgrid(xx, yy)
+                        ZZ     = griddata((resultTemp[:,0],resultTemp[:,1]), resultTemp[:,2], (XX, YY), method='cubic')
+                    with prof.stage('contour'):
+                        if (np.min(np.ma.masked_invalid(ZZ)) < 1) and (np.max(np.ma.masked_invalid(ZZ)) > 1):
+                            cs     = plt.contour(xx, yy, np.ma.masked_invalid(ZZ), [1])
+                            L1     = cs.collections[0].get_paths()[0]
+                            coorL1 = L1.vertices
+                            plt.close(cs.axes.figure)    # the worker evaluates many series
+                        else:
+                            index  = np.where(abs(np.ma.masked_invalid(ZZ) - 1) == np.amin(abs(np.ma.masked_invalid(ZZ) - 1)))
+                            coorL1 = np.array([[XX[index[0][0],index[1][0]], \
+                                                YY[index[0][0],index[1][0]]]])
+                    nSolves += nRND**2
+                else:
+                    with prof.stage('adaptive'):
+                        coorL1, nNodes = _refineContour(lambda w, f: wlse(w, f)[2], yWNA, yFNA, tol)
+                    nSolves += nNodes
+                s0 = np.zeros((len(coorL1[:,0]),1),dtype=float)
+                with prof.stage('contourSolves'):
+                    for d in range(len(coorL1[:,0])):
+                        _, _, s0[d], _ = wlse(coorL1[d,0], coorL1[d,1])
+
+                nSolves += len(coorL1[:,0])
+                diffIDX = np.where(abs(s0 - 1) == np.amin(abs(s0 - 1)))[0][0]
+                wnaLast[i] = coorL1[diffIDX,0]
+                fnaLast[i] = coorL1[diffIDX,1]
+                nUsed = i + 1
+                if converge is not None:
+                    history.append(_runningStats(wnaLast[:nUsed,0], fnaLast[:nUsed,0], rng))
+                    if _converged(history, converge, window):
+                        break
+                if checkpoint and nUsed % checkpoint == 0 and nUsed < repeat:
+                    with prof.stage('checkpoint'):
+                        _saveCheckpoint(ckPath, ckKey, cache,
+                                        _fingerprint(dates, dateFormat, kappa, fs), factor,
+                                        {'nUsed': nUsed, 'wnaLast': wnaLast[:nUsed,0],
+                                         'fnaLast': fnaLast[:nUsed,0], 'nSolves': nSolves,
+                                         'history': np.reshape(history, (-1, 4)),
+                                         **_randomState(np.random.get_state(), 'np'),
+                                         **_randomState(rng.get_state(), 'rng')})
+    if nUsed < repeat:
+        wnaLast, fnaLast = wnaLast[:nUsed], fnaLast[:nUsed]
+        if verbose:
+            print()
+
+    wna = float(np.asarray(statistics.median(wnaLast)).reshape(-1)[0])
+    fna = float(np.asarray(statistics.median(fnaLast)).reshape(-1)[0])
+    with prof.stage('finalSolve'):
+        unk_fin, sUnk_fin, s0_fin, _ = wlse(wna, fna)
+
+    res.unk, res.sUnk, res.s0 = unk_fin, sUnk_fin, s0_fin
+    res.wna, res.fna          = wna, fna
+    res.wnaLast, res.fnaLast  = wnaLast, fnaLast
+    res.nSolves               = nSolves
+    res.repeats               = nUsed
+    if sampler == 'adaptive' and verbose:
+        print(" Weighted solves : %d" % nSolves)
+    if converge is not None and verbose:
+        print(" Repeats used : %d of %d" % (nUsed, repeat))
+    if update:
+        _saveState(statePath, _newState(A, L, dates, J, wna, fna, kappa, fs), verbose)
+    if ckPath is not None:
+        _removeCheckpoint(ckPath)
+    return res
+
+
+def evaluateAll(tses, workers=1, seed=None, threads=None, Jcache=None, prof=None, verbose=False,
+                **kwargs):
+    # tses    - [?].tse file names or series, each of one component or of all
+    #           components, whose east, north and up are then evaluated in turn
+    # workers - number of processes evaluating the series concurrently, or
+    #           'auto' for the number planned from the length of the series and
+    #           the cores and memory available, see scheduler.py
+    # threads - BLAS threads of each process, the cores shared by the
+    #           processes (or as planned for 'auto') if None
+    # kwargs  - the estimation parameters of evaluate
+    # The series are grouped by their epochs (e.g. the components of a site, or
+    # the sites of a campaign occupied on the same days). J and its
+    # eigendecomposition are built once per group, and the weighted solutions
+    # are made in the eigenbasis of J (the Cholesky factorization is kept with
+    # memLimit or approx). The series are evaluated group by group, or by
+    # processes forked after the decompositions of all groups are built, so
+    # that they inherit them. With a seed the i-th series is seeded by seed + i
+    # in both cases. The stages profiled by the processes are added to prof.
+    # returns the results of evaluate in the order of the series
+    series = []
+    for tse in tses:
+        series += _components(_series(tse))
+    factor = 'chol' if kwargs.get('memLimit') is not None or kwargs.get('approx') is not None else 'eig'
+    seeds  = [None if seed is None else seed + i for i in range(len(series))]
+    groups = _groups(series, kwargs.get('kappa', -1), kwargs.get('fs', 365.25))
+    prof   = prof if prof is not None else profiler()
+    if verbose and len(series) > 1:
+        print(" %d series in %d groups of epochs\n" % (len(series), len(groups)))
+
+    import multiprocessing
+    from . import scheduler as sch
+    if workers == 'auto':
+        workers, planned = sch._plan(max(len(ts.obs) for ts in series), len(series))
+    else:
+        workers = max(1, min(workers, len(series)))
+        planned = max(1, sch._cores() // workers)
+    threads = threads if threads is not None else planned
+    results = [None] * len(series)
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        # only the decomposition of the current group is kept
+        Jcache = Jcache if Jcache is not None else matCache(2)
+        with sch._limitThreads(threads):
+            for idx in groups.values():
+                for i in idx:
+                    results[i] = evaluate(series[i], seed=seeds[i], factor=factor, Jcache=Jcache,
+                                          prof=prof, verbose=verbose, **kwargs)
+        return results
+
+    Jcache = Jcache if Jcache is not None else matCache(2 * len(groups))
+    if not kwargs.get('ols', False):
+        with prof.stage('shared'):
+            kappa, fs = kwargs.get('kappa', -1), kwargs.get('fs', 365.25)
+            for idx in groups.values():
+                ts = series[idx[0]]
+                if factor == 'eig':
+                    _eigenJ(ts.dates, ts._label('DATE FORMAT'), kappa, fs, Jcache)
+                else:
+                    memLimit = kwargs.get('memLimit')
+                    _buildJ(ts.dates, ts._label('DATE FORMAT'), kappa, fs, Jcache,
+                            None if memLimit is None else memLimit * 2**20)
+    if verbose:
+        print(" %d series are evaluated by %d processes with %d BLAS thread(s) each\n" % \
+              (len(series), workers, threads))
+    global _shared
+    _shared = (series, seeds, factor, threads, Jcache, prof, kwargs)
+    with multiprocessing.get_context('fork').Pool(workers) as pool:
+        order = [i for idx in groups.values() for i in idx]
+        for i, (res, records) in zip(order, pool.map(_evaluateShared, order)):
+            results[i] = res
+            prof._merge(records)
+    _shared = None
+    return results
+
+
+def kappaSweep(tse, kappas, workers=1, threads=None, Jcache=None, prof=None, verbose=False,
+               **kwargs):
+    # tse     - [?](comp).tse file name or tseFile.series of one component
+    # kappas  - spectral indices evaluated, e.g. np.arange(-2, 0.01, 0.1)
+    # kwargs  - the estimation parameters of evaluate
+    # The maximum likelihood amplitudes of each kappa are estimated, and the
+    # kappa of the largest likelihood is the best one. (The search of the
+    # amplitudes giving s0 = 1 reaches s0 = 1 for any kappa, so s0 does not
+    # tell the kappas apart.) The kernels of all kappas come from one
+    # recurrence (noise._kernels). J of each kappa and its eigendecomposition
+    # are built and kept in Jcache by the evaluation of the kappa, which runs
+    # in one of the workers processes.
+    # returns the results of evaluate of each kappa, the index of the best one
+    # and the (kappa, wna, fna, logL) table
+    from .noise import _kernels
+    if kwargs.get('ols') or kwargs.get('estKappa') or kwargs.get('update'):
+        raise ValueError("The kappa sweep can not be used with ols, estKappa or update!")
+    if kwargs.get('memLimit') is not None:
+        # the kernel matrices and J of the kappas are built in full
+        raise ValueError("The kappa sweep can not be used with a memory limit!")
+    if kwargs.get('method', 'mle') != 'mle':
+        raise ValueError("The kappa sweep compares the maximum likelihood of the kappas, "
+                         "it can not be used with the search method!")
+    prof   = prof if prof is not None else profiler()
+    ts     = _series(tse)
+    if ts._label('COMPONENT') == 'all':
+        raise ValueError("The kappa sweep needs a series of one component!")
+    kappas = [float(k) for k in kappas]
+    fs     = kwargs.pop('fs', 365.25)
+    kwargs.pop('kappa', None)
+    kwargs['method'] = 'mle'
+    with prof.stage('kernels'):
+        Jvecs, dts = _kernels(ts.dates, ts._label('DATE FORMAT'), kappas, fs)
+
+    import multiprocessing
+    from . import scheduler as sch
+    if workers == 'auto':
+        workers, planned = sch._plan(len(ts.obs), len(kappas))
+    else:
+        workers = max(1, min(workers, len(kappas)))
+        planned = max(1, sch._cores() // workers)
+    threads = threads if threads is not None else planned
+    if verbose:
+        print(" %d kappas are evaluated by %d process(es) with %d BLAS thread(s) each\n" % \
+              (len(kappas), workers, threads))
+    global _shared
+    _shared = (ts, kappas, Jvecs, dts, fs, threads, Jcache, prof, kwargs)
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        outs = [_sweepShared(i) for i in range(len(kappas))]
+    else:
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            outs = pool.map(_sweepShared, range(len(kappas)))
+    _shared = None
+    results = []
+    for res, records in outs:
+        results.append(res)
+        prof._merge(records)
+
+    scores = [res.logLik for res in results]
+    best   = int(np.argmax(scores))
+    table  = [(k, res.wna, res.fna, sc) for k, res, sc in zip(kappas, results, scores)]
+    return result(kappas=kappas, results=results, best=best, table=table)
+
+
+def _sweepShared(i):
+    # evaluates the i-th kappa of kappaSweep with J built from its kernel
+    from . import scheduler as sch
+    from .noise import _kernelMat
+    ts, kappas, Jvecs, dts, fs, threads, Jcache, prof, kwargs = _shared
+    cache = Jcache if Jcache is not None else matCache(2)
+    prof  = prof._child()
+    with sch._limitThreads(threads):
+        with prof.stage('kernelMat'):
+            cache._get(_fingerprint(ts.dates, ts._label('DATE FORMAT'), kappas[i], fs),
+                       lambda: _kernelMat(Jvecs[i], dts[i])[1])
+        res = evaluate(ts, kappa=kappas[i], fs=fs, factor='eig', Jcache=cache, prof=prof, **kwargs)
+    return res, prof._records()
+
+
+def _groups(series, kappa, fs):
+    # indices of the series grouped by the fingerprint of their J
+    groups = OrderedDict()
+    for i, ts in enumerate(series):
+        groups.setdefault(_fingerprint(ts.dates, ts._label('DATE FORMAT'), kappa, fs), []).append(i)
+    return groups
+
+
+def _evaluateShared(i):
+    # evaluates the i-th series of evaluateAll in a forked process
+    from . import scheduler as sch
+    series, seeds, factor, threads, Jcache, prof, kwargs = _shared
+    if seeds[i] is None:
+        np.random.seed()    # the forked processes would draw the same points
+    prof = prof._child()
+    with sch._limitThreads(threads):
+        res = evaluate(series[i], seed=seeds[i], factor=factor, Jcache=Jcache, prof=prof, **kwargs)
+    return res, prof._records()
+
+
+def _buildJ(dates, dateFormat, kappa, fs, cache, memLimit=None, state=None):
+    # J of the epochs from the cache, memLimit in bytes
+    from .noise import noise, _extendJ
+    if state is not None and kappa == float(state['kappa']):
+        # only the rows and columns of the appended epochs are new
+        build = lambda: _extendJ(state['J'], *noise(dates, dateFormat, kappa, fs)._kernel())
+    elif memLimit is None:
+        build = lambda: noise(dates, dateFormat, kappa, fs).mat()[1]
+    else:
+        nObs  = len(dates[:,0])
+        build = lambda: noise(dates, dateFormat, kappa, fs).mat(memLimit - nObs**2 * 8)[1]
+    return cache._get(_fingerprint(dates, dateFormat, kappa, fs), build)
+
+
+def _eigenJ(dates, dateFormat, kappa, fs, cache, state=None):
+    # eigenvalues and eigenvectors of J of the epochs from the cache
+    from .noise import _eigJ
+    return cache._get(_fingerprint(dates, dateFormat, kappa, fs) + ('eig',),
+                      lambda: _eigJ(_buildJ(dates, dateFormat, kappa, fs, cache, state=state)))
+
+
+def _runningStats(wnas, fnas, rng, nBoot=200):
+    # medians of the amplitudes of the repeats so far and the bootstrap
+    # spread (standard deviation) of the medians
+    stats = []
+    for x in [wnas, fnas]:
+        idx = rng.randint(0, len(x), (nBoot, len(x)))
+        stats += [np.median(x), np.std(np.median(x[idx], axis=1))]
+    return stats
+
+
+def _converged(history, tol, window):
+    # the medians and their spreads have changed by less than tol (relative
+    # to the medians) over the last window repeats, after at least 2*window
+    # repeats
+    if len(history) < 2 * window:
+        return False
+    recent = np.asarray(history[-(window+1):])
+    scale  = np.abs(recent[-1, [0, 0, 2, 2]])
+    change = np.ptp(recent, axis=0)
+    return bool(np.all(change <= tol * scale))
+
+
+def _writeModel(res, verbose=False):
+    # writes the model values of an evaluation into [?]_model.tse file
+    header = list(res.series.header)
+    for ii in range(len(header)):
+        if 'COMMENT' and 'outliers' in header[ii]:
+            header[ii] = "* COMMENT      : Model values" + "\n"
+            break
+    res.modelFilename = (res.filename.split(".")[0] + "_model.tse")
+    tf._write(res.modelFilename, \
+             header, \
+             np.concatenate(((res.A @ res.unk), np.zeros((len(res.A[:,0]),1), dtype=float)), axis=1), \
+             res.series.dates, verbose=verbose)
+    return res.modelFilename
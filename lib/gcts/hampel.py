@@ -0,0 +1,64 @@
+from bisect import bisect_left, insort
+import numpy as np
+
+# Rolling median and median absolute deviation (MAD) of the Hampel filter.
+# The window (window // 2 epochs on both sides of each epoch, cut at the ends
+# of the series) is kept as a sorted list, which is updated when the window
+# slides by one epoch instead of being sorted again. The positions are found by
+# bisection, and the insertion and the deletion shift the tail of the list. A
+# tree or skiplist would avoid the shift, but its steps run in Python, and the
+# shift (a memmove) is still the faster of the two for windows of 10001 epochs.
+# Around the median m of the sorted window S, the absolute deviations are the
+# two sorted sequences
+#
+#   m - S[p-1], m - S[p-2], ..., m - S[0]   and   S[p] - m, S[p+1] - m, ...
+#
+# with p = bisect_left(S, m), so that their median (the MAD) is selected by a
+# binary search over the two sequences without forming them.
+
+
+def _kth(S, p, m, k):
+    # k-th (0-based) smallest absolute deviation from m of the sorted window S
+    na, nb = p, len(S) - p
+    lo, hi = max(0, k + 1 - nb), min(k + 1, na)
+    while lo < hi:
+        i = (lo + hi) // 2
+        if m - S[p-1-i] < S[p+k-i] - m:
+            lo = i + 1
+        else:
+            hi = i
+    j = k + 1 - lo
+    a = m - S[p-lo] if lo > 0 else -np.inf
+    b = S[p+j-1] - m if j > 0 else -np.inf
+    return max(a, b)
+
+
+def _rolling(x, window):
+    # x      - values in the order of the epochs
+    # window - number of epochs of the window
+    # returns the rolling median and MAD (not scaled) of each epoch
+    x = np.asarray(x, dtype=float).reshape(-1)
+    n, half = len(x), window // 2
+    med = np.empty(n)
+    mad = np.empty(n)
+    S   = sorted(x[:min(half, n)].tolist())
+    values = x.tolist()
+    for i in range(n):
+        if i + half < n:
+            insort(S, values[i+half])
+        if i - half - 1 >= 0:
+            del S[bisect_left(S, values[i-half-1])]
+        w = len(S)
+        h = w // 2
+        m = S[h] if w % 2 else 0.5 * (S[h-1] + S[h])
+        p = bisect_left(S, m)
+        med[i] = m
+        mad[i] = _kth(S, p, m, h) if w % 2 else 0.5 * (_kth(S, p, m, h-1) + _kth(S, p, m, h))
+    return med, mad
+
+
+def _hampel(x, window, scale):
+    # True for the values within scale times the normalized MAD of the rolling median
+    med, mad = _rolling(x, window)
+    x = np.asarray(x, dtype=float).reshape(-1)
+    return np.abs(x - med) <= scale * 1.4826 * mad
@@ -0,0 +1,56 @@
+import numpy as np
+from . import tseFile as tf
+from .common import result
+from .conversion import convert
+from .outliers import clean
+from .evaluation import evaluate, evaluateAll
+
+# The jobs of the gctsWorker.py process and their results as JSON.
+
+
+def _runJob(job, Jcache=None, cache=None):
+    # runs one job of the worker, e.g.
+    #   {"id": 1, "job": "evaluate", "args": {"tse": "TESTeast.tse", "nRND": 30, "repeat": 100}}
+    # and returns its response with either the result or the error message
+    response = {'id': job.get('id'), 'ok': True}
+    try:
+        kind = job.get('job')
+        args = job.get('args', {})
+        if kind == 'convert':
+            out = convert(**args)
+        elif kind == 'clean':
+            out = clean(**args)
+        elif kind == 'evaluate':
+            out = evaluate(Jcache=Jcache, cache=cache, **args)
+        elif kind == 'evaluateAll':
+            out = evaluateAll(Jcache=Jcache, cache=cache, **args)
+        elif kind == 'ping':
+            out = 'pong'
+        else:
+            raise ValueError("Unknown job: " + str(kind))
+        response['result'] = _jsonable(out)
+    except (ValueError, TypeError, OSError, ArithmeticError) as err:
+        response['ok']    = False
+        response['error'] = str(err)
+    except Exception as err:
+        # e.g. a malformed file, the worker keeps serving the next jobs
+        response['ok']    = False
+        response['error'] = "%s: %s" % (type(err).__name__, err)
+    return response
+
+
+def _jsonable(obj):
+    # results of the jobs as plain lists and dictionaries
+    if isinstance(obj, result):
+        return {k: _jsonable(v) for k, v in obj.__dict__.items() if k not in ['A', 'screen']}
+    if isinstance(obj, tf.series):
+        return {'filename': obj.filename, 'component': obj.component, 'nObs': len(obj.obs)}
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
@@ -0,0 +1,202 @@
+import scipy.linalg as la
+import numpy as np
+
+
+def _lse(A, L, p = None):
+    # A - coefficient matrix
+    # L - observation vector
+    # p - lower triangular weight matrix
+
+    if p is not None:
+        # solve the equation with any weight matrix
+        Anew = la.blas.dgemm(1, p.T, A)        
+        Lnew = la.blas.dgemv(1, p.T, L).reshape(len(L),1)  
+        nEq  = la.blas.dgemm(1, Anew.T, Anew)
+        rhs  = la.blas.dgemv(1, Anew.T, Lnew).reshape(len(Anew.T),1)        
+        _,_, X,_ = la.lapack.dgesv(nEq, rhs)
+        resid    = np.subtract((A @ X).reshape(len(A@X),1), L.reshape(len(L),1))
+        residNew = la.blas.dgemv(1, p.T, resid).reshape(len(resid),1)
+        f        = len(Anew[:,0]) - len(Anew[0,:])
+        #s0       = np.sqrt(la.blas.ddot(residNew, residNew) / f)
+        s0       = np.sqrt(np.sum(residNew**2) / f)
+        Qx       = la.inv(nEq)
+        sX       = np.zeros(len(Qx[:,0]), dtype='float')
+        for i in range(len(Qx[:,0])):
+            sX[i] = s0 * np.sqrt(Qx[i,i])
+    else:
+        # solve the equation without any weight matrix
+        nEq = la.blas.dgemm(1, A.T, A)
+        rhs = la.blas.dgemv(1, A.T, L)
+        _,_, X,_ = la.lapack.dgesv(nEq, rhs)
+        resid    = np.subtract((A @ X).reshape(len(A@X),1), L.reshape(len(L),1))
+        f        = len(A[:,0]) - len(A[0,:])
+        #s0       = np.sqrt(la.blas.ddot(resid, resid) / f)
+        s0       = np.sqrt(np.sum(resid**2) / f)
+        Qx       = la.inv(nEq)
+        sX       = np.zeros(len(Qx[:,0]), dtype='float')
+        for i in range(len(Qx[:,0])):
+            sX[i] = s0 * np.sqrt(Qx[i,i])
+
+    return X, sX, s0, resid
+
+def _lseChol(A, L, C):
+    # A - coefficient matrix
+    # L - observation vector
+    # C - covariance matrix, overwritten by its Cholesky factor. The system
+    #     is whitened by solving with the factor instead of inverting C, so
+    #     no further n x n matrices are allocated.
+    Lc, info = la.lapack.dpotrf(C.T, lower=1, clean=0, overwrite_a=1)
+    if info != 0:
+        raise la.LinAlgError("covariance matrix is not positive definite")
+    Anew, _  = la.lapack.dtrtrs(Lc, A, lower=1)
+    Lnew, _  = la.lapack.dtrtrs(Lc, L.reshape(len(L),1), lower=1)
+    nEq  = la.blas.dgemm(1, Anew.T, Anew)
+    rhs  = la.blas.dgemm(1, Anew.T, Lnew)
+    _,_, X,_ = la.lapack.dgesv(nEq, rhs)
+    resid    = np.subtract((A @ X).reshape(len(A@X),1), L.reshape(len(L),1))
+    residNew = np.subtract((Anew @ X).reshape(len(Anew@X),1), Lnew)
+    f        = len(Anew[:,0]) - len(Anew[0,:])
+    s0       = np.sqrt(np.sum(residNew**2) / f)
+    Qx       = la.inv(nEq)
+    sX       = s0 * np.sqrt(np.diag(Qx))
+
+    return X, sX, s0, resid
+
+
+def _lseWoodbury(A, L, d, V):
+    # A - coefficient matrix
+    # L - observation vector
+    # d - diagonal part and V - low-rank factor of the covariance C = diag(d) + V V'.
+    #     C^-1 is applied with the Woodbury identity in O(n*r^2).
+    L   = L.reshape(len(L),1)
+    d   = np.asarray(d, dtype=float).reshape(len(L),1)
+    Vd  = V / d
+    cM  = la.cho_factor(np.eye(len(V[0,:])) + V.T @ Vd)
+    VA  = Vd.T @ A
+    VL  = Vd.T @ L
+    nEq = A.T @ (A / d) - VA.T @ la.cho_solve(cM, VA)
+    rhs = A.T @ (L / d) - VA.T @ la.cho_solve(cM, VL)
+    _,_, X,_ = la.lapack.dgesv(nEq, rhs)
+    resid    = np.subtract((A @ X).reshape(len(A@X),1), L)
+    VR       = Vd.T @ resid
+    f        = len(A[:,0]) - len(A[0,:])
+    s0       = np.sqrt((np.sum(resid**2 / d) - (VR.T @ la.cho_solve(cM, VR))[0,0]) / f)
+    Qx       = la.inv(nEq)
+    sX       = s0 * np.sqrt(np.diag(Qx))
+
+    return X, sX, s0, resid
+
+
+def _lseBanded(A, L, Cb):
+    # A  - coefficient matrix
+    # L  - observation vector
+    # Cb - banded covariance matrix in lower banded storage, Cb[d, i] = C[i+d, i]
+    L   = L.reshape(len(L),1)
+    cb  = la.cholesky_banded(Cb, lower=True)
+    CiA = la.cho_solve_banded((cb, True), A)
+    CiL = la.cho_solve_banded((cb, True), L)
+    nEq = A.T @ CiA
+    rhs = A.T @ CiL
+    _,_, X,_ = la.lapack.dgesv(nEq, rhs)
+    resid    = np.subtract((A @ X).reshape(len(A@X),1), L)
+    f        = len(A[:,0]) - len(A[0,:])
+    s0       = np.sqrt((resid.T @ (CiA @ X - CiL))[0,0] / f)
+    Qx       = la.inv(nEq)
+    sX       = s0 * np.sqrt(np.diag(Qx))
+
+    return X, sX, s0, resid
+
+
+def _cholAppend(Lc, C21, C22):
+    # Lc  - lower Cholesky factor of C11
+    # C21 - covariances of the appended rows with the old ones
+    # C22 - covariance matrix of the appended rows
+    # returns the lower Cholesky factor of [[C11, C21'], [C21, C22]] in
+    # O(m*n^2) for m appended rows instead of O((n+m)^3)
+    n, m = len(Lc), len(C22)
+    L21  = la.solve_triangular(Lc, C21.T, lower=True).T
+    L22  = la.cholesky(C22 - L21 @ L21.T, lower=True)
+    Lnew = np.zeros((n+m, n+m), dtype=float)
+    Lnew[:n,:n] = Lc
+    Lnew[n:,:n] = L21
+    Lnew[n:,n:] = L22
+    return Lnew
+
+
+def _whitenAppend(Lc, X, W1):
+    # whitened rows Lc^-1 X of the appended block, where W1 are the whitened
+    # rows of the old block
+    n = len(W1)
+    return la.solve_triangular(Lc[n:,n:], X[n:] - Lc[n:,:n] @ W1, lower=True)
+
+
+def _lseNormal(nEq, rhs, ll, f):
+    # nEq - normal equations of the whitened system
+    # rhs - right-hand side of the normal equations
+    # ll  - squared norm of the whitened observations
+    # f   - degrees of freedom
+    _,_, X,_ = la.lapack.dgesv(nEq, rhs)
+    s0       = np.sqrt(max(ll - (rhs.T @ X)[0,0], 0) / f)
+    Qx       = la.inv(nEq)
+    sX       = s0 * np.sqrt(np.diag(Qx))
+
+    return X, sX, s0
+
+
+def _lseEig(At, Lt, lam, wna, fna, A, L):
+    # At, Lt - coefficient matrix and observation vector rotated into the
+    #          eigenbasis of J = U diag(lam) U', i.e. U'A and U'L
+    # C = wna^2 * I + fna^2 * J is diagonal in that basis, so the solution
+    # costs O(n*u^2) once the decomposition, shared by the series with the
+    # same epochs, is known
+    d   = wna**2 + fna**2 * lam
+    Aw  = At / d.reshape(len(d),1)
+    nEq = la.blas.dgemm(1, At.T, Aw)
+    rhs = la.blas.dgemm(1, Aw.T, Lt)
+    _,_, X,_ = la.lapack.dgesv(nEq, rhs)
+    resid    = np.subtract((A @ X).reshape(len(A@X),1), L.reshape(len(L),1))
+    residNew = np.subtract(Lt, At @ X)
+    f        = len(At[:,0]) - len(At[0,:])
+    s0       = np.sqrt(np.sum(residNew**2 / d.reshape(len(d),1)) / f)
+    Qx       = la.inv(nEq)
+    sX       = s0 * np.sqrt(np.diag(Qx))
+
+    return X, sX, s0, resid
+
+
+def _irls(A, L, method='huber', maxIter=50, tol=1e-8):
+    # robust solution by iteratively reweighted least squares
+    # method - 'huber' (c = 1.345) or 'tukey' biweight (c = 4.685), the latter
+    #          starting from the huber solution as it may reject all epochs
+    #          from a poor start
+    # returns the unknowns, the residuals (AX - L), the robust scale of the
+    # residuals (normalized MAD), the final weights and the number of iterations
+    L = np.asarray(L, dtype=float).reshape(len(L),1)
+    if method == 'tukey':
+        X, _, _, _, nIter0 = _irls(A, L, 'huber', maxIter, tol)
+    elif method == 'huber':
+        X, _, _, _ = _lse(A, L[:,0])
+        X, nIter0  = X.reshape(-1,1), 0
+    else:
+        raise ValueError("Please check your robust method!")
+    c = {'huber': 1.345, 'tukey': 4.685}[method]
+    w = np.ones(len(L))
+    for nIter in range(1, maxIter+1):
+        resid = A @ X - L
+        sigma = 1.4826 * np.median(np.abs(resid - np.median(resid)))
+        if sigma == 0:
+            break
+        u = np.abs(resid[:,0]) / (c * sigma)
+        if method == 'huber':
+            w = np.minimum(1, 1 / np.maximum(u, 1e-12))
+        else:
+            w = np.where(u < 1, (1 - u**2)**2, 0)
+        Aw = A * w.reshape(-1,1)
+        _,_, Xnew,_ = la.lapack.dgesv(Aw.T @ A, Aw.T @ L)
+        done = np.max(np.abs(Xnew - X)) <= tol * (1 + np.max(np.abs(X)))
+        X = Xnew
+        if done:
+            break
+    resid = A @ X - L
+    sigma = 1.4826 * np.median(np.abs(resid - np.median(resid)))
+    return X, resid, sigma, w, nIter0 + nIter
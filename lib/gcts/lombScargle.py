@@ -0,0 +1,90 @@
+import math
+import numpy as np
+
+# Generalized Lomb-Scargle periodogram (Zechmeister and Kurster, 2009) of
+# unevenly sampled series, i.e. the weighted fit of a sinusoid plus a mean
+# at each trial frequency. The power only needs the weighted sums of
+# cos(wt), sin(wt), cos(2wt), sin(2wt), y*cos(wt) and y*sin(wt), which are
+# computed either directly ('exact', O(n*nFreq) in chunks of frequencies) or
+# on a regular frequency grid by extirpolating the epochs onto a regular time
+# grid and one FFT ('fast', O(n + nFreq*log(nFreq)), Press and Rybicki, 1989).
+
+
+def _gls(t, y, dy, f0, df, nFreq, method='fast', oversampling=5, Mfft=4):
+    # t, y, dy - epochs (days), observations and their sigmas
+    # returns the normalized power (0 to 1) at the frequencies f0 + df*k (1/day)
+    w  = 1 / dy**2
+    w  = w / np.sum(w)
+    Y  = np.dot(w, y)
+    YY = np.dot(w, y**2) - Y**2
+    if method == 'fast':
+        Sh, Ch = _trigSums(t, w * (y - Y), df, nFreq, f0, 1, oversampling, Mfft)
+        S,  C  = _trigSums(t, w, df, nFreq, f0, 1, oversampling, Mfft)
+        S2, C2 = _trigSums(t, w, df, nFreq, f0, 2, oversampling, Mfft)
+    elif method == 'exact':
+        f = f0 + df * np.arange(nFreq)
+        Sh, Ch, S, C, S2, C2 = [np.empty(nFreq) for _ in range(6)]
+        for i in range(0, nFreq, 1000):
+            wt = 2 * np.pi * f[i:i+1000].reshape(-1,1) * t
+            cos, sin = np.cos(wt), np.sin(wt)
+            Ch[i:i+1000], Sh[i:i+1000] = cos @ (w * (y - Y)), sin @ (w * (y - Y))
+            C[i:i+1000],  S[i:i+1000]  = cos @ w, sin @ w
+            C2[i:i+1000], S2[i:i+1000] = np.cos(2*wt) @ w, np.sin(2*wt) @ w
+    else:
+        raise ValueError("Please check your periodogram method!")
+
+    CC = 0.5 * (1 + C2) - C**2
+    SS = 0.5 * (1 - C2) - S**2
+    CS = 0.5 * S2 - C * S
+    D  = CC * SS - CS**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        power = (SS * Ch**2 + CC * Sh**2 - 2 * CS * Ch * Sh) / (YY * D)
+    return np.clip(np.nan_to_num(power), 0, 1)
+
+
+def _trigSums(t, h, df, N, f0=0, freqFactor=1, oversampling=5, Mfft=4):
+    # sum(h*sin(2*pi*f*t)) and sum(h*cos(2*pi*f*t)) at f = freqFactor*(f0 + df*k)
+    df *= freqFactor
+    f0 *= freqFactor
+    Nfft = 1 << int(math.ceil(math.log2(N * oversampling)))
+    t0 = np.min(t)
+    if f0 > 0:
+        h = h * np.exp(2j * np.pi * f0 * (t - t0))
+    tnorm = ((t - t0) * Nfft * df) % Nfft
+    grid  = np.fft.ifft(_extirpolate(tnorm, h, Nfft, Mfft))[:N] * Nfft
+    if t0 != 0:
+        grid *= np.exp(2j * np.pi * t0 * (f0 + df * np.arange(N)))
+    return grid.imag, grid.real
+
+
+def _extirpolate(x, y, N, M=4):
+    # y at the real positions x spread onto the N integer positions, such that
+    # sum(y * g(x)) = sum(grid * g(range(N))) for the polynomials g of degree
+    # below M (Lagrange weights of the M nearest grid points)
+    y      = np.asarray(y)
+    result = np.zeros(N, dtype=np.result_type(y, float))
+    onGrid = (x % 1 == 0)
+    np.add.at(result, x[onGrid].astype(int), y[onGrid])
+    x, y = x[~onGrid], y[~onGrid]
+    ilo  = np.clip((x - M // 2).astype(int), 0, N - M)
+    numerator   = y * np.prod(x - ilo - np.arange(M).reshape(-1,1), 0)
+    denominator = float(math.factorial(M - 1))
+    for j in range(M):
+        if j > 0:
+            denominator *= j / (j - M)
+        ind = ilo + (M - 1 - j)
+        np.add.at(result, ind, numerator / (denominator * (x - ind)))
+    return result
+
+
+def _peaks(f, power, n, T, alpha, nPeaks):
+    # local maxima of the power whose false alarm probability is below alpha,
+    # strongest first, as (period, power, FAP); the number of independent
+    # frequencies is approximated by the time span T times the bandwidth
+    nInd = max(1.0, (f[-1] - f[0]) * T)
+    fap  = 1 - (1 - (1 - power)**((n - 3) / 2))**nInd
+    isMax = np.zeros(len(f), dtype=bool)
+    isMax[1:-1] = (power[1:-1] > power[:-2]) & (power[1:-1] >= power[2:])
+    idx = np.where(isMax & (fap < alpha))[0]
+    idx = idx[np.argsort(power[idx])[::-1]][:nPeaks]
+    return [(1 / f[i], float(power[i]), float(fap[i])) for i in idx]
@@ -0,0 +1,317 @@
+from .dateUtilities import date as du
+import numpy as np
+from scipy.special import gamma, factorial
+import scipy.linalg as la
+from . import leastSquares as ls
+
+class noise:
+    def __init__(self, dates, dateFormat, kappa, Fs):
+        self.dates      = dates
+        self.dateFormat = dateFormat
+        self.kappa      = kappa
+        self.Fs         = Fs
+
+    def mat(self, memLimit=None):
+        # memLimit - upper bound in bytes for J and its working blocks. If it is
+        #            given, J is built blockwise and T is not kept (returned as None)
+        Jvec, dt = self._kernel()
+        if memLimit is not None:
+            return None, _blockedJ(Jvec, dt, memLimit)
+
+        return _kernelMat(Jvec, dt)
+
+    def _kernel(self):
+        # Toeplitz kernel of the power-law noise and the scaling of each column
+        # of T by the time elapsed since the previous epoch
+        mjd    = _2mjd(self.dates, self.dateFormat)
+        t0     = mjd[0] - 1
+        newMJD = np.concatenate((t0, mjd), axis=None)
+        dt     = (np.diff(newMJD) / self.Fs) ** (-self.kappa / 4)
+
+        Jvec   = np.zeros(len(mjd), dtype='double')
+        for i in range(len(mjd)):
+            if i <= 150:
+                Jvec[i] = (gamma(i - (self.kappa / 2)) / (factorial(i) * gamma(-self.kappa / 2)))
+            else:
+                Jvec[i] = (i ** ((-self.kappa/2) - 1) / gamma(-self.kappa/2))
+        del i
+        return Jvec, dt
+
+
+def _kernelMat(Jvec, dt):
+    # T and J = T T' of a kernel
+    DT     = np.tile(dt, (len(Jvec),1))
+    T = np.multiply(DT, np.tril(la.toeplitz(Jvec)))      
+    J = la.blas.dgemm(1.0, T, T.T)
+    return T, J
+
+def _kernels(dates, dateFormat, kappas, Fs):
+    # kernels of several spectral indices (one row per kappa) as _kernel. The
+    # gamma ratios of the first 151 lags follow the recurrence
+    #   Jvec[i] = Jvec[i-1] * (i - 1 - kappa/2) / i,  Jvec[0] = 1
+    # which is one cumulative product for all kappas instead of two gamma
+    # functions per lag and kappa, and the later lags the same asymptote.
+    mjd    = np.asarray(_2mjd(dates, dateFormat), dtype=float).reshape(-1)
+    kappa  = np.asarray(kappas, dtype=float).reshape(-1,1)
+    n      = len(mjd)
+    dt     = (np.diff(np.concatenate((mjd[0] - 1, mjd), axis=None)) / Fs) ** (-kappa / 4)
+    Jvec   = np.ones((len(kappa), n), dtype='double')
+    i      = np.arange(1, min(n, 151), dtype=float)
+    Jvec[:,1:len(i)+1] = np.cumprod((i - 1 - kappa / 2) / i, axis=1)
+    if n > 151:
+        i = np.arange(151, n, dtype=float)
+        Jvec[:,151:] = i ** (-kappa / 2 - 1) / gamma(-kappa / 2)
+    return Jvec, dt
+
+def _blockSize(n, memLimit):
+    # the largest row block b for which J (n x n), two row panels of T (b x n)
+    # and one product block (b x b) fit into memLimit bytes
+    free = memLimit / 8 - n**2
+    if free < 2*n + 1:
+        raise ValueError("Memory limit is too small! J needs at least %.3f MB for %d epochs." % \
+                         ((n**2 + 2*n + 1) * 8 / 2**20, n))
+    b = int(-n + np.sqrt(n**2 + free))
+    return max(1, min(n, b))
+
+def _panelT(Jvec, dt, r0, r1):
+    # rows r0:r1 of T = DT * tril(toeplitz(Jvec)) over the columns 0:r1
+    row = np.zeros(r1, dtype='double')
+    row[:r0+1] = Jvec[r0::-1]
+    panel = la.toeplitz(Jvec[r0:r1], row)
+    np.multiply(panel, dt[:r1], out=panel)
+    return panel
+
+def _blockedJ(Jvec, dt, memLimit):
+    # J = T @ T.T built in row blocks without keeping T, DT or the full Toeplitz
+    n = len(Jvec)
+    b = _blockSize(n, memLimit)
+    J = np.empty((n, n), dtype='double')
+    for r0 in range(0, n, b):
+        r1 = min(r0 + b, n)
+        TR = _panelT(Jvec, dt, r0, r1)
+        for c0 in range(0, r1, b):
+            c1 = min(c0 + b, n)
+            TC = TR if c0 == r0 else _panelT(Jvec, dt, c0, c1)
+            blk = la.blas.dgemm(1.0, TR[:, :c1], TC[:, :c1], trans_b=1)
+            J[r0:r1, c0:c1] = blk
+            J[c0:c1, r0:r1] = blk.T
+            del TC, blk
+        del TR
+    return J
+
+
+def _extendJ(J, Jvec, dt):
+    # J of the series with appended epochs from J of the first len(J) epochs.
+    # Only the new rows of T and the new rows and columns of J are formed,
+    # i.e. O(m*n^2) for m new epochs.
+    n0, n = len(J), len(Jvec)
+    T11 = _panelT(Jvec, dt, 0, n0)
+    T2  = _panelT(Jvec, dt, n0, n)
+    Jn  = np.empty((n, n), dtype='double')
+    Jn[:n0,:n0] = J
+    Jn[n0:,:n0] = la.blas.dgemm(1.0, T2[:,:n0], T11, trans_b=1)
+    Jn[:n0,n0:] = Jn[n0:,:n0].T
+    Jn[n0:,n0:] = la.blas.dgemm(1.0, T2, T2, trans_b=1)
+    return Jn
+
+def _cov(J, wna, fna, out=None):
+    # C = wna^2 * I + fna^2 * J, written into out when a workspace is given
+    C = np.multiply(J, fna**2, out=out)
+    C.flat[::len(J)+1] += wna**2
+    return C
+
+
+class approxNoise:
+    # Approximation of the power-law covariance for long series. The weighted
+    # solutions run in O(n*r^2) with 'lowrank' (J ~ V V' + diag(D), Woodbury
+    # identity) or O(n*r^2) with 'truncated' (Toeplitz kernel cut after r lags,
+    # banded Cholesky), where r is the rank or the bandwidth, respectively.
+    def __init__(self, method, Jvec, dt, J):
+        self.method = method
+        self.Jvec   = Jvec
+        self.dt     = dt
+        self.J      = J
+        self.size   = None
+        self.error  = None
+
+    def _build(self, size):
+        if self.method == 'lowrank':
+            self.V, self.D = _lowRankJ(self.J, size)
+        elif self.method == 'truncated':
+            self.Jb = _bandJ(self.Jvec, self.dt, size)
+        else:
+            raise ValueError("Please check your approximation method!")
+        self.size = size
+
+    def _fit(self, A, L, probes, tol, size=10):
+        # doubles the rank/bandwidth until s0 and the sigma of the trend agree
+        # with the exact solution within the relative tolerance at every probe.
+        # Beyond n/4 the approximation is not cheaper, so the exact J is used.
+        n     = len(self.Jvec)
+        exact = [ls._lseChol(A, L, _cov(self.J, w, f)) for w, f in probes]
+        while size <= n // 4:
+            self._build(size)
+            self.error = 0
+            for (w, f), (_, sXe, s0e, _) in zip(probes, exact):
+                _, sXa, s0a, _ = self._lse(A, L, w, f)
+                self.error = max(self.error, abs(s0a - s0e) / s0e, abs(sXa[1] - sXe[1]) / sXe[1])
+            if self.error <= tol:
+                return self.size, self.error
+            size *= 2
+        self.method, self.size, self.error = 'exact', n, 0.0
+        return self.size, self.error
+
+    def _lse(self, A, L, wna, fna):
+        if self.method == 'lowrank':
+            return ls._lseWoodbury(A, L, wna**2 + fna**2 * self.D, fna * self.V)
+        elif self.method == 'truncated':
+            Cb     = fna**2 * self.Jb
+            Cb[0] += wna**2
+            return ls._lseBanded(A, L, Cb)
+        return ls._lseChol(A, L, _cov(self.J, wna, fna))
+
+
+class mleNoise:
+    # Gaussian log-likelihood of the observations for C = wna^2 * I + fna^2 * J
+    # with the parameters profiled out. J = U diag(lam) U' is decomposed once,
+    # so that every evaluation (and its gradient) costs O(n*u) in the
+    # eigenbasis instead of a factorization of C.
+    def __init__(self, A, L, J, scale, eig=None):
+        lam, U     = _eigJ(J) if eig is None else eig
+        self.lam   = lam
+        self.A     = la.blas.dgemm(1.0, U, A, trans_a=1)
+        self.L     = la.blas.dgemm(1.0, U, L.reshape(len(L),1), trans_a=1)[:,0]
+        self.scale = scale          # WRMS of the ordinary solution
+        self.nEval = 0
+
+    def _negLogLik(self, logAmp):
+        # -log-likelihood and its gradient wrt. log(wna) and log(fna)
+        self.nEval += 1
+        wna, fna = np.exp(logAmp)
+        d   = wna**2 + fna**2 * self.lam
+        Aw  = self.A / d[:,None]
+        X   = la.solve(self.A.T @ Aw, Aw.T @ self.L, assume_a='pos')
+        r   = self.L - self.A @ X
+        q   = r**2 / d
+        f   = 0.5 * (len(d) * np.log(2*np.pi) + np.sum(np.log(d)) + np.sum(q))
+        g   = (1 - q) / d
+        return f, np.array([wna**2 * np.sum(g), fna**2 * np.sum(self.lam * g)])
+
+    def _fit(self, start=None):
+        # L-BFGS-B in log amplitudes, started from the given amplitudes (e.g.
+        # of a previous run) or from equal white and flicker contributions to
+        # the ordinary WRMS
+        from scipy.optimize import minimize
+        if start is None:
+            start = [self.scale / np.sqrt(2)] * 2
+        bounds = [(np.log(self.scale * 1e-4), np.log(self.scale * 1e2))] * 2
+        x0     = np.clip(np.log(start), *bounds[0])
+        res    = minimize(self._negLogLik, x0, jac=True, method='L-BFGS-B', bounds=bounds)
+        self.wna, self.fna = np.exp(res.x)
+        self.logLik = -res.fun
+        return self.wna, self.fna, self.logLik
+
+    def _vce(self, start=None, maxIter=200, tol=1e-6):
+        # variance component estimation (restricted maximum likelihood) of the
+        # white and flicker variances by the fixed point iteration
+        #   s_k^2 <- s_k^2 * (e'W Q_k W e) / tr(R Q_k),  R = W - W A N^-1 A'W
+        # with Q_w = I and Q_f = diag(lam) in the eigenbasis
+        if start is None:
+            start = [self.scale / np.sqrt(2)] * 2
+        var = np.asarray(start, dtype=float)**2
+        for nIter in range(1, maxIter+1):
+            d   = var[0] + var[1] * self.lam
+            Aw  = self.A / d[:,None]
+            Ninv = la.inv(self.A.T @ Aw)
+            We  = (self.L - self.A @ (Ninv @ (Aw.T @ self.L))) / d
+            new = np.empty(2)
+            for k, q in enumerate([np.ones(len(d)), self.lam]):
+                trRQ   = np.sum(q / d) - np.sum(Ninv * ((Aw * q[:,None]).T @ Aw))
+                new[k] = var[k] * np.sum(q * We**2) / trRQ if trRQ > 0 else var[k]
+            done = np.all(np.abs(new - var) <= tol * np.abs(var))
+            var  = new
+            if done:
+                break
+        self.wna, self.fna = np.sqrt(var)
+        self.nEval = nIter
+        return self.wna, self.fna, nIter
+
+
+def _eigJ(J):
+    # J = U diag(lam) U', the round-off negative eigenvalues are set to zero
+    lam, U = la.eigh(J)
+    return np.clip(lam, 0, None), U
+
+
+def _mleKappa(buildJ, A, L, scale, bounds=(-2.9, -0.1)):
+    # maximum likelihood over kappa as well; each kappa needs its own J and
+    # eigendecomposition, so the amplitudes are profiled for every kappa tried
+    from scipy.optimize import minimize_scalar
+    fits = {}
+    def negProfile(kappa):
+        fits[kappa] = mleNoise(A, L, buildJ(kappa), scale)
+        return -fits[kappa]._fit()[2]
+    minimize_scalar(negProfile, bounds=bounds, method='bounded', options={'xatol': 1e-3})
+    kappa = max(fits, key=lambda k: fits[k].logLik)
+    nEval = sum(fit.nEval for fit in fits.values())
+    return kappa, fits[kappa], nEval
+
+
+def _lowRankJ(J, rank, nIter=2, oversample=10):
+    # randomized eigen-decomposition J ~ V V' + diag(D); D keeps the diagonal
+    # of J exact
+    n   = len(J)
+    k   = min(n, rank + oversample)
+    rng = np.random.RandomState(0)
+    Y   = la.blas.dgemm(1.0, J, rng.standard_normal((n, k)))
+    for _ in range(nIter):
+        Q, _ = la.qr(Y, mode='economic')
+        Y    = la.blas.dgemm(1.0, J, Q)
+    Q, _ = la.qr(Y, mode='economic')
+    s, W = la.eigh(Q.T @ J @ Q)
+    s, W = np.clip(s[::-1][:rank], 0, None), W[:, ::-1][:, :rank]
+    V    = (Q @ W) * np.sqrt(s)
+    D    = np.clip(np.diag(J) - np.sum(V**2, axis=1), 0, None)
+    return V, D
+
+def _bandJ(Jvec, dt, band):
+    # J of the kernel truncated after band lags in lower banded storage,
+    # Jb[d, i] = J[i+d, i]
+    n  = len(Jvec)
+    k  = min(band, n - 1)
+    d2 = dt**2
+    Jb = np.zeros((k + 1, n), dtype='double')
+    for d in range(k + 1):
+        w = Jvec[d:k+1] * Jvec[:k+1-d]
+        Jb[d, :n-d] = np.convolve(d2, w)[:n-d]
+    return Jb
+
+
+def _2mjd(dates, dateFormat):
+    mjd = []
+    if dateFormat == 'mjd':
+            mjd  = dates
+    elif dateFormat == 'decimalYear':
+        for i in range(len(dates[:,0])):
+            dd = du([],dates[i,0],[],[],[],[],[],[],dateFormat,'mjd')._getdate()
+            mjd.append(dd)
+        del i
+    elif dateFormat == 'yearANDdoy':
+        for i in range(len(dates[:,0])):
+            dd = du([],[],dates[i,0],[],[],dates[i,1],[],[],dateFormat,'mjd')
+            mjd.append(dd._getdate())
+        del i
+    elif dateFormat == 'gweekANDdow':
+        for i in range(len(dates[:,0])):
+            dd = du([],[],[],[],[],[],dates[i,0],dates[i,1],dateFormat,'mjd')
+            mjd.append(dd._getdate())
+        del i
+    elif dateFormat == 'yyyymmdd':
+        for i in range(len(dates[:,0])):
+            dd = du([],[],int(dates[i,0]),int(dates[i,1]),int(dates[i,2]),[],[],[],dateFormat,'mjd')
+            mjd.append(dd._getdate())                
+        del i
+    else:
+        raise ValueError("Please check date format!")
+    
+    return mjd
\ No newline at end of file
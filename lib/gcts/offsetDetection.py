@@ -0,0 +1,71 @@
+import numpy as np
+import scipy.linalg as la
+
+# Detection of unknown offsets (steps) in the series. Every epoch k is a
+# candidate for a step column s_k (zero before the epoch, one from it on),
+# whose least-squares fit is scored by bordering the normal equations of the
+# current design matrix instead of a new solution:
+#
+#   RSS(A, s_k) = RSS(A) - (s_k' r)^2 / (s_k' s_k - s_k' A N^-1 A' s_k)
+#
+# where r are the residuals and N = A'A. The sums s_k' r and A' s_k over the
+# epochs from k on are the reversed cumulative sums of r and of the rows of A,
+# so that all n candidates cost O(n*m^2) together. The best candidate is
+# inserted while it improves the information criterion, and N^-1 and r are
+# updated by the same rank-one border.
+
+criteria = {'AIC': lambda n: 2.0, 'BIC': lambda n: np.log(n)}
+
+
+def _scan(A, r, Ninv, minGap):
+    # reduction of the residual sum of squares of each component (columns of r)
+    # by a step at each epoch, zero for the epochs closer than minGap to the
+    # ends and for the steps already in A
+    n = len(A[:,0])
+    S   = np.cumsum(A[::-1], axis=0)[::-1]          # A' s_k
+    Sr  = np.cumsum(r[::-1], axis=0)[::-1]          # s_k' r
+    ss  = np.arange(n, 0, -1, dtype=float)          # s_k' s_k
+    sch = ss - np.einsum('ij,jk,ik->i', S, Ninv, S)
+    dRSS = np.zeros(np.shape(r), dtype=float)
+    valid = np.zeros(n, dtype=bool)
+    valid[minGap:n-minGap+1] = True
+    valid &= sch > 1e-9 * ss
+    dRSS[valid] = Sr[valid]**2 / sch[valid].reshape(-1,1)
+    return dRSS, S, Sr, sch, valid
+
+
+def _greedy(A, L, criterion='BIC', maxOffsets=5, minGap=2):
+    # A - design matrix including the known offsets
+    # L - observations, one column per component sharing the offsets
+    # returns the epochs (indices) of the inserted steps and the change of the
+    # criterion by each of them
+    if criterion not in criteria:
+        raise ValueError("Please check your information criterion!")
+    n, nComp = len(L[:,0]), len(L[0,:])
+    penalty  = criteria[criterion](n) * nComp       # one step per component
+    Ninv = la.inv(A.T @ A)
+    r    = L - A @ (Ninv @ (A.T @ L))
+    RSS  = np.sum(r**2, axis=0)
+    found = []
+    for _ in range(maxOffsets):
+        dRSS, S, Sr, sch, valid = _scan(A, r, Ninv, minGap)
+        if not np.any(valid):
+            break
+        newRSS = np.maximum(RSS - dRSS, np.finfo(float).tiny)
+        change = n * np.sum(np.log(newRSS / RSS), axis=1) + penalty
+        change[~valid] = np.inf
+        k = int(np.argmin(change))
+        if change[k] >= 0:
+            break
+        # border of N^-1 and the residuals by the step at k
+        s = np.zeros((n,1), dtype=float)
+        s[k:] = 1
+        g    = Ninv @ S[k].reshape(-1,1)
+        beta = Sr[k].reshape(1,-1) / sch[k]
+        r    = r - (s - A @ g) @ beta
+        Ninv = np.block([[Ninv + g @ g.T / sch[k], -g / sch[k]],
+                         [-g.T / sch[k],           np.array([[1 / sch[k]]])]])
+        A    = np.concatenate((A, s), axis=1)
+        RSS  = np.sum(r**2, axis=0)
+        found.append((k, float(change[k])))
+    return found
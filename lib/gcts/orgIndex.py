@@ -0,0 +1,82 @@
+import os, re, mmap, sqlite3
+
+# Index of the pbo. records in the GAMIT/GLOBK .org files, kept in a local
+# SQLite database as site -> (file, byte offset, length, epoch). The files are
+# scanned once through a memory map with a compiled pattern, and are only
+# scanned again when their size or modification time changes, so that the
+# records of a site are read by seeking to them instead of reading the whole
+# archive.
+
+pboPattern = re.compile(rb'pbo\. (\S+?)_GPS')
+
+
+class orgIndex:
+    def __init__(self, path):
+        self.path = path
+        self.db   = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER);
+            CREATE TABLE IF NOT EXISTS records (site TEXT, path TEXT, offset INTEGER, length INTEGER,
+                                                year INTEGER, month INTEGER, day INTEGER);
+            CREATE INDEX IF NOT EXISTS recordsSite ON records (site, path, offset);
+        """)
+
+    def _update(self, filenames):
+        # indexes the new and changed files, returns their number
+        known   = dict((p, (s, m)) for p, s, m in self.db.execute("SELECT path, size, mtime FROM files"))
+        changed = 0
+        with self.db:
+            for fname in filenames:
+                path = os.path.abspath(fname)
+                st   = os.stat(path)
+                if known.get(path) == (st.st_size, st.st_mtime_ns):
+                    continue
+                self.db.execute("DELETE FROM records WHERE path = ?", (path,))
+                self.db.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", _scan(path))
+                self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                                (path, st.st_size, st.st_mtime_ns))
+                changed += 1
+        return changed
+
+    def _lines(self, siteID, filenames):
+        # the pbo. lines of the site in the order of the files and of the lines
+        lines = []
+        for fname in filenames:
+            path = os.path.abspath(fname)
+            rows = self.db.execute("SELECT offset, length FROM records WHERE site = ? AND path = ? "
+                                   "ORDER BY offset", (siteID, path)).fetchall()
+            if not rows:
+                continue
+            with open(path, 'rb') as f:
+                for offset, length in rows:
+                    f.seek(offset)
+                    lines.append(f.read(length).decode())
+        return lines
+
+    def _sites(self):
+        # (site, number of records, first and last epochs) of the indexed files
+        return self.db.execute("SELECT site, COUNT(*), MIN(year*10000 + month*100 + day), "
+                               "MAX(year*10000 + month*100 + day) FROM records GROUP BY site "
+                               "ORDER BY site").fetchall()
+
+    def _close(self):
+        self.db.close()
+
+
+def _scan(path):
+    # (site, path, offset, length, year, month, day) of the pbo. records of a file
+    rows = []
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return rows
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = -1
+            for m in pboPattern.finditer(mm):
+                if m.start() < end:
+                    continue        # one record per line
+                start = mm.rfind(b'\n', 0, m.start()) + 1
+                end   = mm.find(b'\n', m.end())
+                end   = len(mm) if end < 0 else end + 1
+                ymd   = mm[start:end].split(b'|')[0].split()[3:6]
+                rows.append((m.group(1).decode(), path, start, end - start) + tuple(int(x) for x in ymd))
+    return rows
@@ -0,0 +1,277 @@
+import os, statistics
+import numpy as np
+from . import tseFile as tf
+from . import designMat as dm
+from .profiler import profiler
+from .common import compColumns, result, _series, _prefix
+from .checkpoint import _saveState
+
+# Outlier removal of the series (removeOutliers.py), and the screening of the
+# appended epochs against the state of the last full cleaning.
+
+
+def clean(tse, comps, method='IQrange', scale=3, periods=[], write=True, writeOutliers=False,
+          append=False, drift=0.25, window=31, prof=None, verbose=False):
+    # tse   - [?].tse file name or tseFile.series
+    # comps - components whose outliers are removed
+    # method - 'IQrange', 'median' or 'Nsigma' removing the outliers of the OLS
+    #          residuals until none is left, or 'huber' or 'tukey' flagging the
+    #          residuals beyond scale times the robust scale of an IRLS solution,
+    #          or 'hampel' flagging the OLS residuals beyond scale times the
+    #          normalized MAD around their rolling median over window epochs
+    # append - only the epochs appended since the last run are screened against
+    #          the bounds and the normal equations kept in [?](comp)_screen.npz,
+    #          which is rewritten if write is set. The series is cleaned again
+    #          when the robust scale of the accepted residuals which the bounds
+    #          are made of (see _spread) drifts by more than drift (relative)
+    #          from its value at the last full cleaning, or when it does not match.
+    # returns a dictionary of results, one per component, holding the outlier
+    # free series, the outliers (None if there is not), the (iteration,
+    # number of outliers) table and with append the new screen state
+    if method not in ['IQrange', 'median', 'Nsigma', 'huber', 'tukey', 'hampel']:
+        raise ValueError("Please check your outlier detection method!")
+    if method == 'hampel' and append:
+        raise ValueError("The hampel method judges each epoch by its neighbours, so it can not "
+                         "screen the appended epochs!")
+    from . import leastSquares as ls
+    from . import hampel
+    prof = prof if prof is not None else profiler()
+    with prof.stage('read'):
+        ts = _series(tse)
+    with prof.stage('designMat'):
+        A0, _ = dm._matrix(ts.header, ts.offset, ts.dates, periods, 365.25)
+    component = ts._label('COMPONENT')
+
+    results = {}
+    for i in comps:
+        with prof.repeat(i):
+            if component == 'all' and i in compColumns:
+                col = compColumns[i]
+            elif component in compColumns and i in compColumns:
+                col = [0,1]
+            else:
+                raise ValueError("Please check your component flag!")
+
+            header      = list(ts.header)
+            A           = A0
+            L           = ts.obs[:,col]
+            dates       = ts.dates
+            idx         = np.arange(len(L))
+            iteration   = 0
+            table       = []
+            outlierOBS  = np.empty([0,2])
+            outlierDATE = np.empty([0,len(dates[0,:])])
+            screenPath  = _prefix(ts) + i + "_screen.npz"
+            state       = None
+            screened    = False
+            if append:
+                state = _loadScreen(screenPath, ts, col, len(A0[0,:]), method, scale, periods)
+                if verbose and state is None and os.path.isfile(screenPath):
+                    print("\n " + screenPath + " does not match the series, the series is cleaned.")
+            if state is not None:
+                n0 = len(state['mask'])
+                with prof.stage('screen'):
+                    newState, spread = _screen(state, ts, col, periods, drift)
+                if newState is None:
+                    if verbose:
+                        print("\n Scale of the residuals has drifted from %.4f to %.4f, the series is "
+                              "cleaned again." % (float(state['spread']), spread))
+                else:
+                    state, screened = newState, True
+                    mask  = state['mask']
+                    L, dates = ts.obs[mask][:,col], ts.dates[mask]
+                    outlierOBS, outlierDATE = ts.obs[~mask][:,col], ts.dates[~mask]
+                    table.append((1, int(np.sum(~mask[n0:]))))
+            if verbose:
+                print("\n         ******* %s *******" % i)
+                print(" # \t Method \t Scale \t\t nOutliers")
+                print("---\t--------\t-------\t\t-----------")
+            if screened and verbose:
+                print("%2d\t%7s\t%12d\t\t%6d" % (1, method, scale, table[0][1]))
+                print("\n Screened %d new epochs against the state of %d epochs" % (len(mask) - n0, n0))
+            while not screened:
+                iteration += 1
+                if method in ['huber', 'tukey']:
+                    # the outliers are flagged once from the robust residuals
+                    with prof.stage('irls'):
+                        _, resid, sigma, _, _ = ls._irls(A, L[:,0], method)
+                    nonOutlBool = (np.abs(resid) < scale*sigma)
+                    bounds      = (-scale*sigma, scale*sigma)
+                elif method == 'hampel':
+                    # the outliers are flagged once from the rolling median and MAD
+                    with prof.stage('fit'):
+                        _, _, _, resid = ls._lse(A, L[:,0])
+                    with prof.stage('hampel'):
+                        nonOutlBool = hampel._hampel(resid, window, scale).reshape(np.shape(resid))
+                else:
+                    with prof.stage('fit'):
+                        _, _, _, resid = ls._lse(A, L[:,0])
+                    nonOutlBool = _outlierMask(resid, method, scale)
+                    bounds      = _outlierBounds(resid, method, scale) if append else None
+                nOutlires   = int(len(resid) - np.sum(nonOutlBool))
+                nonOutlBool_idx = [k for k, val in enumerate(nonOutlBool == False) if val]
+                table.append((iteration, nOutlires))
+
+                if nOutlires != 0:
+                    outlierOBS  = np.append(outlierOBS, L[nonOutlBool_idx,:], axis=0)
+                    outlierDATE = np.append(outlierDATE, dates[nonOutlBool_idx,:], axis=0)
+                    A     = np.delete(A, nonOutlBool_idx, axis=0)
+                    L     = np.delete(L, nonOutlBool_idx, axis=0)
+                    dates = np.delete(dates, nonOutlBool_idx, axis=0)
+                    idx   = np.delete(idx, nonOutlBool_idx)
+
+                if verbose:
+                    print("%2d\t%7s\t%12d\t\t%6d" % (iteration, method, scale, nOutlires))
+                if nOutlires == 0 or method in ['huber', 'tukey', 'hampel']:
+                    if append:
+                        state = _newScreen(ts, col, idx, A, L, bounds, method, scale, periods)
+                    break
+            if verbose:
+                print("\n")
+
+            for k in range(len(header)):
+                if 'COMPONENT' in header[k]:
+                    header[k] = "* COMPONENT    : " + i + "\n"
+                if 'DATA ORDER' in header[k]:
+                    header[k] = "* DATA ORDER   : " + i + " s_" + i + " dates" + "\n"
+                if 'ENDOFHEADER' in header[k]:
+                    header.insert(k, "* COMMENT      : All outliers have been removed wrt. " + method + "\n")
+
+            newFilename = _prefix(ts) + i + ".tse"
+            cleaned     = tf.series(newFilename, header, i, ts.offset, L, dates)
+            if write:
+                with prof.stage('write'):
+                    tf._write(newFilename, header, L, dates, verbose=verbose)
+
+            outliers = None
+            if len(outlierOBS) != 0:
+                headerOut = list(header)
+                for k in range(len(headerOut)):
+                    if 'COMMENT' and 'outliers' in headerOut[k]:
+                        headerOut[k] = "* COMMENT      : All outliers have been detected wrt. " + method + "\n"
+                        break
+                outliersFilename = _prefix(ts) + i + "_outliers.tse"
+                outliers = tf.series(outliersFilename, headerOut, i, ts.offset, outlierOBS, outlierDATE)
+                if writeOutliers:
+                    tf._write(outliersFilename, headerOut, outlierOBS, outlierDATE, verbose=verbose)
+
+            if append and write:
+                _saveState(screenPath, state, verbose)
+            results[i] = result(series=cleaned, outliers=outliers, table=table,
+                                screen=state if append else None)
+    return results
+
+
+def _outlierMask(resid, method, scale):
+    # True for the residuals which are not outliers wrt. the method
+    if method == 'IQrange':
+        sorted_resid = np.sort(resid, axis=0, kind='quicksort', order=None)
+        IQ = (sorted_resid[int(np.floor(0.75 * len(resid)))] -
+              sorted_resid[int(np.floor(0.25 * len(resid)))])
+        MED = sorted_resid[int(np.floor(0.50 * len(resid)))]
+
+        lowerBoundary = MED - (scale * IQ)
+        upperBoundary = MED + (scale * IQ)
+        return (lowerBoundary < resid) * (upperBoundary > resid)
+
+    elif method == 'median':
+        median_ith = np.abs(resid - statistics.median(resid))
+        if statistics.median(median_ith) == 0:
+            MAD = (1.2533 / len(resid)) * sum(median_ith)
+        else:
+            MAD = 1.4826 * statistics.median(median_ith)
+        return (median_ith < scale*MAD)
+
+    elif method == 'Nsigma':
+        WRMS = np.sqrt((resid.T @ resid) / len(resid))[0][0]
+        return (np.abs(resid) < scale*WRMS)
+
+
+def _outlierBounds(resid, method, scale):
+    # lower and upper bounds of the residuals which are not outliers, see _outlierMask
+    resid = np.ravel(resid)
+    if method == 'IQrange':
+        sorted_resid = np.sort(resid)
+        IQ  = (sorted_resid[int(np.floor(0.75 * len(resid)))] -
+               sorted_resid[int(np.floor(0.25 * len(resid)))])
+        MED = sorted_resid[int(np.floor(0.50 * len(resid)))]
+        return float(MED - scale*IQ), float(MED + scale*IQ)
+    elif method == 'median':
+        MED = statistics.median(resid)
+        median_ith = np.abs(resid - MED)
+        if statistics.median(median_ith) == 0:
+            MAD = (1.2533 / len(resid)) * np.sum(median_ith)
+        else:
+            MAD = 1.4826 * statistics.median(median_ith)
+        return float(MED - scale*MAD), float(MED + scale*MAD)
+    elif method == 'Nsigma':
+        WRMS = np.sqrt(np.sum(resid**2) / len(resid))
+        return float(-scale*WRMS), float(scale*WRMS)
+
+
+def _newScreen(ts, col, idx, A, L, bounds, method, scale, periods):
+    # state of a full cleaning: the accepted epochs (idx) among the epochs of
+    # the series, their normal equations, the bounds of the residuals and the
+    # robust scale of the accepted residuals
+    mask = np.zeros(len(ts.obs), dtype=bool)
+    mask[idx] = True
+    nEq, rhs = A.T @ A, A.T @ L[:,0]
+    return {'dates': ts.dates, 'obs': ts.obs[:,col], 'mask': mask, 'nEq': nEq, 'rhs': rhs,
+            'bounds': np.asarray(bounds, dtype=float),
+            'spread': _spread(A @ np.linalg.solve(nEq, rhs) - L[:,0], method, scale),
+            'method': method, 'scale': float(scale), 'periods': np.asarray(periods, dtype=str)}
+
+
+def _spread(resid, method, scale):
+    # robust scale of the residuals which the bounds of the method are made
+    # of, i.e. the interquartile range (IQrange), the normalized MAD (median,
+    # huber and tukey) or the WRMS (Nsigma)
+    lower, upper = _outlierBounds(resid, 'median' if method in ['huber', 'tukey'] else method, scale)
+    return (upper - lower) / (2 * scale)
+
+
+def _loadScreen(path, ts, col, nUnk, method, scale, periods):
+    # the state of the previous run if the series only has epochs appended
+    # since then and the same model and method, None otherwise
+    if not os.path.isfile(path):
+        return None
+    with np.load(path) as f:
+        state = dict(f)
+    if 'spread' not in state:
+        return None     # of an older GCTS
+    n0 = len(state['mask'])
+    if (n0 > len(ts.obs) or len(state['rhs']) != nUnk or str(state['method']) != method or
+        float(state['scale']) != float(scale) or list(state['periods']) != list(periods) or
+        np.shape(state['dates'])[1] != np.shape(ts.dates)[1]):
+        return None
+    if not (np.allclose(state['dates'], ts.dates[:n0]) and np.allclose(state['obs'], ts.obs[:n0][:,col])):
+        return None
+    return state
+
+
+def _screen(state, ts, col, periods, drift):
+    # screens the residuals (AX - L, as those the bounds are made of) of the
+    # appended epochs against the bounds around the solution of the kept
+    # normal equations and folds the accepted ones into them. The robust scale
+    # of the accepted residuals at the new solution is compared with its value
+    # at the last full cleaning. Returns the new state and the new scale, or
+    # None and the scale if it has drifted.
+    n0 = len(state['mask'])
+    nEq, rhs = state['nEq'], state['rhs']
+    mask = state['mask']
+    A, _ = dm._matrix(ts.header, ts.offset, ts.dates, periods, 365.25)
+    L    = ts.obs[:,col[0]]
+    if len(ts.obs) > n0:
+        r    = A[n0:] @ np.linalg.solve(nEq, rhs) - L[n0:]
+        ok   = (state['bounds'][0] < r) & (state['bounds'][1] > r)
+        nEq  = nEq + A[n0:][ok].T @ A[n0:][ok]
+        rhs  = rhs + A[n0:][ok].T @ L[n0:][ok]
+        mask = np.concatenate((mask, ok))
+    spread = _spread(A[mask] @ np.linalg.solve(nEq, rhs) - L[mask], str(state['method']),
+                     float(state['scale']))
+    if abs(spread / max(float(state['spread']), np.finfo(float).tiny) - 1) > drift:
+        return None, spread
+    newState = dict(state)
+    newState.update({'dates': ts.dates, 'obs': ts.obs[:,col], 'mask': mask, 'nEq': nEq,
+                     'rhs': rhs})
+    return newState, spread
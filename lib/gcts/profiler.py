@@ -0,0 +1,161 @@
+import time, json, os, io
+import tracemalloc
+from contextlib import contextmanager
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class profiler:
+    def __init__(self, enabled=False, hook=None):
+        self.enabled = enabled
+        self.hook    = hook         # None, 'cProfile' or 'tracemalloc'
+        self.stages  = {}
+        self.repeats = []
+        self.current = None         # stages of the repeat being recorded
+        self.stack   = []           # open stages with their running peak
+        self.peak    = 0
+        self.start   = time.time()
+        # tracing every allocation slows down the numpy code, so the peaks of
+        # the stages are only traced with the tracemalloc hook, otherwise they
+        # are the peak resident set size of the process by the end of the stage
+        self.traced  = self.enabled and self.hook == 'tracemalloc'
+        if self.traced and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        # wall time, call count and peak memory of a named stage
+        if not self.enabled:
+            yield
+            return
+        self._foldPeak()
+        if self.traced:
+            tracemalloc.reset_peak()
+        self.stack.append([name, 0])
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            self._foldPeak()
+            _, peak = self.stack.pop()
+            _update(self.stages, name, dt, peak)
+            if self.current is not None:
+                _update(self.current['stages'], name, dt, peak)
+
+    @contextmanager
+    def repeat(self, iteration):
+        # groups the stages recorded in one repeat of the main loop
+        if not self.enabled:
+            yield
+            return
+        self.current = {'repeat': iteration, 'wallTime': 0.0, 'stages': {}}
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current['wallTime'] = time.perf_counter() - t0
+            self.repeats.append(self.current)
+            self.current = None
+
+    @contextmanager
+    def hot(self, basename):
+        # runs the hot loop under cProfile or tracemalloc if a hook is chosen
+        if self.hook == 'cProfile':
+            import cProfile, pstats
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                prof.dump_stats(basename + "_profile.prof")
+                stream = io.StringIO()
+                pstats.Stats(prof, stream=stream).sort_stats('cumulative').print_stats(30)
+                with open(basename + "_profile.txt", 'w') as f:
+                    f.write(stream.getvalue())
+        elif self.hook == 'tracemalloc':
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(10)
+            before = tracemalloc.take_snapshot()
+            try:
+                yield
+            finally:
+                after = tracemalloc.take_snapshot()
+                if started:
+                    tracemalloc.stop()
+                with open(basename + "_tracemalloc.txt", 'w') as f:
+                    for stat in after.compare_to(before, 'lineno')[:30]:
+                        f.write(str(stat) + "\n")
+        else:
+            yield
+
+    def _child(self):
+        # profiler of a worker process, whose records are passed back by
+        # _records and added to this one by _merge
+        return profiler(self.enabled, self.hook)
+
+    def _records(self):
+        if self.enabled:
+            self._foldPeak()
+        return self.stages, self.repeats, self.peak
+
+    def _merge(self, records):
+        # the stages of the workers are summed, i.e. their wall times are
+        # those of all processes together
+        stages, repeats, peak = records
+        for name, entry in stages.items():
+            own = self.stages.setdefault(name, {'calls': 0, 'wallTime': 0.0, 'peakMemory': 0.0})
+            own['calls']     += entry['calls']
+            own['wallTime']  += entry['wallTime']
+            own['peakMemory'] = max(own['peakMemory'], entry['peakMemory'])
+        self.repeats += repeats
+        self.peak     = max(self.peak, peak)
+
+    def _foldPeak(self):
+        # passes the peak since the last reset to every open stage
+        if self.traced:
+            _, peak = tracemalloc.get_traced_memory()
+        else:
+            peak = (_maxRSS() or 0) * 2**20
+        self.peak = max(self.peak, peak)
+        for st in self.stack:
+            st[1] = max(st[1], peak)
+
+    def _write(self, filename, parameters=None):
+        if not self.enabled:
+            return
+        self._foldPeak()
+        params = {}
+        if parameters is not None:
+            for key, val in parameters.items():
+                if isinstance(val, list):
+                    val = [v.name if hasattr(v, 'name') else v for v in val]
+                params[key] = val.name if hasattr(val, 'name') else val  # file arguments
+        report = {'parameters': params,
+                  'wallTime'  : time.time() - self.start,
+                  'peakTraced': self.peak / 2**20 if self.traced else None,
+                  'maxRSS'    : _maxRSS(),
+                  'stages'    : self.stages,
+                  'repeats'   : self.repeats}
+        with open(filename, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        if os.path.isfile(filename):
+            print(" " + filename + " file has been created...")
+        else:
+            print("Something went wrong!\n")
+
+
+def _update(table, name, dt, peak):
+    entry = table.setdefault(name, {'calls': 0, 'wallTime': 0.0, 'peakMemory': 0.0})
+    entry['calls']     += 1
+    entry['wallTime']  += dt
+    entry['peakMemory'] = max(entry['peakMemory'], peak / 2**20)   # in MB
+
+def _maxRSS():
+    # peak resident set size of the process in MB
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -1,6 +1,5 @@
 import numpy as np
-import sys
-import leastSquares as ls
+from . import leastSquares as ls
 from scipy.optimize import fmin
 #https://uk.mathworks.com/matlabcentral/fileexchange/32115-quantreg-x-y-tau-order-nboot
 """Reference:
@@ -10,12 +9,10 @@ MATLAB Central File Exchange. Retrieved February 13, 2020.
 """
 def _quantileReg(x, y, tau):
     if (tau <= 0) or (tau >= 1):
-        print("tau must be between 0 and 1!")
-        sys.exit()
+        raise ValueError("tau must be between 0 and 1!")
 
     if len(x) != len(y):
-        print("The length of x and y must be same!")
-        sys.exit()
+        raise ValueError("The length of x and y must be same!")
 
     x = np.column_stack((x, np.ones((len(x),1))))
     unk, sUnk, s0, resid = ls._lse(x, y)
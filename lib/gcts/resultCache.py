@@ -0,0 +1,70 @@
+import os, glob, json, hashlib, pickle
+import numpy as np
+
+# Results of the evaluations kept in a local directory under the hash of
+# their inputs, i.e. the series (observations, dates, offsets and the header
+# values the results are labelled with) and all the estimation parameters, so
+# that an identical job is answered from the disk. The least recently used
+# results are dropped once the directory exceeds maxSize bytes.
+
+headerLabels = ['SITE', 'COMPONENT', 'UNIT', 'DATE FORMAT']
+
+class resultCache:
+    def __init__(self, directory, maxSize=100 * 2**20):
+        self.directory = directory
+        self.maxSize   = maxSize
+        os.makedirs(directory, exist_ok=True)
+
+    def _key(self, ts, params):
+        h = hashlib.sha256()
+        for arr in [ts.obs, ts.dates]:
+            arr = np.ascontiguousarray(arr, dtype=float)
+            h.update(str(arr.shape).encode())
+            h.update(arr.tobytes())
+        header = {label: ts._label(label) for label in headerLabels}
+        h.update(json.dumps({'offset': list(ts.offset), 'header': header, 'params': params},
+                            sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def _get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                res = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # a stale (e.g. of an older GCTS) or corrupt entry is a miss
+            self._invalidate(key)
+            return None
+        os.utime(path)      # recently used
+        return res
+
+    def _put(self, key, res):
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(res, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        self._evict(keep=self._path(key))
+
+    def _evict(self, keep=None):
+        files = [(os.path.getmtime(p), os.path.getsize(p), p) for p in glob.glob(os.path.join(self.directory, "*.pkl"))]
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.maxSize:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+
+    def _invalidate(self, key):
+        if os.path.isfile(self._path(key)):
+            os.remove(self._path(key))
+
+    def _clear(self):
+        for path in glob.glob(os.path.join(self.directory, "*.pkl")):
+            os.remove(path)
@@ -0,0 +1,56 @@
+import os, math
+from contextlib import contextmanager
+
+# Number of worker processes and of BLAS threads per worker for a batch of
+# evaluations. The dense operations on n x n matrices (J, its decompositions
+# and the weighted solutions) only gain from more BLAS threads for large n, so
+# short campaign series run as many single threaded workers, and long series as
+# a few workers with many threads each. The workers are also limited by the
+# memory their matrices need. The thread limits are set by threadpoolctl if it
+# is installed, otherwise the BLAS libraries keep their own settings.
+
+rowsPerThread  = 500    # rows of the dense matrices worth one BLAS thread
+matricesPerJob = 4      # n x n matrices of an evaluation (J, eigenvectors, workspace)
+
+
+def _cores():
+    # cores available to this process
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _availableMemory():
+    # available physical memory in bytes, None if it is not known
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _plan(nObs, nJobs, cores=None, memory=None):
+    # nObs  - number of epochs of the largest series
+    # nJobs - number of series
+    # returns the number of workers and the BLAS threads per worker
+    cores   = cores if cores is not None else _cores()
+    memory  = memory if memory is not None else _availableMemory()
+    threads = int(min(cores, max(1, math.ceil(nObs / rowsPerThread))))
+    workers = int(max(1, min(nJobs, cores // threads)))
+    if memory is not None:
+        perJob  = matricesPerJob * nObs**2 * 8
+        workers = int(max(1, min(workers, memory // max(perJob, 1))))
+    if workers == 1:
+        threads = cores     # a single worker uses all cores
+    return workers, threads
+
+
+@contextmanager
+def _limitThreads(threads):
+    # BLAS (and OpenMP) thread pools limited to threads within the block
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        yield
+        return
+    with threadpool_limits(limits=threads):
+        yield
@@ -0,0 +1,208 @@
+import numpy as np
+import math, glob, re, os
+from functools import lru_cache
+from .qReg import _quantileReg as qr
+from scipy.stats.distributions import chi2
+
+class searchSpace:
+    def __init__(self, alpha, WRMS, dof, nRND):
+        self.alpha = alpha
+        self.WRMS  = WRMS
+        self.dof   = dof
+        self.nRND  = nRND
+
+    def _extremePoints(self):
+        alphaNew = 1 - np.sqrt(1 - self.alpha)
+        pLower_wna, pUpper_wna, pLower_fna, pUpper_fna = _priorFits(self.alpha)
+
+        funWRMS    = lambda wrms, alp, dof: np.array([np.sqrt((dof * wrms**2) / chi2.ppf(1-alp/2,dof)), 
+                                            np.sqrt((dof * wrms**2) / chi2.ppf(alp/2,dof))])
+        WRMSlims = funWRMS(self.WRMS, alphaNew, self.dof)
+
+        funWNA     = lambda horlims, pUpwna, pLowna: np.array([pUpwna[0] * horlims[0] + pUpwna[1],
+                                                               pUpwna[0] * horlims[1] + pUpwna[1],
+                                                               pLowna[0] * horlims[1] + pLowna[1],
+                                                               pLowna[0] * horlims[0] + pLowna[1]])
+        extWNAs = funWNA(WRMSlims, pUpper_wna, pLower_wna)
+
+        funFNA     = lambda horlims, pUpfna, pLofna: np.array([pUpfna[0] * horlims[0] + pUpfna[1],
+                                                               pUpfna[0] * horlims[1] + pUpfna[1],
+                                                               pLofna[0] * horlims[1] + pLofna[1],
+                                                               pLofna[0] * horlims[0] + pLofna[1]])
+        extFNAs = funFNA(WRMSlims, pUpper_fna, pLower_fna)
+        #np.savetxt('6-extWNAs.dat', extWNAs, fmt="%10.4f")
+        #np.savetxt('7-extFNAs.dat', extFNAs, fmt="%10.4f")
+        #np.savetxt('8-WRMSlims.dat', WRMSlims, fmt="%10.4f")
+        #np.savetxt('11-wna_lo.dat', pLower_wna, fmt="%10.4f")
+        #np.savetxt('12-wna_up.dat', pUpper_wna, fmt="%10.4f")
+        #np.savetxt('13-fna_lo.dat', pLower_fna, fmt="%10.4f")
+        #np.savetxt('14-fna_up.dat', pUpper_fna, fmt="%10.4f")
+        return extWNAs, extFNAs, WRMSlims
+
+        
+
+    def _randomPoints(self):
+        extWNAs, extFNAs, WRMSlims = self._extremePoints()
+        px = np.concatenate((WRMSlims, WRMSlims[::-1]), axis=0)
+        transMat = np.array([[1, 0, 0, 0],
+                             [1, 1, 0, 0],
+                             [1, 1, 1, 1],
+                             [1, 0, 1, 0]])
+        a     = np.linalg.inv(transMat) @ px.T
+        b_wna = np.linalg.inv(transMat) @ (extWNAs).T
+        b_fna = np.linalg.inv(transMat) @ (extFNAs).T
+
+        xWNA, yWNA = _pointsIn(a, b_wna, self.nRND)
+        xFNA, yFNA = _pointsIn(a, b_fna, self.nRND)
+        yWNA[yWNA <= 0] = math.nan
+        yFNA[yFNA <= 0] = math.nan
+        #np.savetxt('9-rndWNA.dat', np.concatenate((xWNA, yWNA), axis=1), fmt="%10.4f")
+        #np.savetxt('10-rndFNA.dat', np.concatenate((xFNA, yFNA), axis=1), fmt="%10.4f")
+        return xWNA, yWNA, xFNA, yFNA
+
+def _refineContour(s0fun, wnas, fnas, tol, maxLevel=8):
+    # s0 = 1 curve by adaptive refinement instead of a dense grid. The sorted
+    # random amplitudes form a coarse seed grid; only the cells whose corners
+    # straddle s0 = 1 are split into four, until s0 at the centre of a cell
+    # differs from the mean of its corners (i.e. the error of the bilinear
+    # interpolation) by less than tol. The crossings are linearly interpolated
+    # on the edges of the final cells.
+    # returns the crossings and the number of s0 evaluations
+    s0s = {}
+    def s0At(w, f):
+        if (w, f) not in s0s:
+            s0s[(w, f)] = float(s0fun(w, f))
+        return s0s[(w, f)]
+
+    w = np.unique(wnas[~np.isnan(wnas)])
+    f = np.unique(fnas[~np.isnan(fnas)])
+    if len(w) < 2 or len(f) < 2:
+        raise ValueError("At least two positive amplitudes are needed for the seed grid, please increase nRND!")
+    cells = [(w[i], w[i+1], f[j], f[j+1]) for i in range(len(w)-1) for j in range(len(f)-1)]
+    final = []
+    level = 0
+    while cells:
+        refined = []
+        for w0, w1, f0, f1 in cells:
+            c = [s0At(w0, f0), s0At(w1, f0), s0At(w1, f1), s0At(w0, f1)]
+            if not (min(c) <= 1 <= max(c)):
+                continue
+            wm, fm = (w0 + w1) / 2, (f0 + f1) / 2
+            if (abs(s0At(wm, fm) - np.mean(c)) <= tol) or (level == maxLevel):
+                final.append(((w0, f0), (w1, f0), (w1, f1), (w0, f1), c))
+                continue
+            refined += [(w0, wm, f0, fm), (wm, w1, f0, fm), (w0, wm, fm, f1), (wm, w1, fm, f1)]
+        cells = refined
+        level += 1
+
+    coor = []
+    for *corners, c in final:
+        for k in range(4):
+            (pa, sa), (pb, sb) = (corners[k], c[k]), (corners[(k+1) % 4], c[(k+1) % 4])
+            if (sa - 1) * (sb - 1) <= 0 and sa != sb:
+                t = (1 - sa) / (sb - sa)
+                coor.append([pa[0] + t * (pb[0] - pa[0]), pa[1] + t * (pb[1] - pa[1])])
+    if len(coor) == 0:
+        # s0 = 1 is not inside the seed grid, the closest node is taken
+        (wc, fc), _ = min(s0s.items(), key=lambda item: abs(item[1] - 1))
+        coor = [[wc, fc]]
+    return np.unique(np.asarray(coor), axis=0), len(s0s)
+
+@lru_cache(maxsize=None)
+def _priorFits(alpha):
+    # quantile regression lines of WNA and FNA against WRMS of the meta data.
+    # They only depend on alpha, so they are fitted once per process. The
+    # fits and the tables of the binary priors.npz (see buildPriors.py) are
+    # taken as they are unless a results file is newer.
+    binary = _loadPriors(_metaDataPath())
+    if binary is not None:
+        hit = np.isclose(binary['alphas'], alpha)
+        if np.any(hit):
+            return tuple(binary['fits'][np.argmax(hit)])
+        return _fitPriors(binary['WRMS'], binary['WNA'], binary['FNA'], alpha)
+    WRMS, WNA, FNA, _ = _readPriors(_metaDataPath())
+    return _fitPriors(WRMS, WNA, FNA, alpha)
+
+def _fitPriors(WRMS, WNA, FNA, alpha):
+    WRMSnew = (np.asarray(WRMS)).reshape(len(WRMS),1)
+    WNAnew  = (np.asarray(WNA)).reshape(len(WNA),1)
+    FNAnew  = (np.asarray(FNA)).reshape(len(FNA),1)
+
+    alphaNew   = 1 - np.sqrt(1 - alpha)
+    pLower_wna = qr(WRMSnew, WNAnew, (1 - alphaNew/2))
+    pUpper_wna = qr(WRMSnew, WNAnew, (alphaNew/2))
+
+    pLower_fna = qr(WRMSnew, FNAnew, (1 - alphaNew/2))
+    pUpper_fna = qr(WRMSnew, FNAnew, (alphaNew/2))
+    return pLower_wna, pUpper_wna, pLower_fna, pUpper_fna
+
+def _readPriors(directory):
+    # WRMS, WNA, FNA and the sites of all results_[comp].txt files
+    WRMS  = []
+    WNA   = []
+    FNA   = []
+    sites = []
+    for file in glob.iglob(directory + '/results*', recursive=True):
+        with open(file,'r') as ff:
+            for line in ff.readlines():
+                sites.append(line.split()[0])
+                WRMS.append(float(line.split()[1]))
+                WNA.append(float(line.split()[2]))
+                FNA.append(float(line.split()[3]))
+    return WRMS, WNA, FNA, sites
+
+def _writePriors(directory, alphas):
+    # priors.npz holding the tables and the fits of the alphas
+    WRMS, WNA, FNA, sites = _readPriors(directory)
+    fits = np.array([np.array(_fitPriors(WRMS, WNA, FNA, alpha)) for alpha in alphas])
+    path = os.path.join(directory, 'priors.npz')
+    np.savez(path, WRMS=WRMS, WNA=WNA, FNA=FNA, sites=sites, alphas=np.asarray(alphas, dtype=float),
+             fits=fits)
+    return path
+
+def _loadPriors(directory):
+    # the binary priors, None if there is not or if a results file is newer
+    path = os.path.join(directory, 'priors.npz')
+    if not os.path.isfile(path):
+        return None
+    tables = glob.glob(directory + '/results*')
+    if any(os.path.getmtime(t) > os.path.getmtime(path) for t in tables):
+        return None
+    with np.load(path) as f:
+        return {k: f[k] for k in ['WRMS', 'WNA', 'FNA', 'alphas', 'fits']}
+
+def _metaDataPath():
+    # $GCTS_METADATA (e.g. the priors of a regional network, see buildPriors.py),
+    # $pyGCTS/metaData, the metaData installed with the package, or the one
+    # next to the lib directory
+    if 'GCTS_METADATA' in os.environ:
+        return os.environ['GCTS_METADATA']
+    if 'pyGCTS' in os.environ:
+        return os.path.join(os.environ['pyGCTS'], 'metaData')
+    try:
+        import gctsmeta
+        return list(gctsmeta.__path__)[0]
+    except ImportError:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'metaData')
+
+def _pointsAround(wna, fna, nRND, span=0.5):
+    # random amplitudes within (1 -+ span) times wna and fna, e.g. the previous
+    # amplitudes of a series with appended epochs (see checkpoint._appendState)
+    y = np.empty((nRND,2), dtype='float')
+    for i in range(nRND):
+        y[i] = [wna, fna] * (1 + span * (2 * np.random.rand(2) - 1))
+
+    return y[:,:1], y[:,1:]
+
+def _pointsIn(a, b, nRND):
+    # a - 4x1 vector including logical x coordinates
+    # b - 4x1 vector including logical y coordinates
+    x = np.empty((nRND,1), dtype='float')
+    y = np.empty((nRND,1), dtype='float')
+    for i in range(nRND):
+        lx = np.random.rand()
+        ly = np.random.rand()
+        x[i] = a[0] + a[1]*lx + a[2]*ly + a[3]*lx*ly
+        y[i] = b[0] + b[1]*lx + b[2]*ly + b[3]*lx*ly
+
+    return x, y
@@ -0,0 +1,32 @@
+import numpy as np
+from scipy.fft import rfft, irfft, next_fast_len
+
+# Power-law noise of the realizations of the Monte Carlo studies. The noise of
+# the estimation model is T w with T = DT * tril(toeplitz(Jvec)), i.e. the
+# white noise w scaled by dt (the time since the previous epoch) and filtered
+# by the fractional differencing (Hosking) coefficients Jvec of the spectral
+# index. The filter is a causal convolution, which is made by FFT in
+# O(n log n) per realization instead of the dense T (O(n^2) per realization
+# and O(n^2) memory), and gives the same series as T w.
+
+batchSize = 256     # realizations filtered at once
+
+
+def _powerLaw(Jvec, dt, W):
+    # T @ W for the columns of W (n x nReal)
+    n = len(Jvec)
+    m = next_fast_len(2*n - 1, real=True)
+    H = rfft(Jvec, m)
+    Y = np.empty(np.shape(W), dtype=float)
+    for c0 in range(0, len(W[0,:]), batchSize):
+        c1 = min(c0 + batchSize, len(W[0,:]))
+        Y[:,c0:c1] = irfft(H[:,None] * rfft(dt[:,None] * W[:,c0:c1], m, axis=0), m, axis=0)[:n]
+    return Y
+
+
+def _realizations(A, unk, Jvec, dt, wna, fna, nReal, rng):
+    # nReal series (n x nReal) of the model A unk with white noise of wna and
+    # power-law noise of fna
+    n = len(Jvec)
+    model = A @ np.asarray(unk, dtype=float).reshape(-1,1)
+    return model + wna * rng.standard_normal((n, nReal)) + fna * _powerLaw(Jvec, dt, rng.standard_normal((n, nReal)))
@@ -0,0 +1,114 @@
+import math
+import numpy as np
+from .dateUtilities import date as du
+
+# Readers of the time series or coordinate files produced by the GPS/GNSS
+# software. Each returns the observations as E N U sE sN sU columns (in the unit
+# of the source file) and the dates as year, month, day columns.
+
+def _gipsy(filename):
+    data  = np.loadtxt(filename, usecols=(1,2,3,4,5,6, 11, 12, 13))
+    return data[:,0:6], data[:,6:]
+
+
+def _gamit(filenames, siteID, index=None):
+    # index - orgIndex of the files, whose records of the site are read by
+    #         seeking to them instead of reading the whole files
+    obs, s_obs, dates = _gamitRecords(filenames, siteID, index)
+    return _gamitENU(obs, s_obs, obs[0,:]), dates
+
+
+def _gamitRecords(filenames, siteID, index=None):
+    # the coordinates (N E U), their sigmas and the dates of the pbo. records
+    if index is not None:
+        lines = index._lines(siteID, filenames)
+    else:
+        lines = []
+        for i in range(len(filenames)):
+            with open(filenames[i], 'r') as f:
+                for line in f.readlines():
+                    if 'pbo. ' + siteID + '_GPS' in line:
+                        lines.append(line)
+    obs_temp   = []
+    s_obs_temp = []
+    dates_temp = []
+    for line in lines:
+        dates_temp.append((line.split("|")[0].split()[3:6]))
+        obs_temp.append((line.split("|")[2].split("\n")[0].split()[0:3]))
+        s_obs_temp.append((line.split("|")[2].split("\n")[0].split()[3:6]))
+    if len(dates_temp) == 0:
+        raise ValueError("Site " + siteID + " could not be found in the gamit files!")
+    return np.asarray(obs_temp, dtype=float), np.asarray(s_obs_temp, dtype=float), \
+           np.asarray(dates_temp, dtype=int)
+
+
+def _gamitENU(obs, s_obs, ref):
+    # observations wrt. the reference coordinates, pbo records are in N E U order
+    data = np.concatenate((obs - np.asarray(ref, dtype=float), s_obs), axis=1)
+    return data[:,[1,0,2,4,3,5]]
+
+
+def _bernese(filenames, siteID):
+    obsXYZ, s_obs, dates, latlon = _berneseRecords(filenames, siteID)
+    return _berneseENU(obsXYZ, s_obs, obsXYZ[0,:], *latlon), dates
+
+
+def _berneseRecords(filenames, siteID):
+    # the coordinates (X Y Z), their sigmas (E N U), the dates and the latitude
+    # and longitude (degrees) of the site
+    obs_temp   = []
+    s_obs_temp = []
+    dates_temp = []
+    for i in range(len(filenames)):
+        idx = 0
+        lineIDX = 0
+        groupoflines = None
+        with open(filenames[i], 'r') as f:
+            for line in f:
+                if 'Reference epoch:' in line:
+                    dates_temp.append(line.split()[2].split("-"))
+                if groupoflines is None:
+                    if siteID + '                  X' in line:
+                        groupoflines = []
+                        groupoflines.append(line)
+                        lineIDX = idx
+                elif line == '\n':
+                    if lineIDX + 7 == idx:
+                        break
+                else:
+                    groupoflines.append(line)
+                idx += 1
+        if groupoflines is None:
+            raise ValueError("Site " + siteID + " could not be found in " + filenames[i] + "!")
+
+        obs_temp.append([groupoflines[0].split()[3], groupoflines[1].split()[2], groupoflines[2].split()[2]])
+        s_obs_temp.append([groupoflines[5].split()[4], groupoflines[4].split()[4], groupoflines[3].split()[4]])
+    latlon = (float(groupoflines[4].split()[2]), float(groupoflines[5].split()[2]))
+    return np.asarray(obs_temp, dtype=float), np.asarray(s_obs_temp, dtype=float), \
+           np.asarray(dates_temp, dtype=int), latlon
+
+
+def _berneseENU(obsXYZ, s_obs, ref, lat, lon):
+    # observations wrt. the reference coordinates rotated into E N U
+    lat = lat * (math.pi / 180)
+    lon = lon * (math.pi / 180)
+    obsXYZ = obsXYZ - np.asarray(ref, dtype=float)
+
+    transMat = np.array([[             -math.sin(lon),               -math.cos(lon), 0],
+                        [-math.sin(lat)*math.cos(lon), -math.sin(lat)*math.sin(lon), math.cos(lat)],
+                        [ math.cos(lat)*math.cos(lon),  math.cos(lat)*math.sin(lon), math.sin(lat)]])
+    obsENU = ((transMat @ obsXYZ.T).T)
+    return np.concatenate((obsENU, s_obs), axis=1)
+
+
+def _convDates(ymd, dateFormat):
+    # year, month, day columns into the dates of the [?].tse file, which have
+    # one column for mjd and decimalYear, and two or three columns otherwise
+    if dateFormat == 'yyyymmdd':
+        return np.asarray(ymd)
+    datesNew_temp = []
+    for i in range(len(ymd[:,0])):
+        dd = du([],[],int(ymd[i,0]),int(ymd[i,1]),int(ymd[i,2]),[],[],[],"yyyymmdd",dateFormat)
+        datesNew_temp.append(dd._getdate())
+    datesNew = np.asarray(datesNew_temp)
+    return datesNew.reshape(len(datesNew), -1)
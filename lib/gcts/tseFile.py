@@ -1,6 +1,33 @@
 import numpy as np
 import os
-from dateUtilities import date as du
+from .dateUtilities import date as du
+
+
+class series:
+    # a [?].tse file kept in memory, i.e. the output of _read together with
+    # the name of the file it belongs to
+    def __init__(self, filename, header, component, offset, obs, dates):
+        self.filename  = filename
+        self.header    = header
+        self.component = component
+        self.offset    = offset
+        self.obs       = obs
+        self.dates     = dates
+
+    def _label(self, label):
+        return _headerValue(self.header, label)
+
+
+def _load(filename):
+    return series(filename, *_read(filename))
+
+
+def _headerValue(header, label):
+    # the value of "* LABEL : value" header line, None if there is not
+    for line in header:
+        if label in line:
+            return line.split(": ")[1].split("\n")[0]
+    return None
 
 
 def _read(filename):
@@ -25,7 +52,7 @@ def _read(filename):
     return header, component, offset, obs, dates
 
 
-def _write(newFilename, header, observations, dates):
+def _write(newFilename, header, observations, dates, dateFmt="%8i", verbose=True):
     wrFile = open(newFilename,'w')
     for i in range(len(header)):
         wrFile.write(header[i])
@@ -34,9 +61,12 @@ def _write(newFilename, header, observations, dates):
         for k in range(len(observations[0,:])):
             wrFile.write("%14.6f" % observations[j,k])
         for l in range(len(dates[0,:])):
-            wrFile.write("%8i" % dates[j,l])
+            wrFile.write(dateFmt % dates[j,l])
         wrFile.write("\n")
+    wrFile.close()
 
+    if not verbose:
+        return
     if os.path.isfile(newFilename):
         print(" " + newFilename + " file has been created...")
     else:
@@ -84,7 +114,7 @@ def _stats(filename):
             dd = du([],[],int(dates[i,0]),int(dates[i,1]),int(dates[i,2]),[],[],[],dateFormat,'mjd')
             datesNew.append(dd._getdate()) 
     else:
-        print("Please check date format in your [?].tse file!")
+        raise ValueError("Please check date format in your [?].tse file!")
 
     print(" --------------------------------------------------------------------------------------\n",
           " The statistical details of the time series file\n",
@@ -0,0 +1 @@
+# meta data of the search space (results_[comp].txt and priors.npz)
@@ -0,0 +1,4 @@
+import os, sys
+
+# the gcts package of the source tree, as $pyGCTS/lib of the scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
@@ -0,0 +1,42 @@
+import numpy as np
+import gcts
+from gcts import tseFile as tf
+
+
+def _series(obs, dates):
+    header = ["* SITE         : TEST\n", "* COMPONENT    : east\n", "* UNIT         : mm\n",
+              "* DATE FORMAT  : mjd\n", "* DATA ORDER   : east s_east dates\n",
+              "* COMMENT      : any comment could be added under this label.\n", "* ENDOFHEADER\n"]
+    obs = np.column_stack((obs, np.ones(len(obs))))
+    return tf.series("TESTeast.tse", header, 'east', [], obs, np.asarray(dates, dtype=float).reshape(-1,1))
+
+
+def test_append_screens_asymmetric_residuals_as_full_clean(tmp_path, monkeypatch):
+    # skewed noise, so that the IQrange bounds around the median residual are
+    # asymmetric, and appended epochs within the wider bound whose mirrored
+    # residual would be beyond the narrower one. A full cleaning iterates over
+    # the old epochs too, so the seed is one without old epochs at the bounds.
+    monkeypatch.chdir(tmp_path)
+    rng   = np.random.RandomState(2)
+    dates = 50000 + np.arange(400, dtype=float) * 7
+    obs   = 2.0 + 0.01 * (dates - dates[0]) + rng.exponential(1.0, len(dates))
+    obs[[40, 120]] += 25
+    n0    = 394
+    first = gcts.clean(_series(obs[:n0], dates[:n0]), ['east'], write=True, append=True)['east']
+    lower, upper = first.screen['bounds']
+    assert abs(upper + lower) > 0.2          # asymmetric bounds
+    A, _  = gcts.dm._matrix(first.series.header, [], dates.reshape(-1,1), [], 365.25)
+    model = A[n0:] @ np.linalg.solve(first.screen['nEq'], first.screen['rhs'])
+    side  = 1 if upper > -lower else -1
+    r     = np.full(len(dates) - n0, side * (upper - lower) / 2)
+    r[2], r[4] = upper + 5, lower - 5        # outliers on both sides
+    obs[n0:] = model - r                     # the residuals are AX - L
+    full  = _series(obs, dates)
+
+    appended = gcts.clean(full, ['east'], write=False, append=True)['east']
+    cleaned  = gcts.clean(full, ['east'], write=False)['east']
+    assert len(appended.table) == 1          # screened, not cleaned again
+    kept = np.isin(dates[n0:], cleaned.series.dates[:,0])
+    np.testing.assert_array_equal(appended.screen['mask'][n0:], kept)
+    assert np.sum(kept) == len(dates) - n0 - 2
+    np.testing.assert_array_equal(appended.series.dates, cleaned.series.dates)
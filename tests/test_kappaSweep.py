@@ -0,0 +1,26 @@
+import numpy as np
+import gcts
+
+
+def test_likelihood_tells_kappas_apart():
+    # series of random walk like (kappa = -2), flicker (-1) and nearly white
+    # (-0.2) power-law noise, each of which has its largest likelihood at its
+    # own kappa
+    dates  = (50000 + np.cumsum(np.r_[0, np.random.RandomState(0).randint(1, 8, 399)])).reshape(-1,1)
+    kappas = [-2.0, -1.0, -0.2]
+    for k, kappa in enumerate(kappas):
+        ts    = gcts.simulate(dates, 0.5, 3.0, kappa=kappa, seed=7)[0]
+        sweep = gcts.kappaSweep(ts, kappas)
+        logL  = np.array([row[3] for row in sweep.table])
+        assert sweep.best == k
+        assert np.all(logL[k] - np.delete(logL, k) > 1)
+
+
+def test_sweep_rejects_the_search_method():
+    dates = (50000 + np.arange(50)).reshape(-1,1)
+    ts    = gcts.simulate(dates, 0.5, 3.0, seed=1)[0]
+    try:
+        gcts.kappaSweep(ts, [-1.0, -0.5], method='search', nRND=5, repeat=2)
+    except ValueError:
+        return
+    raise AssertionError("the search method is not rejected")